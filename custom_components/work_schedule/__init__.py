@@ -6,13 +6,15 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.discovery import async_load_platform
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 
+from .api import async_create_client
 from .const import DOMAIN
+from .schedule import ScheduleCache
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.CALENDAR]
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -26,9 +28,12 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     else:
         hass.data[DOMAIN]["config"] = config[DOMAIN]
         _LOGGER.info("Work Schedule: loading with config %s", config[DOMAIN])
-    
-    # Always load sensors (with defaults or YAML config)
-    await async_load_platform(hass, Platform.SENSOR, DOMAIN, {}, config)
+
+    await _async_setup_shared(hass)
+
+    # Always load the platforms (with defaults or YAML config)
+    for platform in PLATFORMS:
+        await async_load_platform(hass, platform, DOMAIN, {}, config)
     return True
 
 
@@ -36,6 +41,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from a config entry (UI flow – future)."""
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN]["config"] = dict(entry.data)
+    await _async_setup_shared(hass)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
@@ -45,4 +51,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop("config", None)
+        hass.data[DOMAIN].pop("client", None)
+        hass.data[DOMAIN].pop("schedule").async_stop()
     return unload_ok
+
+
+async def _async_setup_shared(hass: HomeAssistant) -> None:
+    """Create the add-on client and schedule cache shared by every platform."""
+    client = await async_create_client(hass, hass.data[DOMAIN]["config"])
+    schedule = ScheduleCache(hass, client)
+    schedule.async_start()
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, schedule.async_stop)
+    hass.data[DOMAIN]["client"] = client
+    hass.data[DOMAIN]["schedule"] = schedule
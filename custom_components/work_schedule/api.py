@@ -0,0 +1,205 @@
+"""Work Schedule add-on client – discovery and shared HTTP access."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ADDON_HOSTNAMES,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_SCHEDULE_ID,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    DEFAULT_SCHEDULE_ID,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=3)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# The add-on sends a keepalive comment every 25 s.
+STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=60)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.discovery"
+
+
+class WorkScheduleClient:
+    """
+    Talks to the add-on over Home Assistant's shared aiohttp session.
+
+    With *discovery_port* set (no host configured), a failed request
+    starts a background re-discovery; later updates use what it finds.
+    Shift requests are scoped to one schedule (person) of the add-on.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base_url: str,
+        discovery_port: int | None = None,
+        schedule_id: int = DEFAULT_SCHEDULE_ID,
+    ) -> None:
+        self.hass = hass
+        self.base_url = base_url
+        self.schedule_id = schedule_id
+        self._scope = (
+            "/api" if schedule_id == DEFAULT_SCHEDULE_ID else f"/api/schedules/{schedule_id}"
+        )
+        self._discovery_port = discovery_port
+        self._session = async_get_clientsession(hass)
+        self._rediscovery: asyncio.Task | None = None
+
+    async def async_get(self, path: str) -> dict | list | None:
+        """GET *path* and return the decoded JSON, or None on any failure."""
+        url = f"{self.base_url}{path}"
+        try:
+            async with self._session.get(url, timeout=REQUEST_TIMEOUT) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                _LOGGER.warning("Work Schedule API returned %s for %s", resp.status, path)
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.warning("Failed to reach Work Schedule API at %s: %s", url, err)
+        self._schedule_rediscovery()
+        return None
+
+    async def async_next_shift(self) -> dict | None:
+        """GET …/next_shift (None when there is none or on error)."""
+        return await self.async_get(f"{self._scope}/next_shift")
+
+    async def async_shifts(self, date_from: str, date_to: str) -> list[dict] | None:
+        """GET …/shifts for an inclusive date range."""
+        return await self.async_get(f"{self._scope}/shifts?from={date_from}&to={date_to}")
+
+    async def async_version(self) -> int | None:
+        """GET …/version – the add-on's data version."""
+        data = await self.async_get(f"{self._scope}/version")
+        return data["version"] if data else None
+
+    async def async_changes(self, since: int) -> dict | None:
+        """GET …/changes – shifts written after data version *since*."""
+        return await self.async_get(f"{self._scope}/changes?since={since}")
+
+    async def async_events(self) -> AsyncIterator[dict]:
+        """
+        Yield decoded events from the add-on's SSE stream until it ends,
+        starting with a ``{"type": "connected"}`` once it is open.
+        """
+        try:
+            async with self._session.get(
+                f"{self.base_url}/api/events", timeout=STREAM_TIMEOUT
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.content:
+                    if line.startswith(b": connected"):
+                        yield {"type": "connected"}
+                    elif line.startswith(b"data: "):
+                        yield json.loads(line[6:])
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self._schedule_rediscovery()
+            raise
+
+    def _schedule_rediscovery(self) -> None:
+        if self._discovery_port is None or (self._rediscovery and not self._rediscovery.done()):
+            return
+        self._rediscovery = self.hass.async_create_background_task(
+            self._async_rediscover(), f"{DOMAIN} rediscovery"
+        )
+
+    async def _async_rediscover(self) -> None:
+        base_url = await async_discover(self.hass, self._discovery_port)
+        if base_url and base_url != self.base_url:
+            _LOGGER.info("Work Schedule add-on moved to %s", base_url)
+            self.base_url = base_url
+            await async_save_base_url(self.hass, base_url)
+
+
+# ── Discovery ──────────────────────────────────────────────────
+
+async def async_discover(hass: HomeAssistant, port: int) -> str | None:
+    """Probe every candidate hostname at once; return the first healthy base URL."""
+    session = async_get_clientsession(hass)
+    probes = [
+        asyncio.ensure_future(_probe(session, f"http://{host}:{port}"))
+        for host in ADDON_HOSTNAMES
+    ]
+    try:
+        for probe in asyncio.as_completed(probes):
+            base_url = await probe
+            if base_url:
+                _LOGGER.info("Discovered Work Schedule API at %s", base_url)
+                return base_url
+    finally:
+        for probe in probes:
+            probe.cancel()
+    _LOGGER.debug("No Work Schedule add-on answered on %s", ADDON_HOSTNAMES)
+    return None
+
+
+async def _probe(session: aiohttp.ClientSession, base_url: str) -> str | None:
+    try:
+        async with session.get(f"{base_url}/health", timeout=PROBE_TIMEOUT) as resp:
+            if resp.status == 200:
+                return base_url
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        _LOGGER.debug("Could not connect to %s - %s", base_url, err)
+    return None
+
+
+def _store(hass: HomeAssistant) -> Store:
+    return Store(hass, STORAGE_VERSION, STORAGE_KEY)
+
+
+async def async_load_base_url(hass: HomeAssistant) -> str | None:
+    """Return the base URL found by an earlier discovery, if any."""
+    data = await _store(hass).async_load()
+    return data.get("base_url") if data else None
+
+
+async def async_save_base_url(hass: HomeAssistant, base_url: str) -> None:
+    """Remember a discovered base URL across restarts."""
+    await _store(hass).async_save({"base_url": base_url})
+
+
+async def async_create_client(hass: HomeAssistant, conf: dict) -> WorkScheduleClient:
+    """
+    Build the client from YAML config.
+
+    A configured host is used as-is.  Otherwise the URL remembered from an
+    earlier discovery is used without probing (a failure re-discovers in
+    the background); only the very first start probes up front.
+    """
+    port = conf.get(CONF_PORT, DEFAULT_PORT)
+    host = conf.get(CONF_HOST)
+    schedule_id = int(conf.get(CONF_SCHEDULE_ID, DEFAULT_SCHEDULE_ID))
+    if host:
+        _LOGGER.info("Using configured host: %s", host)
+        return WorkScheduleClient(hass, f"http://{host}:{port}", schedule_id=schedule_id)
+
+    base_url = await async_load_base_url(hass)
+    if base_url is None:
+        _LOGGER.info("No host configured, attempting auto-discovery of add-on...")
+        base_url = await async_discover(hass, port)
+        if base_url:
+            await async_save_base_url(hass, base_url)
+        else:
+            _LOGGER.error(
+                "Could not auto-discover Work Schedule add-on. Tried: %s. "
+                "Please add configuration in configuration.yaml",
+                ADDON_HOSTNAMES,
+            )
+            # Keep retrying discovery in the background on failed updates.
+            base_url = f"http://{DEFAULT_HOST}:{port}"
+    return WorkScheduleClient(hass, base_url, discovery_port=port, schedule_id=schedule_id)
@@ -0,0 +1,109 @@
+"""Work Schedule binary sensor – on shift right now."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .schedule import ScheduleCache
+
+_LOGGER = logging.getLogger(__name__)
+
+# With no shift ahead, look again this soon: the window may have failed to
+# load, and re-checking a loaded one costs no request.
+IDLE_RECHECK = timedelta(hours=1)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the binary sensor from YAML platform config."""
+    async_add_entities([OnShiftBinarySensor(hass.data[DOMAIN]["schedule"])])
+
+
+class OnShiftBinarySensor(BinarySensorEntity):
+    """
+    On from a shift's start until its end (night shifts end next morning).
+
+    Never polled: one point-in-time timer is armed for the next start or
+    end, and re-armed when it fires or the cached schedule changes.
+    """
+
+    _attr_name = "On Shift"
+    _attr_unique_id = "work_schedule_on_shift"
+    _attr_icon = "mdi:account-hard-hat"
+    _attr_should_poll = False
+
+    def __init__(self, schedule: ScheduleCache) -> None:
+        self._schedule = schedule
+        self._attr_is_on = False
+        self._attr_extra_state_attributes = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._schedule.async_add_listener(self._handle_change))
+        self.async_on_remove(self._cancel_timer)
+        await self._async_refresh()
+
+    @callback
+    def _handle_change(self) -> None:
+        self.hass.async_create_task(self._async_refresh())
+
+    async def _async_refresh(self) -> None:
+        # No request unless the window's months are missing from the cache.
+        await self._schedule.async_ensure_window(dt_util.now().date())
+        self._update_state()
+
+    @callback
+    def _update_state(self) -> None:
+        now = dt_util.now()
+        current = upcoming = None
+        for start, end, shift in self._schedule.window_spans(now.date(), now.tzinfo):
+            if start <= now < end:
+                current = (end, shift)
+                break
+            if start > now:
+                upcoming = start
+                break
+
+        if current is not None:
+            end, shift = current
+            self._attr_is_on = True
+            self._attr_extra_state_attributes = {
+                "shift_type": shift["type"],
+                "date": shift["date"],
+                "ends": end.isoformat(),
+            }
+            wake = end
+        else:
+            self._attr_is_on = False
+            self._attr_extra_state_attributes = {}
+            wake = upcoming or now + IDLE_RECHECK
+
+        self._cancel_timer()
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._handle_transition, dt_util.as_utc(wake)
+        )
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_transition(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        self.hass.async_create_task(self._async_refresh())
+
+    @callback
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
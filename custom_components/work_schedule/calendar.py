@@ -0,0 +1,95 @@
+"""Work Schedule calendar – every shift as a calendar event."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .schedule import ScheduleCache, shift_span
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the calendar from YAML platform config."""
+    async_add_entities([WorkScheduleCalendar(hass.data[DOMAIN]["schedule"])])
+
+
+def _to_event(shift: dict) -> CalendarEvent:
+    start, end = shift_span(shift, dt_util.get_default_time_zone())
+    return CalendarEvent(
+        start=start,
+        end=end,
+        summary=shift["type"],
+        description=f"{shift['start']}–{shift['end']}",
+        uid=f"{DOMAIN}-{shift['date']}",
+    )
+
+
+class WorkScheduleCalendar(CalendarEntity):
+    """
+    Shifts served from the local schedule cache.
+
+    Never polled: the state is rewritten when the cache reports a change,
+    and the calendar base class schedules updates at event boundaries.
+    """
+
+    _attr_name = "Work Schedule"
+    _attr_unique_id = "work_schedule_calendar"
+    _attr_icon = "mdi:calendar-account"
+    _attr_should_poll = False
+
+    def __init__(self, schedule: ScheduleCache) -> None:
+        self._schedule = schedule
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._schedule.async_add_listener(self._handle_change))
+        # Slide the window forward daily; no request unless a month is missing.
+        self.async_on_remove(
+            async_track_time_change(self.hass, self._handle_change, hour=0, minute=0, second=5)
+        )
+        await self._async_load_window()
+
+    @callback
+    def _handle_change(self, *_) -> None:
+        self.hass.async_create_task(self._async_load_window())
+
+    async def _async_load_window(self) -> None:
+        await self._schedule.async_ensure_window(dt_util.now().date())
+        self.async_write_ha_state()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """The running shift, or else the next one."""
+        now = dt_util.now()
+        for _, end, shift in self._schedule.window_spans(now.date(), now.tzinfo):
+            if end > now:
+                return _to_event(shift)
+        return None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Events overlapping ``[start_date, end_date)``."""
+        shifts = await self._schedule.async_get_range(
+            start_date.date() - timedelta(days=1), end_date.date()
+        )
+        events = [_to_event(shift) for shift in shifts]
+        return [
+            e for e in events
+            if e.end_datetime_local > start_date and e.start_datetime_local < end_date
+        ]
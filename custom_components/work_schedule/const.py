@@ -7,6 +7,8 @@ DEFAULT_PORT = 8000
 SCAN_INTERVAL_SECONDS = 300      # 5 min
 CONF_HOST = "host"
 CONF_PORT = "port"
+CONF_SCHEDULE_ID = "schedule_id"
+DEFAULT_SCHEDULE_ID = 1           # the add-on's original, unnamed schedule
 
 # Add-on detection: try multiple possible hostnames
 ADDON_HOSTNAMES = [
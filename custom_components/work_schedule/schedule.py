@@ -0,0 +1,217 @@
+"""
+Local schedule cache – month buckets kept fresh by the add-on's SSE stream.
+
+Calendar views and automations read from here; the add-on is only asked
+for months that are not cached yet.  Change events from ``/api/events``
+drop the affected month.  After a lost stream reconnects, ``/api/changes``
+names the days written meanwhile and only their months are dropped;
+everything is dropped when that can't be told.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Callable
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import WorkScheduleClient
+from .const import DEFAULT_SCHEDULE_ID, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+Month = tuple[int, int]
+
+CHANGE_EVENTS = ("shift_changed", "shift_deleted", "undo")
+
+# How far ahead entities look for the running or next shift.
+LOOKAHEAD = timedelta(days=62)
+RECONNECT_DELAYS = (1, 5, 15, 60)
+
+
+def _month_of(day: date) -> Month:
+    return day.year, day.month
+
+
+def _months_between(start: date, end: date) -> list[Month]:
+    months = []
+    y, m = _month_of(start)
+    while (y, m) <= _month_of(end):
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+def _month_bounds(first: Month, last: Month) -> tuple[date, date]:
+    y, m = last
+    next_first = date(y + 1, 1, 1) if m == 12 else date(y, m + 1, 1)
+    return date(*first, 1), next_first - timedelta(days=1)
+
+
+def shift_span(shift: dict, tz: tzinfo) -> tuple[datetime, datetime]:
+    """Return a shift's start/end as aware datetimes; night shifts end next day."""
+    day = date.fromisoformat(shift["date"])
+    start_t = time.fromisoformat(shift["start"])
+    end_t = time.fromisoformat(shift["end"])
+    start = datetime.combine(day, start_t, tz)
+    end = datetime.combine(day + timedelta(days=1) if end_t <= start_t else day, end_t, tz)
+    return start, end
+
+
+class ScheduleCache:
+    """Shifts by month, loaded on demand and invalidated by add-on events."""
+
+    def __init__(self, hass: HomeAssistant, client: WorkScheduleClient) -> None:
+        self.hass = hass
+        self.client = client
+        self._months: dict[Month, dict[str, dict]] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        # Data version the cache is known to be current at (while connected).
+        self._since: int | None = None
+        self._task: asyncio.Task | None = None
+
+    # ── Reads ──────────────────────────────────────────────────
+
+    async def async_get_range(self, start: date, end: date) -> list[dict]:
+        """Return the shifts in ``[start, end]``, fetching only uncached months."""
+        await self.async_ensure(start, end)
+        return self.cached_range(start, end)
+
+    async def async_ensure(self, start: date, end: date) -> None:
+        """Load every month touching ``[start, end]`` that is not cached."""
+        async with self._lock:
+            missing = [m for m in _months_between(start, end) if m not in self._months]
+            if not missing:
+                return
+            # One request for the whole span of missing months.
+            date_from, date_to = _month_bounds(missing[0], missing[-1])
+            generation = self._generation
+            rows = await self.client.async_shifts(date_from.isoformat(), date_to.isoformat())
+            # Don't cache a response that an event arriving meanwhile made stale.
+            if rows is None or generation != self._generation:
+                return
+            buckets: dict[Month, dict[str, dict]] = {m: {} for m in missing}
+            for row in rows:
+                bucket = buckets.get(_month_of(date.fromisoformat(row["date"])))
+                if bucket is not None:
+                    bucket[row["date"]] = row
+            self._months.update(buckets)
+
+    async def async_ensure_window(self, today: date) -> None:
+        """Load the entity window; yesterday's night shift may still be running."""
+        await self.async_ensure(today - timedelta(days=1), today + LOOKAHEAD)
+
+    @callback
+    def window_spans(self, today: date, tz: tzinfo) -> list[tuple[datetime, datetime, dict]]:
+        """``(start, end, shift)`` for the cached entity window, in date order."""
+        shifts = self.cached_range(today - timedelta(days=1), today + LOOKAHEAD)
+        return [(*shift_span(shift, tz), shift) for shift in shifts]
+
+    @callback
+    def cached_range(self, start: date, end: date) -> list[dict]:
+        """Shifts in ``[start, end]`` from already loaded months only."""
+        lo, hi = start.isoformat(), end.isoformat()
+        out: list[dict] = []
+        for month in _months_between(start, end):
+            for day, row in sorted(self._months.get(month, {}).items()):
+                if lo <= day <= hi:
+                    out.append(row)
+        return out
+
+    # ── Change notifications ──────────────────────────────────
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call *listener* after cached data changed; returns an unsubscribe."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def _invalidate(self, days: list[str] | None) -> None:
+        """
+        Drop the months of *days* (None: every month) and notify listeners.
+
+        Listeners are notified even when nothing was dropped: they reload
+        their window, which also retries a load that failed earlier.
+        """
+        self._generation += 1
+        if days is None:
+            self._months.clear()
+        else:
+            for day in days:
+                self._months.pop(_month_of(date.fromisoformat(day)), None)
+        for listener in list(self._listeners):
+            listener()
+
+    async def _async_catch_up(self) -> None:
+        """On (re)connect: drop what changed since the last connection."""
+        since, self._since = self._since, None
+        if since is None:
+            # Nothing to catch up from: what was loaded before the stream
+            # connected may be stale, and a failed first load is retried.
+            self._since = await self.client.async_version()
+            self._invalidate(None)
+            return
+        changes = await self.client.async_changes(since)
+        if changes is None or changes["resync"]:
+            self._invalidate(None)
+        else:
+            self._invalidate(
+                [shift["date"] for shift in changes["changed"]] + changes["deleted"]
+            )
+        self._since = changes["version"] if changes else None
+
+    # ── SSE listener ──────────────────────────────────────────
+
+    @callback
+    def async_start(self) -> None:
+        """Follow the add-on's event stream in the background."""
+        self._task = self.hass.async_create_background_task(
+            self._async_listen(), f"{DOMAIN} event stream"
+        )
+
+    @callback
+    def async_stop(self, *_) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _is_change(self, event: dict) -> bool:
+        if event.get("type") == "restored":
+            return True     # a backup replaced every schedule's data
+        return (
+            event.get("type") in CHANGE_EVENTS
+            and event.get("schedule_id", DEFAULT_SCHEDULE_ID) == self.client.schedule_id
+        )
+
+    async def _async_listen(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                async for event in self.client.async_events():
+                    attempt = 0
+                    if event.get("type") == "connected":
+                        await self._async_catch_up()
+                        continue
+                    # A batch stands for several events sent within the
+                    # add-on's batching window: invalidate once for all.
+                    batch = event["events"] if event.get("type") == "batch" else [event]
+                    days = [e.get("date") for e in batch if self._is_change(e)]
+                    if days:
+                        self._invalidate(None if None in days else days)
+            except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as err:
+                _LOGGER.debug("Work Schedule event stream lost: %s", err)
+            # Anything may have changed while we were not listening; without
+            # a version to catch up from on reconnect, drop it all now.
+            if self._since is None:
+                self._invalidate(None)
+            delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+            attempt += 1
+            await asyncio.sleep(delay)
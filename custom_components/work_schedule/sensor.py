@@ -5,8 +5,6 @@ from __future__ import annotations
 import logging
 from datetime import timedelta
 
-import aiohttp
-
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorDeviceClass,
@@ -15,35 +13,14 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
-from .const import (
-    DOMAIN,
-    CONF_HOST,
-    CONF_PORT,
-    DEFAULT_HOST,
-    DEFAULT_PORT,
-    SCAN_INTERVAL_SECONDS,
-    ADDON_HOSTNAMES,
-)
+from .api import WorkScheduleClient
+from .const import DOMAIN, SCAN_INTERVAL_SECONDS
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(seconds=SCAN_INTERVAL_SECONDS)
 
 
-async def _test_connection(host: str, port: int) -> bool:
-    """Test if the API is reachable at given host:port."""
-    url = f"http://{host}:{port}/health"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=3)) as resp:
-                if resp.status == 200:
-                    _LOGGER.info("Successfully connected to Work Schedule API at %s:%s", host, port)
-                    return True
-    except Exception as e:
-        _LOGGER.debug("Could not connect to %s:%s - %s", host, port, e)
-    return False
-
-
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
@@ -51,61 +28,18 @@ async def async_setup_platform(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up sensors from YAML platform config."""
-    conf = hass.data.get(DOMAIN, {}).get("config", {})
-    
-    # Get host/port from config or use defaults
-    configured_host = conf.get(CONF_HOST)
-    port = conf.get(CONF_PORT, DEFAULT_PORT)
-    
-    # If no host configured, try auto-discovery
-    if not configured_host:
-        _LOGGER.info("No host configured, attempting auto-discovery of add-on...")
-        host = None
-        for hostname in ADDON_HOSTNAMES:
-            _LOGGER.debug("Trying hostname: %s", hostname)
-            if await _test_connection(hostname, port):
-                host = hostname
-                break
-        
-        if not host:
-            _LOGGER.error(
-                "Could not auto-discover Work Schedule add-on. Tried: %s. "
-                "Please add configuration in configuration.yaml",
-                ADDON_HOSTNAMES
-            )
-            host = DEFAULT_HOST  # Use default anyway, will log errors on update
-    else:
-        host = configured_host
-        _LOGGER.info("Using configured host: %s", host)
-    
-    base_url = f"http://{host}:{port}"
-    _LOGGER.info("Setting up Work Schedule sensors with base_url: %s", base_url)
+    client: WorkScheduleClient = hass.data[DOMAIN]["client"]
+    _LOGGER.info("Setting up Work Schedule sensors with base_url: %s", client.base_url)
 
     async_add_entities(
         [
-            NextShiftTimeSensor(base_url),
-            NextShiftTypeSensor(base_url),
+            NextShiftTimeSensor(client),
+            NextShiftTypeSensor(client),
         ],
         update_before_add=True,
     )
 
 
-# ── Shared fetch ───────────────────────────────────────────────
-
-async def _fetch_next_shift(base_url: str) -> dict | None:
-    """GET /api/next_shift from the add-on."""
-    url = f"{base_url}/api/next_shift"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                _LOGGER.warning("Work Schedule API returned %s", resp.status)
-    except Exception:
-        _LOGGER.exception("Failed to reach Work Schedule API at %s", url)
-    return None
-
-
 # ── Sensor: next_shift_time ────────────────────────────────────
 
 class NextShiftTimeSensor(SensorEntity):
@@ -116,23 +50,23 @@ class NextShiftTimeSensor(SensorEntity):
     _attr_icon = "mdi:calendar-clock"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def __init__(self, base_url: str) -> None:
-        self._base_url = base_url
+    def __init__(self, client: WorkScheduleClient) -> None:
+        self._client = client
         self._attr_native_value = None
         self._extra: dict = {}
 
     async def async_update(self) -> None:
-        _LOGGER.debug("Updating NextShiftTimeSensor from %s", self._base_url)
-        data = await _fetch_next_shift(self._base_url)
+        _LOGGER.debug("Updating NextShiftTimeSensor from %s", self._client.base_url)
+        data = await self._client.async_next_shift()
         if data:
             # value like "2026-02-09T07:00"
             self._attr_native_value = data.get("datetime")
-            _LOGGER.debug("NextShiftTimeSensor updated: %s", self._attr_native_value)
-        else:
-            _LOGGER.warning("NextShiftTimeSensor: no data from API")
             self._extra = data
+            _LOGGER.debug("NextShiftTimeSensor updated: %s", self._attr_native_value)
         else:
             self._attr_native_value = None
+            self._extra = {}
+            _LOGGER.warning("NextShiftTimeSensor: no data from API")
 
     @property
     def extra_state_attributes(self) -> dict:
@@ -152,14 +86,14 @@ class NextShiftTypeSensor(SensorEntity):
     _attr_unique_id = "work_schedule_next_shift_type"
     _attr_icon = "mdi:briefcase-outline"
 
-    def __init__(self, base_url: str) -> None:
-        self._base_url = base_url
+    def __init__(self, client: WorkScheduleClient) -> None:
+        self._client = client
         self._attr_native_value = None
         self._extra: dict = {}
 
     async def async_update(self) -> None:
-        _LOGGER.debug("Updating NextShiftTypeSensor from %s", self._base_url)
-        data = await _fetch_next_shift(self._base_url)
+        _LOGGER.debug("Updating NextShiftTypeSensor from %s", self._client.base_url)
+        data = await self._client.async_next_shift()
         if data:
             self._attr_native_value = data.get("type")
             self._extra = data
@@ -0,0 +1,53 @@
+"""API routes – database snapshots (backup, download, restore)."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from .. import backup
+from ..events import broadcast
+from ..scheduler import scheduler
+from ..schemas import BackupOut, RestoreOut
+
+router = APIRouter(prefix="/api/backups", tags=["backups"])
+
+
+@router.get("", response_model=list[BackupOut])
+def list_backups():
+    """Return the stored snapshots, newest first."""
+    return backup.list_backups()
+
+
+@router.post("", response_model=BackupOut, status_code=201)
+def create_backup():
+    """Take a consistent snapshot of the live database."""
+    try:
+        return backup.create_backup()
+    except backup.BackupBusy as exc:
+        raise HTTPException(409, str(exc))
+
+
+@router.get("/{name}", response_class=FileResponse)
+def download_backup(name: str):
+    """Download a snapshot (gzipped SQLite database)."""
+    path = backup.backup_path(name)
+    if path is None:
+        raise HTTPException(404, f"No backup {name}")
+    return FileResponse(path, media_type="application/gzip", filename=name)
+
+
+@router.post("/{name}/restore", response_model=RestoreOut)
+def restore_backup(name: str):
+    """Replace the live data with a snapshot after validating it."""
+    try:
+        version = backup.restore_backup(name)
+    except FileNotFoundError:
+        raise HTTPException(404, f"No backup {name}")
+    except backup.BackupInvalid as exc:
+        raise HTTPException(422, str(exc))
+    except backup.BackupBusy as exc:
+        raise HTTPException(409, str(exc))
+    scheduler.load()
+    broadcast("restored", {"version": version})
+    return {"message": f"Restored {name}", "version": version}
@@ -0,0 +1,123 @@
+"""
+Shift edits given as data – ``POST /shifts/batch`` and ``/api/ws``.
+
+An edit is a JSON object::
+
+    {"op": "set", "date": "2026-06-01", "type": "day8", "if_match": 42}
+    {"op": "delete", "date": "2026-06-01"}
+    {"op": "undo"}
+
+Its result carries the ``status`` the single-shift HTTP route would
+answer (200, 400, 404, 409), with ``shift`` (set), ``restored_date``
+(undo) or ``error`` alongside – on 409 also the current row ``version``.
+``if_match`` takes a row version or ``"*"``; ``"if_none_match": "*"``
+makes a set create-only.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date as Date
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..events import broadcast
+from ..schemas import ShiftBatch, ShiftBatchOut
+from ..shifts import SHIFT_TYPES, remove_shift, set_shift, validate_shift_type
+from ..storage import VersionConflict
+from ..undo import undo_last
+from .schedules import schedule_scope
+from .shifts import write_precondition
+
+_LOGGER = logging.getLogger(__name__)
+
+router = APIRouter(tags=["shifts"])
+
+# (event type, payload) to broadcast once an edit has been applied.
+Event = tuple[str, dict]
+
+
+@router.post("/shifts/batch", response_model=ShiftBatchOut)
+def batch_edits(body: ShiftBatch, schedule_id: int = Depends(schedule_scope)):
+    """
+    Apply several edits in order; one result per edit.
+
+    Each edit is its own write (and history entry), so one failing edit
+    doesn't undo the others.
+    """
+    results = apply_edits(body.edits, schedule_id)
+    for _, event in results:
+        if event is not None:
+            broadcast(*event)
+    return {"results": [result for result, _ in results]}
+
+
+def apply_edits(edits: list, schedule_id: int) -> list[tuple[dict, Event | None]]:
+    """Apply *edits* in order; an unexpected error fails only its own edit."""
+    results = []
+    for edit in edits:
+        try:
+            results.append(apply_edit(edit, schedule_id))
+        except Exception:
+            _LOGGER.exception("Shift edit failed: %s", edit)
+            results.append(({"status": 500, "error": "Internal error"}, None))
+    return results
+
+
+def apply_edit(edit, schedule_id: int) -> tuple[dict, Event | None]:
+    """Apply one edit; return its result and the event to broadcast (if any)."""
+    if not isinstance(edit, dict):
+        return {"status": 400, "error": "Expected a JSON object"}, None
+    op = edit.get("op")
+
+    if op == "undo":
+        result = undo_last(schedule_id)
+        if result is None:
+            return {"status": 404, "error": "Nothing to undo"}, None
+        date = result["restored_date"]
+        return (
+            {"status": 200, "restored_date": date},
+            ("undo", {"schedule_id": schedule_id, "date": date}),
+        )
+    if op not in ("set", "delete"):
+        return {"status": 400, "error": f"Unknown op '{op}'"}, None
+
+    date = edit.get("date")
+    try:
+        if not isinstance(date, str):
+            raise TypeError(date)
+        Date.fromisoformat(date)
+        if_match, if_none_match = edit.get("if_match"), edit.get("if_none_match")
+        precondition = write_precondition(
+            None if if_match is None else str(if_match),
+            None if if_none_match is None else str(if_none_match),
+        )
+    except (TypeError, ValueError):
+        return {"status": 400, "error": f"Invalid date '{date}', expected YYYY-MM-DD"}, None
+    except HTTPException as exc:
+        return {"status": exc.status_code, "error": exc.detail}, None
+
+    try:
+        if op == "delete":
+            if not remove_shift(date, schedule_id, precondition):
+                return {"status": 404, "error": f"No shift on {date}"}, None
+            return {"status": 200}, ("shift_deleted", {"schedule_id": schedule_id, "date": date})
+
+        shift_type = edit.get("type")
+        if not isinstance(shift_type, str) or not validate_shift_type(shift_type):
+            error = f"Unknown shift type '{shift_type}'. Valid: {list(SHIFT_TYPES)}"
+            return {"status": 400, "error": error}, None
+        shift = set_shift(date, shift_type, schedule_id, precondition)
+    except VersionConflict as exc:
+        current = exc.current
+        return {
+            "status": 409,
+            "error": f"Shift on {date} was changed by someone else",
+            "version": current["version"] if current else None,
+        }, None
+    return {"status": 200, "shift": shift}, ("shift_changed", {
+        "schedule_id": schedule_id,
+        "date": date,
+        "shift_type": shift_type,
+        "version": shift["version"],
+    })
@@ -4,21 +4,23 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from .. import storage
 from ..schemas import NextShift
+from .schedules import schedule_scope
 
-router = APIRouter(prefix="/api", tags=["ha"])
+router = APIRouter(tags=["ha"])
 
 
 @router.get("/next_shift", response_model=NextShift)
-def next_shift():
+def next_shift(schedule_id: int = Depends(schedule_scope)):
     """
     Return the next upcoming shift relative to *now*.
 
-    Scans the next 90 days and returns the first shift whose start
-    datetime is in the future.
+    Looks up to 90 days ahead and returns the first shift whose start
+    datetime is in the future.  Only today's shift can already have
+    started, so the first two shifts from today on are enough.
     """
     now = datetime.utcnow()
     today = now.date()
@@ -27,7 +29,7 @@ def next_shift():
     date_from = today.isoformat()
     date_to = (today + timedelta(days=90)).isoformat()
 
-    shifts = storage.get_shifts(date_from, date_to)
+    shifts = storage.get_upcoming_shifts(date_from, date_to, limit=2, schedule_id=schedule_id)
 
     for s in shifts:
         shift_date = date.fromisoformat(s["date"])
@@ -2,15 +2,28 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
 from ..history import get_formatted_history
 from ..schemas import HistoryEntry
+from .schedules import schedule_scope
 
-router = APIRouter(prefix="/api", tags=["history"])
+router = APIRouter(tags=["history"])
 
 
 @router.get("/history", response_model=list[HistoryEntry])
-def list_history(limit: int = Query(50, ge=1, le=500)):
-    """Return recent history entries (newest first)."""
-    return get_formatted_history(limit=limit)
+def list_history(
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[int] = Query(
+        None, description="Only entries older than this id – the last id of the previous page"
+    ),
+    schedule_id: int = Depends(schedule_scope),
+):
+    """Return the schedule's recent history entries (newest first), a page at a time."""
+    # Entries are built by get_formatted_history – no need to re-validate.
+    return ORJSONResponse(
+        get_formatted_history(limit=limit, schedule_id=schedule_id, before=before)
+    )
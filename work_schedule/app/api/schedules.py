@@ -0,0 +1,60 @@
+"""API routes – schedules (one per person) and the schedule scope."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from .. import storage
+from ..events import broadcast
+from ..models import DEFAULT_SCHEDULE_ID
+from ..scheduler import scheduler
+from ..schemas import MessageOut, ScheduleCreate, ScheduleOut
+
+router = APIRouter(prefix="/api/schedules", tags=["schedules"])
+
+# Routers that act on one schedule are mounted at both prefixes; the
+# unscoped one keeps the single-schedule API working unchanged.
+SCOPED_PREFIXES = ("/api", "/api/schedules/{schedule_id}")
+
+
+def schedule_scope(schedule_id: int = DEFAULT_SCHEDULE_ID) -> int:
+    """
+    Dependency: the schedule a request acts on.
+
+    A path parameter under ``/api/schedules/{schedule_id}/…``; the default
+    schedule (or ``?schedule_id=``) under the unscoped ``/api/…`` routes.
+    """
+    if schedule_id != DEFAULT_SCHEDULE_ID and not storage.schedule_exists(schedule_id):
+        raise HTTPException(404, f"No schedule {schedule_id}")
+    return schedule_id
+
+
+@router.get("", response_model=list[ScheduleOut])
+def list_schedules():
+    """Return every schedule."""
+    return storage.list_schedules()
+
+
+@router.post("", response_model=ScheduleOut, status_code=201)
+def create_schedule(body: ScheduleCreate):
+    """Add a schedule."""
+    try:
+        schedule = storage.create_schedule(body.name)
+    except ValueError as exc:
+        raise HTTPException(409, str(exc))
+    broadcast("schedule_created", schedule)
+    return schedule
+
+
+@router.delete("/{schedule_id}", response_model=MessageOut)
+def delete_schedule(schedule_id: int):
+    """Delete a schedule with all its shifts and history."""
+    try:
+        ok = storage.delete_schedule(schedule_id)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+    if not ok:
+        raise HTTPException(404, f"No schedule {schedule_id}")
+    scheduler.drop_schedule(schedule_id)
+    broadcast("schedule_deleted", {"schedule_id": schedule_id})
+    return {"message": f"Deleted schedule {schedule_id}"}
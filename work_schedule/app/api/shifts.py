@@ -2,67 +2,239 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+from datetime import date as Date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 
 from ..shifts import set_shift, remove_shift, SHIFT_TYPES, validate_shift_type
 from ..undo import undo_last
 from .. import storage
-from ..schemas import ShiftOut, ShiftUpdate, MessageOut, UndoOut
+from ..storage import Precondition, VersionConflict
+from ..schemas import ChangesOut, ShiftOut, ShiftUpdate, MessageOut, UndoOut, VersionOut
 from ..events import broadcast
-
-router = APIRouter(prefix="/api", tags=["shifts"])
-
-
-@router.get("/shifts", response_model=list[ShiftOut])
+from ..compact import COLUMNS_MEDIA_TYPE, DAYS_MEDIA_TYPE, MAX_DAYS, to_columns, to_days
+from .schedules import schedule_scope
+
+router = APIRouter(tags=["shifts"])
+
+
+def _check_date(value: str) -> Date:
+    """Parse a ``YYYY-MM-DD`` path/query value or answer 400."""
+    try:
+        return Date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+# ── Conditional writes ─────────────────────────────────────────
+# A shift's ETag is its row version.  ``If-Match`` makes PUT/DELETE
+# apply only to that version (``*``: to any existing shift), and
+# ``If-None-Match: *`` makes PUT create-only.  A mismatch answers 409
+# with the current ETag, as does an ``If-Match`` listing only weak tags;
+# without either header writes are unconditional.
+
+def _etag(shift: dict) -> str:
+    return f'"{shift["version"]}"'
+
+
+def write_precondition(
+    if_match: Optional[str], if_none_match: Optional[str]
+) -> Optional[Precondition]:
+    if if_none_match is not None:
+        if if_none_match.strip() != "*":
+            raise HTTPException(400, "Only 'If-None-Match: *' is supported on writes")
+        return lambda version: version is None
+    if if_match is None:
+        return None
+    if if_match.strip() == "*":
+        return lambda version: version is not None
+    tags = [tag.strip() for tag in if_match.split(",")]
+    try:
+        # If-Match compares strongly: a weak tag never matches.
+        versions = {int(tag.strip('"')) for tag in tags if not tag.startswith("W/")}
+    except ValueError:
+        raise HTTPException(400, f"Invalid If-Match '{if_match}'")
+    return lambda version: version in versions
+
+
+# ── Conditional reads ──────────────────────────────────────────
+# Range reads carry a weak ETag built from the data version they reflect
+# (read before the data, so it is never newer than the body).  A client
+# repeating a read with ``If-None-Match`` gets ``304`` until any shift
+# is written.
+
+def range_etag(version: int, variant: str = "") -> str:
+    return f'W/"{version}{"-" + variant if variant else ""}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A ``304`` for *etag* if the request's ``If-None-Match`` lists it."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _conflict(date: str, exc: VersionConflict) -> HTTPException:
+    current = exc.current
+    return HTTPException(
+        409,
+        f"Shift on {date} was changed by someone else",
+        headers={"ETag": _etag(current)} if current else None,
+    )
+
+
+@router.get(
+    "/shifts",
+    response_model=list[ShiftOut],
+    responses={200: {"content": {COLUMNS_MEDIA_TYPE: {}, DAYS_MEDIA_TYPE: {}}}},
+)
 def list_shifts(
+    request: Request,
     date_from: str = Query(..., alias="from", description="YYYY-MM-DD"),
     date_to: str = Query(..., alias="to", description="YYYY-MM-DD"),
+    schedule_id: int = Depends(schedule_scope),
 ):
-    """Return shifts in a date range (inclusive)."""
-    return storage.get_shifts(date_from, date_to)
+    """
+    Return shifts in a date range (inclusive).
+
+    Long ranges can be requested in a compact form via the ``Accept``
+    header: ``application/vnd.work-schedule.columns+json`` (field arrays)
+    or ``application/vnd.work-schedule.days+json`` (one type code per day,
+    at most ``MAX_DAYS`` days).
+    Answers ``304`` to an ``If-None-Match`` with the current ``ETag``.
+    """
+    start, end = _check_date(date_from), _check_date(date_to)
+    accept = request.headers.get("accept", "")
+    variant = (
+        "days" if DAYS_MEDIA_TYPE in accept
+        else "columns" if COLUMNS_MEDIA_TYPE in accept
+        else ""
+    )
+    if variant == "days" and (end - start).days >= MAX_DAYS:
+        raise HTTPException(400, f"The days form covers at most {MAX_DAYS} days")
+    etag = range_etag(storage.get_data_version(), variant)
+    headers = {"Vary": "Accept", "ETag": etag}
+    cached = not_modified(request, etag)
+    if cached is not None:
+        cached.headers["Vary"] = "Accept"
+        return cached
+    rows = storage.get_shifts(date_from, date_to, schedule_id)
+
+    if variant == "days":
+        return ORJSONResponse(
+            to_days(rows, start, end), media_type=DAYS_MEDIA_TYPE, headers=headers
+        )
+    if variant == "columns":
+        return ORJSONResponse(
+            to_columns(rows), media_type=COLUMNS_MEDIA_TYPE, headers=headers
+        )
+
+    # Rows are already shaped by Shift.to_dict – skip response_model validation.
+    return ORJSONResponse(rows, headers=headers)
 
 
 @router.get("/shifts/{date}", response_model=ShiftOut)
-def get_shift(date: str):
-    """Return a single shift."""
-    row = storage.get_shift(date)
+def get_shift(date: str, response: Response, schedule_id: int = Depends(schedule_scope)):
+    """Return a single shift (its ``ETag`` is the row version)."""
+    _check_date(date)
+    row = storage.get_shift(date, schedule_id)
     if row is None:
         raise HTTPException(404, f"No shift on {date}")
+    response.headers["ETag"] = _etag(row)
     return row
 
 
 @router.put("/shifts/{date}", response_model=ShiftOut)
-def update_shift(date: str, body: ShiftUpdate):
+def update_shift(
+    date: str,
+    body: ShiftUpdate,
+    response: Response,
+    schedule_id: int = Depends(schedule_scope),
+    if_match: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """Create or update a shift (auto-fills start/end from type)."""
+    _check_date(date)
+    precondition = write_precondition(if_match, if_none_match)
     if not validate_shift_type(body.type):
         raise HTTPException(
             400, f"Unknown shift type '{body.type}'. Valid: {list(SHIFT_TYPES)}"
         )
-    result = set_shift(date, body.type)
-    broadcast("shift_changed", {"date": date, "type": body.type})
+    try:
+        result = set_shift(date, body.type, schedule_id, precondition)
+    except VersionConflict as exc:
+        raise _conflict(date, exc)
+    broadcast("shift_changed", {
+        "schedule_id": schedule_id,
+        "date": date,
+        "shift_type": body.type,
+        "version": result["version"],
+    })
+    response.headers["ETag"] = _etag(result)
     return result
 
 
 @router.delete("/shifts/{date}", response_model=MessageOut)
-def delete_shift(date: str):
+def delete_shift(
+    date: str,
+    schedule_id: int = Depends(schedule_scope),
+    if_match: Optional[str] = Header(None),
+):
     """Remove a shift."""
-    ok = remove_shift(date)
+    _check_date(date)
+    precondition = write_precondition(if_match, None)
+    try:
+        ok = remove_shift(date, schedule_id, precondition)
+    except VersionConflict as exc:
+        raise _conflict(date, exc)
     if not ok:
         raise HTTPException(404, f"No shift on {date}")
-    broadcast("shift_deleted", {"date": date})
+    broadcast("shift_deleted", {"schedule_id": schedule_id, "date": date})
     return {"message": f"Deleted shift on {date}"}
 
 
 @router.post("/undo", response_model=UndoOut)
-def undo():
-    """Undo the last change."""
-    result = undo_last()
+def undo(schedule_id: int = Depends(schedule_scope)):
+    """Undo the schedule's last change."""
+    result = undo_last(schedule_id)
     if result is None:
         raise HTTPException(404, "Nothing to undo")
-    broadcast("undo")
+    broadcast("undo", {"schedule_id": schedule_id, "date": result["restored_date"]})
     return result
 
 
+@router.get("/version", response_model=VersionOut)
+def data_version(response: Response):
+    """
+    Current data version – cheap to poll; clients with a local copy
+    refetch only when it differs from the version they synced at.
+    """
+    response.headers["Cache-Control"] = "no-cache"
+    return {"version": storage.get_data_version()}
+
+
+@router.get("/changes", response_model=ChangesOut)
+def list_changes(
+    since: int = Query(..., ge=0, description="Data version of the last sync"),
+    schedule_id: int = Depends(schedule_scope),
+):
+    """
+    Shifts created, changed or deleted after data version *since*, from
+    the change log.  Sync again from the returned ``version``; with
+    ``resync`` set, *since* predates the log and the range must be
+    refetched via ``/shifts``.
+    """
+    changes = storage.get_changes(since, schedule_id)
+    # Rows are already shaped by Shift.to_dict – skip response_model validation.
+    return ORJSONResponse(changes, headers={"Cache-Control": "no-cache"})
+
+
 @router.get("/shift_types")
 def list_shift_types():
     """Return available shift type definitions."""
@@ -0,0 +1,25 @@
+"""API routes – schedule statistics."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..stats import get_stats
+from ..schemas import StatsOut
+from .schedules import schedule_scope
+
+router = APIRouter(tags=["stats"])
+
+
+@router.get("/stats", response_model=StatsOut, response_model_by_alias=True)
+def schedule_stats(
+    date_from: str = Query(..., alias="from", description="YYYY-MM-DD"),
+    date_to: str = Query(..., alias="to", description="YYYY-MM-DD"),
+    group: str = Query("month", pattern="^(month|week|type)$"),
+    schedule_id: int = Depends(schedule_scope),
+):
+    """Return shift counts and worked hours, grouped by month, week or type."""
+    try:
+        return get_stats(date_from, date_to, group, schedule_id)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
@@ -0,0 +1,46 @@
+"""API routes – precomputed calendar view models for the UI."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+from ..views import month_view, quarter_view
+from ..schemas import MonthView, QuarterView
+from .schedules import schedule_scope
+from .shifts import not_modified, range_etag
+
+router = APIRouter(prefix="/views", tags=["views"])
+
+
+@router.get("/month", response_model=MonthView)
+def get_month_view(
+    request: Request,
+    response: Response,
+    year: int = Query(..., ge=1970, le=9999),
+    month: int = Query(..., ge=1, le=12),
+    schedule_id: int = Depends(schedule_scope),
+):
+    """Return the calendar grid (weeks × days with shift codes) for a month."""
+    return _conditional(request, response, month_view(year, month, schedule_id))
+
+
+@router.get("/quarter", response_model=QuarterView)
+def get_quarter_view(
+    request: Request,
+    response: Response,
+    year: int = Query(..., ge=1970, le=9999),
+    quarter: int = Query(..., ge=1, le=4),
+    schedule_id: int = Depends(schedule_scope),
+):
+    """Return per-month day-code strips for a quarter (timeline view)."""
+    return _conditional(request, response, quarter_view(year, quarter, schedule_id))
+
+
+def _conditional(request: Request, response: Response, view: dict):
+    # Views are cached per data version, so that version is their ETag.
+    etag = range_etag(view["version"])
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    return view
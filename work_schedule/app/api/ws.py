@@ -0,0 +1,159 @@
+"""
+API route – ``/api/ws``: shift edits and live updates on one WebSocket.
+
+Client → server, one edit (see ``api.edits``) per message, tagged with
+a client-chosen ``seq``::
+
+    {"seq": 7, "op": "set", "date": "2026-06-01", "type": "day8", "if_match": 42}
+
+Each edit is answered with ``{"type": "ack", "seq": …, "status": …}``
+plus the edit's result fields, in the order it was sent.
+
+Change events from the hub are pushed on the same connection, limited
+to the connection's schedule.  Edits may be pipelined: whatever has
+arrived is applied in order in a single threadpool hop.  A client
+with more than ``MAX_PENDING_EDITS`` unapplied edits is disconnected
+with 1008.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from starlette.concurrency import run_in_threadpool
+
+from .. import events
+from ..events import broadcast
+from ..metrics import Counter, Gauge
+from ..models import DEFAULT_SCHEDULE_ID
+from .edits import apply_edits
+from .schedules import schedule_scope
+
+router = APIRouter(tags=["ws"])
+
+_connections: set[WebSocket] = set()
+
+WS_CONNECTIONS = Gauge(
+    "ws_connections", "Connected WebSocket clients.", fn=lambda: len(_connections)
+)
+WS_EDITS = Counter("ws_edits_total", "Edits received over WebSocket.")
+
+# Edits received but not yet applied – as many as one batch request.
+MAX_PENDING_EDITS = 500
+
+# How long the event forwarder waits before checking it is still subscribed.
+_IDLE_CHECK = 25.0
+
+
+@router.websocket("/ws")
+async def shifts_ws(websocket: WebSocket, schedule_id: int = DEFAULT_SCHEDULE_ID):
+    """Pipelined shift edits with sequenced acks, plus live change events."""
+    try:
+        await run_in_threadpool(schedule_scope, schedule_id)
+    except HTTPException as exc:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, exc.detail)
+    await websocket.accept()
+
+    queue = events.subscribe()
+    _connections.add(websocket)
+    inbox: asyncio.Queue[str] = asyncio.Queue(maxsize=MAX_PENDING_EDITS)
+    lock = asyncio.Lock()
+
+    async def send(message: dict | str) -> None:
+        text = message if isinstance(message, str) else json.dumps(message)
+        async with lock:
+            await websocket.send_text(text)
+
+    tasks = [
+        asyncio.create_task(_apply_edits(inbox, send, schedule_id)),
+        asyncio.create_task(_forward_events(websocket, queue, send, schedule_id)),
+    ]
+    try:
+        while True:
+            try:
+                inbox.put_nowait(await websocket.receive_text())
+            except asyncio.QueueFull:
+                # The client sends faster than edits are applied.
+                async with lock:
+                    await websocket.close(
+                        status.WS_1008_POLICY_VIOLATION, "Too many pending edits"
+                    )
+                break
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        events.unsubscribe(queue)
+        _connections.discard(websocket)
+
+
+async def _apply_edits(inbox: asyncio.Queue, send, schedule_id: int) -> None:
+    while True:
+        batch = [await inbox.get()]
+        while not inbox.empty():
+            batch.append(inbox.get_nowait())
+        WS_EDITS.inc(len(batch))
+        results = await run_in_threadpool(_apply_all, batch, schedule_id)
+        for ack, _ in results:
+            await send(ack)
+        for _, event in results:
+            if event is not None:
+                broadcast(*event)
+
+
+async def _forward_events(
+    websocket: WebSocket, queue: asyncio.Queue, send, schedule_id: int
+) -> None:
+    while True:
+        try:
+            payload = await asyncio.wait_for(queue.get(), timeout=_IDLE_CHECK)
+        except asyncio.TimeoutError:
+            if not events.is_subscribed(queue):
+                # Dropped by the hub for falling behind – the client must
+                # reconnect and reload rather than miss changes silently.
+                await websocket.close(status.WS_1013_TRY_AGAIN_LATER)
+                return
+            continue
+        payload = _for_schedule(payload, schedule_id)
+        if payload is not None:
+            await send(payload)
+
+
+def _for_schedule(payload: str, schedule_id: int) -> str | None:
+    """The part of a hub message that concerns *schedule_id*, or None."""
+    event = json.loads(payload)
+    if event["type"] != "batch":
+        return payload if event.get("schedule_id", schedule_id) == schedule_id else None
+    ours = [e for e in event["events"] if e.get("schedule_id", schedule_id) == schedule_id]
+    if len(ours) == len(event["events"]):
+        return payload
+    if not ours:
+        return None
+    return json.dumps(ours[0] if len(ours) == 1 else events.batch(ours))
+
+
+# ── Applying edits (threadpool) ────────────────────────────────
+
+def _apply_all(batch: list[str], schedule_id: int) -> list[tuple[dict, tuple | None]]:
+    edits, seqs = [], []
+    for message in batch:
+        try:
+            edit = json.loads(message)
+        except ValueError:
+            edit = None
+        edits.append(edit)
+        seqs.append(edit.get("seq") if isinstance(edit, dict) else None)
+    return [
+        ({"type": "ack", "seq": seq, **result}, event)
+        for seq, (result, event) in zip(seqs, apply_edits(edits, schedule_id))
+    ]
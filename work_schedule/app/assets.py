@@ -0,0 +1,136 @@
+"""
+Static UI asset pipeline – fingerprinting, precompression, caching.
+
+Build step (run once at image build time):
+
+    python -m app.assets [ui] [ui-dist]
+
+copies ``app.js`` / ``style.css`` to content-hashed names
+(``app.3f2a9c1b7d0e.js``), writes ``.gz`` and ``.br`` variants next to
+them and rewrites the references in ``index.html``.
+
+``AssetFiles`` then serves hashed files with an immutable cache policy
+and the precompressed variant the client accepts, so reopening the
+panel only revalidates ``index.html``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+from mimetypes import guess_type
+
+import anyio
+import brotli
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from .compression import choose_encoding
+
+# Files referenced from index.html that get fingerprinted.
+HASHED_ASSETS = ("app.js", "style.css")
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[a-z0-9]+$")
+
+
+# ── Build ──────────────────────────────────────────────────────
+
+def build(src_dir: str, out_dir: str) -> dict[str, str]:
+    """
+    Produce a fingerprinted, precompressed copy of *src_dir* in *out_dir*.
+
+    Returns the ``original → hashed`` name manifest (also written to
+    ``manifest.json``).
+    """
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    manifest: dict[str, str] = {}
+    for name in HASHED_ASSETS:
+        with open(os.path.join(src_dir, name), "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{digest}{ext}"
+        _write_variants(os.path.join(out_dir, hashed), content)
+        manifest[name] = hashed
+
+    with open(os.path.join(src_dir, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    for name, hashed in manifest.items():
+        index = index.replace(f'"ui/{name}"', f'"ui/{hashed}"')
+    _write_variants(os.path.join(out_dir, "index.html"), index.encode("utf-8"))
+
+    # Anything else in the UI dir (icons, service worker …) is copied as-is.
+    for name in os.listdir(src_dir):
+        src = os.path.join(src_dir, name)
+        if name in HASHED_ASSETS or name == "index.html" or not os.path.isfile(src):
+            continue
+        shutil.copy2(src, os.path.join(out_dir, name))
+
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _write_variants(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(content, quality=11))
+
+
+# ── Serving ────────────────────────────────────────────────────
+
+class AssetFiles(StaticFiles):
+    """``StaticFiles`` with precompressed variants and cache headers."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = (
+            IMMUTABLE if _HASHED_NAME.search(path) else REVALIDATE
+        )
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Response | None:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return None
+        full_path, stat_result = await anyio.to_thread.run_sync(
+            self.lookup_path, path + PRECOMPRESSED_SUFFIXES[encoding]
+        )
+        if not (stat_result and stat.S_ISREG(stat_result.st_mode)):
+            return None
+        return FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=guess_type(path)[0] or "text/plain",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    src = args[0] if args else "ui"
+    out = args[1] if len(args) > 1 else "ui-dist"
+    for original, hashed in build(src, out).items():
+        print(f"{original} → {hashed}")
@@ -0,0 +1,327 @@
+"""
+Database snapshots – consistent online backups, rotation and restore.
+
+``create_backup`` copies the live database with SQLite's online backup
+API a few hundred pages at a time; the source is only read-locked for one
+step, so writers keep going while a backup runs.  The copy is vacuumed
+(compacted), gzipped and moved into ``BACKUP_DIR`` under a timestamped
+name, and all but the newest ``BACKUP_KEEP`` snapshots are removed.
+
+``restore_backup`` unpacks a snapshot, checks its integrity and schema
+version, migrates it to the current schema and copies it into the live
+database in a single backup step – one write transaction, so readers see
+either the old data or the new, never a mix.  A second write transaction
+then moves data and row versions past every version handed out so far,
+so client caches and ``since`` cursors resync instead of matching stale
+ETags.
+
+``BACKUP_INTERVAL_HOURS`` (add-on option ``backup_interval_hours``)
+starts a background task that takes a snapshot whenever the newest one
+is older than the interval; ``0`` turns it off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import create_engine
+
+from . import cache, migrations, storage
+from .metrics import Gauge, Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKUP_DIR = os.environ.get(
+    "BACKUP_DIR", os.path.join(os.path.dirname(os.path.abspath(storage.DB_PATH)), "backups")
+)
+BACKUP_KEEP = max(1, int(os.environ.get("BACKUP_KEEP", "7")))
+BACKUP_INTERVAL_HOURS = float(os.environ.get("BACKUP_INTERVAL_HOURS", "0"))
+
+# Pages copied per backup step, and the pause that lets writers in between.
+BACKUP_STEP_PAGES = 256
+_STEP_PAUSE = 0.005
+
+_NAME = re.compile(r"^work_schedule-\d{8}-\d{6}-\d{6}\.db\.gz$")
+_lock = threading.Lock()
+
+BACKUP_SECONDS = Histogram(
+    "backup_duration_seconds",
+    "Time taken to write a database snapshot.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class BackupBusy(Exception):
+    """Another backup or restore is running."""
+
+
+class BackupInvalid(Exception):
+    """A snapshot is unreadable, corrupt or from a newer schema."""
+
+
+# ── Snapshots ─────────────────────────────────────────────────
+
+def create_backup() -> dict:
+    """Write a compacted, gzipped snapshot of the live database; return its entry."""
+    if not _lock.acquire(blocking=False):
+        raise BackupBusy("A backup or restore is already running")
+    try:
+        t0 = time.perf_counter()
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        name = datetime.now().strftime("work_schedule-%Y%m%d-%H%M%S-%f.db.gz")
+        copy = _temp_path(".db")
+        try:
+            pages = _copy_live(copy)
+            _compact(copy)
+            _compress(copy, os.path.join(BACKUP_DIR, name))
+        finally:
+            _remove(copy)
+        _rotate()
+        BACKUP_SECONDS.observe(time.perf_counter() - t0)
+        entry = _entry(name)
+        entry["pages"] = pages
+        _LOGGER.info("Wrote backup %s (%d bytes, %d pages)", name, entry["size"], pages)
+        return entry
+    finally:
+        _lock.release()
+
+
+def list_backups() -> list[dict]:
+    """Every snapshot in ``BACKUP_DIR``, newest first."""
+    return [_entry(name) for name in _names()]
+
+
+def backup_path(name: str) -> Optional[str]:
+    """Path of snapshot *name*, or None if there is no such snapshot."""
+    if not _NAME.match(name):
+        return None
+    path = os.path.join(BACKUP_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def _copy_live(target: str) -> int:
+    """Online-backup the live database into *target*; return its page count."""
+    pages = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal pages
+        pages = total
+        # The source is unlocked between steps: give waiting writers a turn.
+        if remaining:
+            time.sleep(_STEP_PAUSE)
+
+    raw = storage._get_engine().raw_connection()
+    try:
+        dst = sqlite3.connect(target)
+        try:
+            raw.driver_connection.backup(dst, pages=BACKUP_STEP_PAGES, progress=progress)
+        finally:
+            dst.close()
+    finally:
+        raw.close()
+    return pages
+
+
+def _compact(path: str) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def _compress(source: str, target: str) -> None:
+    partial = target + ".partial"
+    try:
+        with open(source, "rb") as src, gzip.open(partial, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(partial, target)
+    finally:
+        _remove(partial)
+
+
+def _rotate() -> None:
+    for name in _names()[BACKUP_KEEP:]:
+        _remove(os.path.join(BACKUP_DIR, name))
+
+
+def _names() -> list[str]:
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    # Timestamped names sort chronologically.
+    return sorted((n for n in os.listdir(BACKUP_DIR) if _NAME.match(n)), reverse=True)
+
+
+def _entry(name: str) -> dict:
+    stat = os.stat(os.path.join(BACKUP_DIR, name))
+    return {
+        "name": name,
+        "size": stat.st_size,
+        "created": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+    }
+
+
+def _temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix=".work_schedule-", suffix=suffix, dir=BACKUP_DIR)
+    os.close(fd)
+    return path
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ── Restore ───────────────────────────────────────────────────
+
+def restore_backup(name: str) -> int:
+    """
+    Replace the live data with snapshot *name*; return the new data version.
+
+    Raises FileNotFoundError for an unknown name and BackupInvalid when
+    the snapshot fails validation – the live database is untouched then.
+    """
+    path = backup_path(name)
+    if path is None:
+        raise FileNotFoundError(name)
+    if not _lock.acquire(blocking=False):
+        raise BackupBusy("A backup or restore is already running")
+    try:
+        snapshot = _temp_path(".db")
+        try:
+            _unpack(path, snapshot)
+            _validate(snapshot)
+            _migrate(snapshot)
+            live_version = storage.get_data_version()
+            _copy_into_live(snapshot)
+        finally:
+            _remove(snapshot)
+        # Past every version handed out – also to writes that raced the
+        # copy – in one write transaction, so no old ETag matches.
+        version = storage.restamp_versions(live_version)
+        cache.clear_all()
+        _LOGGER.info("Restored backup %s (data version %d)", name, version)
+        return version
+    finally:
+        _lock.release()
+
+
+def _unpack(source: str, target: str) -> None:
+    try:
+        with gzip.open(source, "rb") as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    except (OSError, EOFError) as exc:
+        raise BackupInvalid(f"Not a gzipped snapshot: {exc}") from exc
+
+
+def _validate(path: str) -> None:
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            tables = {
+                r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            row = None
+            if "meta" in tables:
+                row = conn.execute(
+                    "SELECT value FROM meta WHERE key = ?", (migrations.SCHEMA_VERSION_KEY,)
+                ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as exc:
+        raise BackupInvalid(f"Not a SQLite database: {exc}") from exc
+    if result != "ok":
+        raise BackupInvalid(f"Integrity check failed: {result}")
+    if "shifts" not in tables:
+        raise BackupInvalid("Not a work schedule database")
+    schema = int(row[0]) if row and row[0] else 0
+    latest = max(m.version for m in migrations.MIGRATIONS)
+    if schema > latest:
+        raise BackupInvalid(f"Snapshot schema {schema} is newer than this add-on ({latest})")
+
+
+def _migrate(path: str) -> None:
+    # Older snapshots are brought up to the current schema before swapping in.
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        migrations.upgrade(engine)
+    finally:
+        engine.dispose()
+
+
+def _copy_into_live(path: str) -> None:
+    src = sqlite3.connect(path)
+    try:
+        raw = storage._get_engine().raw_connection()
+        try:
+            # pages=-1: one step, i.e. one write transaction on the live DB.
+            src.backup(raw.driver_connection, pages=-1)
+        finally:
+            raw.close()
+    finally:
+        src.close()
+
+
+# ── Scheduled backups ─────────────────────────────────────────
+
+class BackupTask:
+    """Takes a snapshot whenever the newest is ``BACKUP_INTERVAL_HOURS`` old."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if BACKUP_INTERVAL_HOURS > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        interval = BACKUP_INTERVAL_HOURS * 3600
+        while True:
+            await asyncio.sleep(max(0.0, interval - _newest_age(interval)))
+            try:
+                await asyncio.to_thread(create_backup)
+            except BackupBusy:
+                # A manual backup or a restore is running; look again shortly.
+                await asyncio.sleep(60)
+            except Exception:
+                _LOGGER.exception("Scheduled backup failed")
+                await asyncio.sleep(min(interval, 3600))
+
+
+def _newest_age(default: float) -> float:
+    """Seconds since the newest snapshot was written (*default* if none)."""
+    names = _names()
+    if not names:
+        return default
+    return time.time() - os.stat(os.path.join(BACKUP_DIR, names[0])).st_mtime
+
+
+backup_task = BackupTask()
+
+BACKUPS_STORED = Gauge(
+    "backups_stored", "Database snapshots kept in the backup directory.",
+    fn=lambda: len(_names()),
+)
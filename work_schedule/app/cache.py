@@ -0,0 +1,80 @@
+"""
+Small in-process caches keyed by the schedule data version.
+
+Every shift write bumps ``storage.get_data_version()``; a cache entry is
+only served while the version it was computed for is still current, so
+derived results (statistics, view models …) never need explicit
+invalidation.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from .metrics import Counter
+
+# Every cache created in-process, for bulk reset and introspection.
+_caches: list["VersionedCache"] = []
+
+
+class VersionedCache:
+    """LRU mapping of ``key → value`` valid for a single data version."""
+
+    def __init__(self, name: str, maxsize: int = 64) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._version: int | None = None
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get_or_compute(
+        self, key: Hashable, version: int, compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached value for *key*, computing it on a miss."""
+        with self._lock:
+            if version != self._version:
+                # Data changed – every entry is stale now.
+                self._entries.clear()
+                self._version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = value
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+def clear_all() -> None:
+    """Drop every cached entry (e.g. after swapping the database)."""
+    for cache in _caches:
+        cache.clear()
+
+
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Versioned cache hits.",
+    fn=lambda: {(("cache", c.name),): c.hits for c in _caches},
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Versioned cache misses.",
+    fn=lambda: {(("cache", c.name),): c.misses for c in _caches},
+)
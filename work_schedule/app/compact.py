@@ -0,0 +1,53 @@
+"""
+Compact shift encodings for long date ranges.
+
+Shift times are omitted – they are fully determined by the type
+(``SHIFT_TYPES``).
+
+• *columns* – ``{"date": [...], "type": [...]}`` (one array per field,
+  types by name)
+• *days*    – ``{"start": …, "end": …, "types": [...], "days": [code, …]}``
+  with one ``SHIFT_CODES`` integer per calendar day, 0 meaning
+  "no shift"; ``types`` maps codes back to names
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from .shifts import SHIFT_CODES, SHIFT_CODE_NAMES
+
+COLUMNS_MEDIA_TYPE = "application/vnd.work-schedule.columns+json"
+DAYS_MEDIA_TYPE = "application/vnd.work-schedule.days+json"
+
+# Longest range the days form covers – its size grows with the span, not
+# with the number of shifts.
+MAX_DAYS = 1100
+
+
+def to_columns(rows: list[dict]) -> dict:
+    """Return shift rows as parallel ``date`` / ``type`` arrays."""
+    return {
+        "date": [r["date"] for r in rows],
+        "type": [r["type"] for r in rows],
+    }
+
+
+def to_days(rows: list[dict], start: date, end: date) -> dict:
+    """Return shift rows as a per-day code array covering ``[start, end]``."""
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "types": SHIFT_CODE_NAMES,
+        "days": day_codes(rows, start, end),
+    }
+
+
+def day_codes(rows: list[dict], start: date, end: date) -> list[int]:
+    """Return one shift code per day in ``[start, end]`` (0 = no shift)."""
+    codes = [0] * max((end - start).days + 1, 0)
+    for r in rows:
+        index = (date.fromisoformat(r["date"]) - start).days
+        if 0 <= index < len(codes):
+            codes[index] = SHIFT_CODES.get(r["type"], 0)
+    return codes
@@ -0,0 +1,112 @@
+"""
+Response compression – Brotli or gzip for complete response bodies.
+
+Only single-message bodies above a size threshold are compressed.
+Streaming responses (the SSE feed, large file transfers) pass through
+untouched so events are never held back in a compressor buffer, and so
+do bodies that are already encoded or of an already-compressed type
+(archives, images, WOFF2 fonts, backup downloads).
+"""
+
+from __future__ import annotations
+
+import gzip
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Media types whose bodies are already compressed; ``/`` entries are prefixes.
+INCOMPRESSIBLE_TYPES = ("application/gzip", "application/zip", "font/woff2", "image/")
+# ...except this one, which is text.
+_SVG = "image/svg+xml"
+
+
+class CompressionMiddleware:
+    """Compress responses with ``br`` (preferred) or ``gzip``."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Hold the headers back until we know the body size.
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                # Later chunks of a streaming (uncompressed) response.
+                await send(message)
+                return
+
+            initial, start = start, None
+            headers = MutableHeaders(raw=initial["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not compressible(headers.get("content-type", ""))
+            ):
+                await send(initial)
+                await send(message)
+                return
+
+            body = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(initial)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+def compressible(content_type: str) -> bool:
+    """Whether a body of *content_type* is worth compressing."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type == _SVG:
+        return True
+    return not any(
+        media_type.startswith(t) if t.endswith("/") else media_type == t
+        for t in INCOMPRESSIBLE_TYPES
+    )
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header value."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip())
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return None
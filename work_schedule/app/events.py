@@ -1,76 +1,167 @@
 """Server-Sent Events (SSE) broadcast hub.
 
 Allows any number of connected clients to receive real-time updates
-when shifts are created, modified, or deleted.
+when shifts are created, modified, or deleted.  WebSocket clients
+(``api.ws``) subscribe to the same hub.
+
+Events are batched per subscriber: the first event opens a window of
+``EVENT_BATCH_MS`` (add-on option ``event_batch_ms``, default 100; 0
+sends at once), and everything that arrives before it closes goes out as
+one message – the event itself if it was alone, otherwise::
+
+    {"type": "batch", "ts": …, "dates": ["2026-06-01", …], "events": [{…}, …]}
+
+so a 30-cell paint costs each client one refresh, not 30.
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
+import os
 import time
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi import APIRouter
 from starlette.responses import StreamingResponse
 
+from .metrics import Counter, Gauge
+
 router = APIRouter(tags=["events"])
 
-# ── Subscriber registry ─────────────────────────────────────────
+EVENT_BATCH_MS = float(os.environ.get("EVENT_BATCH_MS", "100"))
 
-_subscribers: list[asyncio.Queue] = []
 
+# ── Subscriber registry ─────────────────────────────────────────
 
-def broadcast(event_type: str = "refresh", data: dict | None = None):
-    """Push an event to every connected SSE client."""
-    payload = json.dumps({
-        "type": event_type,
-        "ts": time.time(),
-        **(data or {}),
-    })
-    dead: list[asyncio.Queue] = []
-    for q in _subscribers:
+class _Subscriber:
+    """A client's queue plus the events waiting for its next flush."""
+
+    def __init__(self, queue: asyncio.Queue, loop: Optional[asyncio.AbstractEventLoop]):
+        self.queue = queue
+        # None outside an event loop (tests, scripts): no batching then.
+        self.loop = loop
+        self.window = EVENT_BATCH_MS / 1000
+        self.pending: list[dict] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def push(self, event: dict) -> None:
+        """Queue *event* for this subscriber; safe from any thread."""
+        if self.loop is None:
+            self._deliver([event])
+            return
         try:
-            q.put_nowait(payload)
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._add(event)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._add, event)
+            except RuntimeError:    # loop closed – the client is gone
+                unsubscribe(self.queue)
+
+    def _add(self, event: dict) -> None:
+        self.pending.append(event)
+        if self.window <= 0:
+            self.flush()
+        elif self.timer is None:
+            self.timer = self.loop.call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        self.timer = None
+        events, self.pending = self.pending, []
+        if events:
+            self._deliver(events)
+
+    def _deliver(self, events: list[dict]) -> None:
+        message = events[0] if len(events) == 1 else batch(events)
+        try:
+            self.queue.put_nowait(json.dumps(message))
         except asyncio.QueueFull:
-            dead.append(q)
-    for q in dead:
-        _subscribers.remove(q)
+            if _subscribers.pop(self.queue, None) is not None:
+                SSE_DROPPED.inc()
+
+    def cancel(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+def batch(events: list[dict]) -> dict:
+    """One message standing for several events."""
+    return {
+        "type": "batch",
+        "ts": events[-1]["ts"],
+        "dates": sorted({e["date"] for e in events if e.get("date")}),
+        "events": events,
+    }
+
+
+_subscribers: dict[asyncio.Queue, _Subscriber] = {}
+
+SSE_SUBSCRIBERS = Gauge(
+    "sse_subscribers",
+    "Connected event subscribers (SSE and WebSocket).",
+    fn=lambda: len(_subscribers),
+)
+SSE_DROPPED = Counter(
+    "sse_dropped_queues_total", "SSE clients dropped because their queue was full."
+)
+SSE_EVENTS = Counter("sse_events_total", "Events broadcast to SSE clients.")
+
+
+def subscribe(maxsize: int = 64) -> asyncio.Queue:
+    """
+    Register a queue that receives every broadcast payload (JSON text).
+    Called from a running event loop, payloads are batched on that loop.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    _subscribers[queue] = _Subscriber(queue, loop)
+    return queue
 
 
-async def _event_stream(queue: asyncio.Queue) -> AsyncGenerator[str, None]:
-    """Yield SSE-formatted messages from a per-client queue."""
-    try:
-        # Initial keepalive so the browser sees the connection is open
-        yield ": connected\n\n"
-        while True:
-            payload = await asyncio.wait_for(queue.get(), timeout=25)
-            yield f"data: {payload}\n\n"
-    except asyncio.TimeoutError:
-        # Send a keepalive comment every ~25 s to prevent proxy timeouts
-        yield ": keepalive\n\n"
-    except asyncio.CancelledError:
-        return
-    finally:
-        if queue in _subscribers:
-            _subscribers.remove(queue)
+def unsubscribe(queue: asyncio.Queue) -> None:
+    subscriber = _subscribers.pop(queue, None)
+    if subscriber is not None:
+        subscriber.cancel()
+
+
+def is_subscribed(queue: asyncio.Queue) -> bool:
+    """False once the hub has dropped *queue* for falling behind."""
+    return queue in _subscribers
+
+
+def broadcast(event_type: str = "refresh", data: dict | None = None):
+    """Push an event to every connected client; callable from any thread."""
+    event = {"type": event_type, "ts": time.time(), **(data or {})}
+    SSE_EVENTS.inc(type=event_type)
+    for subscriber in list(_subscribers.values()):
+        subscriber.push(event)
 
 
 async def _sse_generator(queue: asyncio.Queue) -> AsyncGenerator[str, None]:
-    """Wraps _event_stream with infinite reconnect-safe loop."""
+    """Yield SSE messages from a client's queue until the hub drops it."""
     try:
         yield ": connected\n\n"
-        while True:
+        while is_subscribed(queue):
             try:
                 payload = await asyncio.wait_for(queue.get(), timeout=25)
                 yield f"data: {payload}\n\n"
             except asyncio.TimeoutError:
+                # Keepalive comment so proxies don't time the stream out
                 yield ": keepalive\n\n"
+        # Dropped for falling behind: end the stream, so the browser's
+        # EventSource reconnects and the client resyncs.
     except asyncio.CancelledError:
         pass
     finally:
-        if queue in _subscribers:
-            _subscribers.remove(queue)
+        unsubscribe(queue)
 
 
 # ── SSE endpoint ────────────────────────────────────────────────
@@ -78,8 +169,7 @@ async def _sse_generator(queue: asyncio.Queue) -> AsyncGenerator[str, None]:
 @router.get("/api/events")
 async def sse_events():
     """SSE stream – clients listen here for live updates."""
-    queue: asyncio.Queue = asyncio.Queue(maxsize=64)
-    _subscribers.append(queue)
+    queue = subscribe()
     return StreamingResponse(
         _sse_generator(queue),
         media_type="text/event-stream",
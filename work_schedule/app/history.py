@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+from typing import Optional
+
 from . import storage
+from .models import DEFAULT_SCHEDULE_ID
 
 
-def get_formatted_history(limit: int = 50) -> list[dict]:
-    """Return history entries formatted for the API."""
-    raw = storage.get_history(limit=limit)
+def get_formatted_history(
+    limit: int = 50,
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+    before: Optional[int] = None,
+) -> list[dict]:
+    """Return a schedule's history entries formatted for the API."""
+    raw = storage.get_history(limit=limit, schedule_id=schedule_id, before=before)
     out = []
     for entry in raw:
         out.append(
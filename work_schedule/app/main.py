@@ -8,23 +8,51 @@ Run standalone:
 from __future__ import annotations
 
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from .api.shifts import router as shifts_router
+from .api.edits import router as edits_router
 from .api.history import router as history_router
 from .api.ha import router as ha_router
+from .api.stats import router as stats_router
+from .api.views import router as views_router
+from .api.schedules import SCOPED_PREFIXES, router as schedules_router
+from .api.backups import router as backups_router
+from .api.ws import router as ws_router
 from .events import router as events_router
+from .metrics import MetricsMiddleware, router as metrics_router
+from . import profiling
+from .compression import CompressionMiddleware
+from .assets import AssetFiles, REVALIDATE
+from .warmup import warm_up
+from .scheduler import scheduler
+from .backup import backup_task
 
 MODE = os.environ.get("MODE", "standalone")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking on purpose: uvicorn only starts accepting once this returns,
+    # so the first sensor poll gets a warm engine.
+    warm_up()
+    scheduler.start()
+    backup_task.start()
+    yield
+    await backup_task.stop()
+    await scheduler.stop()
+
+
 app = FastAPI(
     title="Work Schedule",
     version="1.0.0",
     description="Shift manager with undo, diff history, and HA integration",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # ── CORS (allow everything in dev / standalone) ─────────────
@@ -36,21 +64,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Compression (Brotli / gzip for bodies ≥ 1 KiB, never SSE) ──
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# ── Profiling (opt-in: PROFILE=1) – Server-Timing + slow-query log ──
+if profiling.PROFILE:
+    profiling.install()
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# ── Metrics (outermost, so latency covers the whole stack) ──
+app.add_middleware(MetricsMiddleware)
+
 # ── API routers ─────────────────────────────────────────────
-app.include_router(shifts_router)
-app.include_router(history_router)
-app.include_router(ha_router)
+# Per-schedule routers serve /api/… (default schedule) and
+# /api/schedules/{schedule_id}/….
+for prefix in SCOPED_PREFIXES:
+    for router in (
+        shifts_router, edits_router, history_router, ha_router, stats_router, views_router,
+        ws_router,
+    ):
+        app.include_router(router, prefix=prefix)
+app.include_router(schedules_router)
+app.include_router(backups_router)
 app.include_router(events_router)
+app.include_router(metrics_router)
 
 # ── Static UI files ─────────────────────────────────────────
-UI_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui")
+# Prefer the fingerprinted build (``python -m app.assets``), fall back to
+# the raw sources during development.
+APP_DIR = os.path.dirname(os.path.dirname(__file__))
+UI_DIR = os.path.join(APP_DIR, "ui-dist")
+if not os.path.isdir(UI_DIR):
+    UI_DIR = os.path.join(APP_DIR, "ui")
 
 if os.path.isdir(UI_DIR):
-    app.mount("/ui", StaticFiles(directory=UI_DIR, html=True), name="ui")
+    app.mount("/ui", AssetFiles(directory=UI_DIR, html=True), name="ui")
 
     @app.get("/", include_in_schema=False)
     def root():
-        return FileResponse(os.path.join(UI_DIR, "index.html"))
+        # Always revalidated – it points at the current hashed assets.
+        return FileResponse(
+            os.path.join(UI_DIR, "index.html"),
+            headers={"Cache-Control": REVALIDATE},
+        )
+
+    @app.get("/sw.js", include_in_schema=False)
+    def service_worker():
+        # Served from the app root so its scope covers the whole UI.
+        return FileResponse(
+            os.path.join(UI_DIR, "sw.js"),
+            media_type="text/javascript",
+            headers={"Cache-Control": REVALIDATE},
+        )
 else:
     @app.get("/", include_in_schema=False)
     def root():
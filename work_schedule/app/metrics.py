@@ -0,0 +1,195 @@
+"""
+Prometheus-style metrics – in-process counters, gauges and histograms.
+
+Hot paths only touch a dict entry under an uncontended lock; everything
+that needs a query or a scan (history size, cache ratios, SSE clients)
+is computed lazily when ``/metrics`` is scraped.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+router = APIRouter(tags=["metrics"])
+
+PREFIX = "work_schedule_"
+
+LabelValues = tuple[tuple[str, str], ...]
+
+_registry: list["_Metric"] = []
+
+
+def _labels(labels: dict[str, str]) -> LabelValues:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: LabelValues, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(str(v))}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = PREFIX + name
+        self.help = help
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _Scalar(_Metric):
+    """One value per label set – stored, or read from *fn* at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], float | dict[LabelValues, float]] | None = None,
+    ) -> None:
+        super().__init__(name, help)
+        self._fn = fn
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        if self._fn is not None:
+            value = self._fn()
+            items = list(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for labels, v in items:
+            yield f"{self.name}{_format_labels(labels)} {v}"
+
+
+class Counter(_Scalar):
+    kind = "counter"
+
+
+class Gauge(_Scalar):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    )
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # labels → [per-bucket counts…, +Inf count, sum]
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for labels, row in items:
+            cumulative = 0
+            bounds = [str(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, row):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {row[-1]}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+def render() -> str:
+    """Return every registered metric in the Prometheus text format."""
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Request instrumentation ────────────────────────────────────
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers are sent, per route.",
+)
+REQUESTS = Counter("http_requests_total", "Handled HTTP requests.")
+
+
+class MetricsMiddleware:
+    """Record per-route latency (time to first byte) and status codes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                path = getattr(route, "path", None) or _mount_path(scope)
+                method = scope["method"]
+                REQUEST_LATENCY.observe(time.perf_counter() - t0, method=method, route=path)
+                REQUESTS.inc(method=method, route=path, status=str(message["status"]))
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
+
+def _mount_path(scope: Scope) -> str:
+    # Static mounts have no route object – report the mount prefix only so
+    # hashed file names don't explode the label set.
+    return "/ui" if scope["path"].startswith("/ui") else "other"
+
+
+# ── Endpoint ───────────────────────────────────────────────────
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,253 @@
+"""
+Schema migrations – ordered steps, version kept in the ``meta`` table.
+
+``upgrade(engine)`` runs every step newer than ``meta.schema_version`` at
+startup.  A plain step runs inside one ``BEGIN IMMEDIATE`` transaction
+together with the version bump, so a failure leaves the schema untouched.
+
+Long data rewrites use ``@batched_migration``: the step is called
+repeatedly with a cursor and commits after every batch, persisting the
+cursor in ``meta`` so writers get the lock between batches and an
+interrupted run resumes where it stopped.
+
+Steps use frozen SQL – never the current models – so they keep
+describing the schema as it was when they were written.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+_PROGRESS_KEY = "migration_progress:{version}"
+
+
+@dataclass
+class Migration:
+    """A single schema step; *batch_size* is set for batched steps."""
+
+    version: int
+    name: str
+    fn: Callable
+    batch_size: int | None = None
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Register ``fn(conn)`` as schema step *version*."""
+    def decorator(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+    return decorator
+
+
+def batched_migration(version: int, name: str, batch_size: int = 500):
+    """
+    Register ``fn(conn, cursor, batch_size) -> cursor | None`` as a batched
+    step.  *cursor* starts as ``None``; return ``None`` once done.
+    Cursors must be JSON-serializable.
+    """
+    def decorator(fn: Callable[[Connection, Any, int], Any]):
+        MIGRATIONS.append(Migration(version, name, fn, batch_size))
+        return fn
+    return decorator
+
+
+# ── Runner ─────────────────────────────────────────────────────
+
+def upgrade(engine: Engine, steps: list[Migration] | None = None) -> int:
+    """Apply pending steps in order; return the resulting schema version."""
+    steps = sorted(MIGRATIONS if steps is None else steps, key=lambda m: m.version)
+    current = get_version(engine)
+    for step in steps:
+        if step.version <= current:
+            continue
+        if step.batch_size is None:
+            with _transaction(engine) as conn:
+                # Another process (worker, overlapping restart) may have
+                # applied it since the version was read: check under the lock.
+                if _read_version(conn) < step.version:
+                    _LOGGER.info("Applying schema migration %s (%s)", step.version, step.name)
+                    step.fn(conn)
+                    _set_meta(conn, SCHEMA_VERSION_KEY, str(step.version))
+        else:
+            _LOGGER.info("Applying schema migration %s (%s)", step.version, step.name)
+            _run_batched(engine, step)
+        current = step.version
+    return current
+
+
+def get_version(engine: Engine) -> int:
+    """Return the applied schema version (0 for a new or pre-versioning DB)."""
+    with engine.connect() as conn:
+        return _read_version(conn)
+
+
+def _read_version(conn: Connection) -> int:
+    has_meta = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'")
+    ).first()
+    if not has_meta:
+        return 0
+    value = _get_meta(conn, SCHEMA_VERSION_KEY)
+    return int(value) if value else 0
+
+
+def _run_batched(engine: Engine, step: Migration) -> None:
+    progress_key = _PROGRESS_KEY.format(version=step.version)
+    while True:
+        with _transaction(engine) as conn:
+            if _read_version(conn) >= step.version:
+                return
+            stored = _get_meta(conn, progress_key)
+            cursor = json.loads(stored) if stored else None
+            cursor = step.fn(conn, cursor, step.batch_size)
+            if cursor is None:
+                conn.execute(text("DELETE FROM meta WHERE key = :k"), {"k": progress_key})
+                _set_meta(conn, SCHEMA_VERSION_KEY, str(step.version))
+                return
+            _set_meta(conn, progress_key, json.dumps(cursor))
+
+
+class _transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT`` – DDL included (pysqlite won't)."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def __enter__(self) -> Connection:
+        self.conn = self.engine.connect()
+        self.conn.exec_driver_sql("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+
+
+def _get_meta(conn: Connection, key: str) -> str | None:
+    row = conn.execute(text("SELECT value FROM meta WHERE key = :k"), {"k": key}).first()
+    return row[0] if row else None
+
+
+def _set_meta(conn: Connection, key: str, value: str) -> None:
+    conn.execute(
+        text(
+            "INSERT INTO meta (key, value) VALUES (:k, :v) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+        ),
+        {"k": key, "v": value},
+    )
+
+
+# ── Steps ──────────────────────────────────────────────────────
+
+@migration(1, "initial schema")
+def _initial_schema(conn: Connection) -> None:
+    # The 1.0 layout; IF NOT EXISTS adopts databases created before
+    # schema versioning existed.
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS shifts ('
+        'date TEXT NOT NULL, type TEXT NOT NULL, start TEXT NOT NULL, '
+        '"end" TEXT NOT NULL, PRIMARY KEY (date))'
+    )
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS history ("
+        "id INTEGER NOT NULL, timestamp TEXT NOT NULL, date TEXT NOT NULL, "
+        "patch TEXT NOT NULL, description TEXT, PRIMARY KEY (id))"
+    )
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT NOT NULL, value TEXT, PRIMARY KEY (key))"
+    )
+
+
+@migration(2, "shifts keyed by epoch day")
+def _shifts_epoch_day(conn: Connection) -> None:
+    conn.exec_driver_sql("ALTER TABLE shifts RENAME TO shifts_legacy")
+    conn.exec_driver_sql(
+        "CREATE TABLE shifts (day INTEGER NOT NULL, code INTEGER NOT NULL, "
+        "PRIMARY KEY (day)) WITHOUT ROWID"
+    )
+    # 1.0 stored any date string; only real YYYY-MM-DD dates convert.
+    valid = "type IN ('day8', 'day12', 'night12') AND date(date, '+0 days') IS date"
+    conn.exec_driver_sql(
+        "INSERT INTO shifts (day, code) "
+        "SELECT CAST(julianday(date) - 2440587.5 AS INTEGER), "
+        "CASE type WHEN 'day8' THEN 1 WHEN 'day12' THEN 2 WHEN 'night12' THEN 3 END "
+        f"FROM shifts_legacy WHERE {valid}"
+    )
+    conn.exec_driver_sql(f"DELETE FROM shifts_legacy WHERE {valid}")
+    # Rows with unknown types or invalid dates are kept aside, not lost.
+    rejected = conn.exec_driver_sql("SELECT date, type FROM shifts_legacy").all()
+    if not rejected:
+        conn.exec_driver_sql("DROP TABLE shifts_legacy")
+        return
+    for date, shift_type in rejected:
+        _LOGGER.warning("Shift %r (%r) can't be converted", date, shift_type)
+    conn.exec_driver_sql("ALTER TABLE shifts_legacy RENAME TO shifts_legacy_rejected")
+    _LOGGER.warning(
+        "Schema migration 2: %d shift rows kept in shifts_legacy_rejected", len(rejected)
+    )
+
+
+@migration(3, "index history by date")
+def _history_date_index(conn: Connection) -> None:
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_history_date ON history (date)")
+
+
+@migration(4, "multiple schedules")
+def _multiple_schedules(conn: Connection) -> None:
+    # AUTOINCREMENT: a deleted schedule's id is never handed out again.
+    conn.exec_driver_sql(
+        "CREATE TABLE schedules (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+        "name TEXT NOT NULL, UNIQUE (name))"
+    )
+    conn.exec_driver_sql("INSERT INTO schedules (id, name) VALUES (1, 'default')")
+    # Existing shifts and history belong to the default schedule.
+    conn.exec_driver_sql("ALTER TABLE shifts RENAME TO shifts_single")
+    conn.exec_driver_sql(
+        "CREATE TABLE shifts (schedule_id INTEGER NOT NULL, day INTEGER NOT NULL, "
+        "code INTEGER NOT NULL, PRIMARY KEY (schedule_id, day)) WITHOUT ROWID"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO shifts (schedule_id, day, code) SELECT 1, day, code FROM shifts_single"
+    )
+    conn.exec_driver_sql("DROP TABLE shifts_single")
+    conn.exec_driver_sql(
+        "ALTER TABLE history ADD COLUMN schedule_id INTEGER NOT NULL DEFAULT 1"
+    )
+    conn.exec_driver_sql("CREATE INDEX ix_history_schedule ON history (schedule_id, id)")
+
+
+@migration(5, "shift row versions")
+def _shift_versions(conn: Connection) -> None:
+    conn.exec_driver_sql("ALTER TABLE shifts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+@migration(6, "shift change log")
+def _change_log(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE TABLE changes (version INTEGER NOT NULL, schedule_id INTEGER NOT NULL, "
+        "day INTEGER NOT NULL, PRIMARY KEY (version))"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX ix_changes_schedule ON changes (schedule_id, version, day)"
+    )
+    # Writes before this point were not logged: older versions must resync.
+    _set_meta(conn, "changes_floor", _get_meta(conn, "data_version") or "0")
+
@@ -1,29 +1,79 @@
 """SQLAlchemy models for Work Schedule."""
 
-from sqlalchemy import Column, Text, Integer, create_engine
+from datetime import date as Date
+
+from sqlalchemy import Column, Index, Text, Integer, create_engine
 from sqlalchemy.orm import DeclarativeBase, Session
 
+from .shift_types import SHIFT_CODE_NAMES, SHIFT_TYPES
+
+_EPOCH_ORDINAL = Date(1970, 1, 1).toordinal()
+
+# Created by the migrations; the unscoped ``/api`` routes act on it.
+DEFAULT_SCHEDULE_ID = 1
+
+
+def epoch_day(iso_date: str) -> int:
+    """``"YYYY-MM-DD"`` → days since 1970-01-01.  Raises ValueError."""
+    return Date.fromisoformat(iso_date).toordinal() - _EPOCH_ORDINAL
+
+
+def iso_date(day: int) -> str:
+    """Days since 1970-01-01 → ``"YYYY-MM-DD"``."""
+    return Date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class Schedule(Base):
+    """One person's (or team's) rota."""
+
+    __tablename__ = "schedules"
+    # Ids of deleted schedules are never reused.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(Text, nullable=False, unique=True)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name}
+
+
 class Shift(Base):
-    """Single work-day entry."""
+    """
+    Single work-day entry.
+
+    Keyed by (schedule, epoch day) in a ``WITHOUT ROWID`` table, so each
+    schedule's rows are stored together in date order and range scans walk
+    the primary key directly – however many schedules exist.  Start/end
+    times are not stored – they follow from the type.
+    """
 
     __tablename__ = "shifts"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    schedule_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Integer, primary_key=True, autoincrement=False, comment="days since 1970-01-01")
+    code = Column(Integer, nullable=False, comment="SHIFT_CODES value")
+    # The data version of the write that produced this row; data versions
+    # only grow, so a deleted and re-created shift never reuses one.
+    version = Column(Integer, nullable=False, server_default="0")
 
-    date = Column(Text, primary_key=True, comment="YYYY-MM-DD")
-    type = Column(Text, nullable=False, comment="day8 | day12 | night12")
-    start = Column(Text, nullable=False, comment="HH:MM")
-    end = Column(Text, nullable=False, comment="HH:MM")
+    @property
+    def type(self) -> str:
+        return SHIFT_CODE_NAMES[self.code]
 
     def to_dict(self) -> dict:
+        shift_type = self.type
+        times = SHIFT_TYPES.get(shift_type, {})
         return {
-            "date": self.date,
-            "type": self.type,
-            "start": self.start,
-            "end": self.end,
+            "date": iso_date(self.day),
+            "type": shift_type,
+            "start": times.get("start", ""),
+            "end": times.get("end", ""),
+            "version": self.version,
         }
 
 
@@ -31,16 +81,20 @@ class History(Base):
     """Audit / diff log entry."""
 
     __tablename__ = "history"
+    # Per-schedule undo stack: newest entry of a schedule is one index seek.
+    __table_args__ = (Index("ix_history_schedule", "schedule_id", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    schedule_id = Column(Integer, nullable=False, server_default="1")
     timestamp = Column(Text, nullable=False, comment="ISO-8601")
-    date = Column(Text, nullable=False, comment="affected date")
+    date = Column(Text, nullable=False, index=True, comment="affected date")
     patch = Column(Text, nullable=False, comment="JSON Patch string")
     description = Column(Text, nullable=True, comment="human-readable change")
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
+            "schedule_id": self.schedule_id,
             "timestamp": self.timestamp,
             "date": self.date,
             "patch": self.patch,
@@ -48,6 +102,21 @@ class History(Base):
         }
 
 
+class Change(Base):
+    """
+    Change log: one row per shift write, keyed by the data version it
+    produced.  ``/api/changes`` reads the days written after a version
+    from ``ix_changes_schedule``; old rows are pruned (see storage).
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = (Index("ix_changes_schedule", "schedule_id", "version", "day"),)
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    schedule_id = Column(Integer, nullable=False)
+    day = Column(Integer, nullable=False, comment="days since 1970-01-01")
+
+
 class Meta(Base):
     """Key-value store for internal metadata."""
 
@@ -0,0 +1,127 @@
+"""
+Opt-in request profiling – query timing, Server-Timing header, slow-query log.
+
+Enable with ``PROFILE=1`` (add-on option ``profile``).  Every response then
+carries a ``Server-Timing`` header such as
+
+    Server-Timing: db;dur=4.21;desc="9 queries, 4 sessions", app;dur=6.80
+
+so browser dev tools show how much of a request was spent in SQLite
+(``db``) versus ORM hydration, validation and serialization (the rest of
+``app``).  Statements slower than ``SLOW_QUERY_MS`` (default 100) are
+logged with their parameters.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE = os.environ.get("PROFILE", "").lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    sessions: int = 0
+    db_seconds: float = 0.0
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+_installed = False
+
+
+# ── SQLAlchemy hooks ───────────────────────────────────────────
+
+def install() -> None:
+    """Attach the timing listeners to every engine / session (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Session, "after_begin", _after_begin)
+    _installed = True
+
+
+def uninstall() -> None:
+    """Detach the listeners ``install`` attached (idempotent)."""
+    global _installed
+    if not _installed:
+        return
+    event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.remove(Session, "after_begin", _after_begin)
+    _installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.queries += 1
+        profile.db_seconds += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _LOGGER.warning(
+            "Slow query (%.1f ms): %s %r", elapsed * 1000, " ".join(statement.split()), parameters
+        )
+
+
+def _after_begin(session, transaction, connection):
+    profile = _current.get()
+    if profile is not None:
+        profile.sessions += 1
+
+
+# ── Middleware ─────────────────────────────────────────────────
+
+class ProfilingMiddleware:
+    """Collect per-request DB statistics and report them as Server-Timing."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        t0 = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(profile, time.perf_counter() - t0))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+def server_timing(profile: RequestProfile, total_seconds: float) -> str:
+    """Format a profile as a ``Server-Timing`` header value."""
+    return (
+        f'db;dur={profile.db_seconds * 1000:.2f};'
+        f'desc="{profile.queries} queries, {profile.sessions} sessions", '
+        f"app;dur={total_seconds * 1000:.2f}"
+    )
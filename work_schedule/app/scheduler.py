@@ -0,0 +1,267 @@
+"""
+Shift reminders – ``shift_starting`` / ``shift_ending`` events ahead of time.
+
+A min-heap holds one entry per (shift boundary, lead time), ordered by
+when it should fire.  Changing a date never searches the heap: ``touch``
+gives the date a new generation and pushes fresh entries, and entries
+with any other generation are skipped when they surface (lazy
+invalidation).  Generations are never reused, so a date is forgotten
+once it has no live entries left.  Every
+update is O(log n); the heap is rebuilt once stale entries outnumber
+live ones.
+
+Lead times come from ``REMINDER_MINUTES`` (add-on option
+``reminder_minutes``), e.g. ``"60,15"``; ``0`` fires at the boundary
+itself.  Shift times are wall-clock times in the add-on's local zone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, NamedTuple
+
+from . import storage
+from .events import broadcast
+from .metrics import Gauge
+from .models import DEFAULT_SCHEDULE_ID
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _parse_minutes(value: str) -> tuple[int, ...]:
+    return tuple(sorted({int(v) for v in value.split(",") if v.strip()}, reverse=True))
+
+
+REMINDER_MINUTES = _parse_minutes(os.environ.get("REMINDER_MINUTES", "60"))
+
+# Longest possible gap between a shift's date and its end (night shifts).
+_MAX_SPAN = timedelta(days=1)
+# Re-check the clock at least this often (wall-clock jumps, DST).
+_MAX_SLEEP = 300.0
+
+
+class Reminder(NamedTuple):
+    fire_at: datetime
+    seq: int
+    generation: int
+    event_type: str
+    schedule_id: int
+    date: str
+    shift_type: str
+    at: datetime
+    lead: int
+
+    def payload(self) -> dict:
+        return {
+            "schedule_id": self.schedule_id,
+            "date": self.date,
+            "shift_type": self.shift_type,
+            "at": self.at.strftime("%Y-%m-%dT%H:%M"),
+            "lead_minutes": self.lead,
+        }
+
+
+def shift_bounds(shift: dict) -> tuple[datetime, datetime]:
+    """Naive local start/end of a shift; night shifts end the next day."""
+    day = date.fromisoformat(shift["date"])
+    start = datetime.combine(day, datetime.strptime(shift["start"], "%H:%M").time())
+    end = datetime.combine(day, datetime.strptime(shift["end"], "%H:%M").time())
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+class ShiftScheduler:
+    """Heap of upcoming reminders, kept in step with the shift table."""
+
+    def __init__(
+        self,
+        leads: tuple[int, ...] = REMINDER_MINUTES,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.leads = leads
+        self.clock = clock
+        self._heap: list[Reminder] = []
+        # Keyed by (schedule_id, date), only while the date has live entries.
+        self._generation: dict[tuple[int, str], int] = {}
+        self._live: dict[tuple[int, str], int] = {}   # queued entries of the current generation
+        self._generations = 0
+        self._seq = 0
+        self._stale = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return sum(self._live.values())
+
+    # ── Building / updating ───────────────────────────────────
+
+    def load(self) -> None:
+        """(Re)build the heap from every shift that can still fire."""
+        now = self.clock()
+        # Yesterday's night shift may not have ended yet.
+        date_from = (now - _MAX_SPAN).date().isoformat()
+        schedules = [s["id"] for s in storage.list_schedules()]
+        shifts = {sid: storage.get_shifts(date_from, "9999-12-31", sid) for sid in schedules}
+        with self._lock:
+            self._heap = []
+            self._generation = {}
+            self._live = {}
+            self._stale = 0
+            for sid, rows in shifts.items():
+                for shift in rows:
+                    reminders = self._reminders(shift, sid, 0, now)
+                    if reminders:
+                        self._heap.extend(reminders)
+                        self._generation[sid, shift["date"]] = 0
+                        self._live[sid, shift["date"]] = len(reminders)
+            heapq.heapify(self._heap)
+            self._loaded = True
+
+    def touch(self, date: str, schedule_id: int = DEFAULT_SCHEDULE_ID) -> None:
+        """Re-read *date* after a write; safe to call from any thread."""
+        if not self._loaded:
+            return
+        key = (schedule_id, date)
+        with self._lock:
+            # Read under the lock so concurrent touches apply in order.
+            shift = storage.get_shift(date, schedule_id)
+            now = self.clock()
+            # The date's queued entries are stale from now on.
+            self._forget(key)
+            self._generations += 1
+            generation = self._generations
+            new = self._reminders(shift, schedule_id, generation, now) if shift else []
+            for reminder in new:
+                heapq.heappush(self._heap, reminder)
+            if new:
+                self._generation[key] = generation
+                self._live[key] = len(new)
+            if self._stale > len(self._heap) // 2:
+                self._compact()
+        self._notify()
+
+    def drop_schedule(self, schedule_id: int) -> None:
+        """Invalidate every queued reminder of a deleted schedule."""
+        with self._lock:
+            for key in [k for k in self._live if k[0] == schedule_id]:
+                self._forget(key)
+            if self._stale > len(self._heap) // 2:
+                self._compact()
+        self._notify()
+
+    def _reminders(
+        self, shift: dict, schedule_id: int, generation: int, now: datetime
+    ) -> list[Reminder]:
+        start, end = shift_bounds(shift)
+        out = []
+        for event_type, at in (("shift_starting", start), ("shift_ending", end)):
+            for lead in self.leads:
+                fire_at = at - timedelta(minutes=lead)
+                if fire_at < now:
+                    continue
+                self._seq += 1
+                out.append(Reminder(
+                    fire_at, self._seq, generation, event_type,
+                    schedule_id, shift["date"], shift["type"], at, lead,
+                ))
+        return out
+
+    def _compact(self) -> None:
+        self._heap = [r for r in self._heap if self._is_live(r)]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _forget(self, key: tuple[int, str]) -> None:
+        """Turn the date's queued entries stale."""
+        self._generation.pop(key, None)
+        self._stale += self._live.pop(key, 0)
+
+    def _consumed(self, key: tuple[int, str]) -> None:
+        left = self._live[key] - 1
+        if left:
+            self._live[key] = left
+        else:
+            del self._live[key]
+            del self._generation[key]
+
+    def _is_live(self, reminder: Reminder) -> bool:
+        key = (reminder.schedule_id, reminder.date)
+        return reminder.generation == self._generation.get(key)
+
+    # ── Firing ────────────────────────────────────────────────
+
+    def due(self, now: datetime | None = None) -> list[Reminder]:
+        """Pop and return every live reminder whose time has come."""
+        now = now or self.clock()
+        out = []
+        with self._lock:
+            while self._heap and self._heap[0].fire_at <= now:
+                reminder = heapq.heappop(self._heap)
+                if self._is_live(reminder):
+                    out.append(reminder)
+                    self._consumed((reminder.schedule_id, reminder.date))
+                else:
+                    self._stale -= 1
+        return out
+
+    def next_fire_at(self) -> datetime | None:
+        """Time of the earliest live reminder (drops stale ones on top)."""
+        with self._lock:
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+                self._stale -= 1
+            return self._heap[0].fire_at if self._heap else None
+
+    # ── Background task ───────────────────────────────────────
+
+    def start(self) -> None:
+        """Load the heap and start firing on the running event loop."""
+        self.load()
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._loop = self._wake = None
+        self._loaded = False
+
+    def _notify(self) -> None:
+        # Writes run in the threadpool; wake the loop so it re-checks the top.
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            for reminder in self.due():
+                broadcast(reminder.event_type, reminder.payload())
+            fire_at = self.next_fire_at()
+            timeout = _MAX_SLEEP
+            if fire_at is not None:
+                timeout = min(timeout, max(0.0, (fire_at - self.clock()).total_seconds()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+scheduler = ShiftScheduler()
+
+SCHEDULER_PENDING = Gauge(
+    "scheduler_pending_reminders", "Live reminders waiting to fire.", fn=lambda: len(scheduler)
+)
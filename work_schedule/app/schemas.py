@@ -13,12 +13,46 @@ class ShiftOut(BaseModel):
     type: str = Field(..., examples=["day8"])
     start: str = Field(..., examples=["07:00"])
     end: str = Field(..., examples=["15:00"])
+    version: int = Field(..., description="Row version – the shift's ETag")
 
 
 class ShiftUpdate(BaseModel):
     type: str = Field(..., examples=["night12"])
 
 
+class ShiftBatch(BaseModel):
+    edits: list[dict] = Field(
+        ...,
+        max_length=500,
+        description='Edits as sent over /api/ws, e.g. {"op": "set", "date": …, "type": …}',
+        examples=[[{"op": "set", "date": "2026-02-09", "type": "day8"},
+                   {"op": "delete", "date": "2026-02-10"}]],
+    )
+
+
+class EditResult(BaseModel):
+    status: int = Field(..., description="What the single-shift route would answer")
+    shift: Optional[ShiftOut] = None
+    restored_date: Optional[str] = None
+    error: Optional[str] = None
+    version: Optional[int] = Field(None, description="Current row version (409 only)")
+
+
+class ShiftBatchOut(BaseModel):
+    results: list[EditResult]
+
+
+# ── Schedules ──────────────────────────────────────────────────
+
+class ScheduleCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64, examples=["Alex"])
+
+
+class ScheduleOut(BaseModel):
+    id: int
+    name: str
+
+
 # ── History ────────────────────────────────────────────────────
 
 class HistoryEntry(BaseModel):
@@ -39,6 +73,33 @@ class NextShift(BaseModel):
     end: str = Field(..., examples=["15:00"])
 
 
+# ── Data version ──────────────────────────────────────────────
+
+class VersionOut(BaseModel):
+    version: int = Field(..., description="Bumped by every shift write")
+
+
+class ChangesOut(BaseModel):
+    version: int = Field(..., description="Sync again from here")
+    resync: bool = Field(..., description="`since` is too old – refetch the whole range")
+    changed: list[ShiftOut]
+    deleted: list[str] = Field(..., examples=[["2026-02-10"]])
+
+
+# ── Backups ───────────────────────────────────────────────────
+
+class BackupOut(BaseModel):
+    name: str = Field(..., examples=["work_schedule-20260209-031500-000000.db.gz"])
+    size: int = Field(..., description="Compressed size in bytes")
+    created: str = Field(..., examples=["2026-02-09T03:15:00"])
+    pages: Optional[int] = Field(None, description="Database pages copied (new snapshots only)")
+
+
+class RestoreOut(BaseModel):
+    message: str
+    version: int = Field(..., description="Data version after the restore – clients resync")
+
+
 # ── Generic ───────────────────────────────────────────────────
 
 class MessageOut(BaseModel):
@@ -48,3 +109,61 @@ class MessageOut(BaseModel):
 class UndoOut(BaseModel):
     message: str
     restored_date: Optional[str] = None
+
+
+# ── Statistics ────────────────────────────────────────────────
+
+class StatsTypeTotals(BaseModel):
+    shifts: int
+    hours: float
+
+
+class StatsTotals(BaseModel):
+    shifts: int
+    hours: float
+    by_type: dict[str, StatsTypeTotals]
+
+
+class StatsBucket(StatsTotals):
+    key: str = Field(..., examples=["2026-06"])
+
+
+class StatsOut(BaseModel):
+    model_config = {"populate_by_name": True}
+
+    date_from: str = Field(..., alias="from", examples=["2026-01-01"])
+    date_to: str = Field(..., alias="to", examples=["2026-12-31"])
+    group: str = Field(..., examples=["month"])
+    total: StatsTotals
+    buckets: list[StatsBucket]
+
+
+# ── Calendar views ────────────────────────────────────────────
+
+class MonthView(BaseModel):
+    year: int
+    month: int
+    start: str
+    end: str
+    types: list[str] = Field(..., examples=[["", "day8", "day12", "night12"]])
+    weeks: list[list[Optional[list[int]]]] = Field(
+        ..., description="Weeks × 7 days (Mon first); cells are [day, code] or null"
+    )
+    version: int = Field(..., description="Data version the grid reflects")
+
+
+class QuarterMonth(BaseModel):
+    month: int
+    start: str
+    first_weekday: int = Field(..., description="0 = Monday")
+    days: list[int] = Field(..., description="One shift code per day")
+
+
+class QuarterView(BaseModel):
+    year: int
+    quarter: int
+    start: str
+    end: str
+    types: list[str]
+    months: list[QuarterMonth]
+    version: int = Field(..., description="Data version the strips reflect")
@@ -0,0 +1,22 @@
+"""Shift type definitions shared by the storage layer and the API."""
+
+from __future__ import annotations
+
+SHIFT_TYPES: dict[str, dict[str, str]] = {
+    "day8":    {"start": "07:00", "end": "15:00"},
+    "day12":   {"start": "07:00", "end": "19:00"},
+    "night12": {"start": "19:00", "end": "07:00"},
+}
+
+# Compact integer codes (stored in the DB and used in compact payloads);
+# 0 means "no shift".  Append new types – never reorder existing ones.
+SHIFT_CODES: dict[str, int] = {name: i for i, name in enumerate(SHIFT_TYPES, 1)}
+SHIFT_CODE_NAMES: list[str] = ["", *SHIFT_TYPES]
+
+
+def shift_minutes(shift_type: str) -> int:
+    """Worked minutes of a shift type; overnight shifts wrap past midnight."""
+    info = SHIFT_TYPES[shift_type]
+    start_h, start_m = map(int, info["start"].split(":"))
+    end_h, end_m = map(int, info["end"].split(":"))
+    return (end_h * 60 + end_m - start_h * 60 - start_m) % 1440 or 1440
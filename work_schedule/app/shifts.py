@@ -3,19 +3,14 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
-
-import jsonpatch
+from typing import Optional
 
 from . import storage
-
-# ── Shift type definitions ──────────────────────────────────────
-
-SHIFT_TYPES: dict[str, dict[str, str]] = {
-    "day8":    {"start": "07:00", "end": "15:00"},
-    "day12":   {"start": "07:00", "end": "19:00"},
-    "night12": {"start": "19:00", "end": "07:00"},
-}
+from .models import DEFAULT_SCHEDULE_ID
+from .storage import Precondition
+from .scheduler import scheduler
+# Type definitions live in ``shift_types`` (shared with the models).
+from .shift_types import SHIFT_TYPES, SHIFT_CODES, SHIFT_CODE_NAMES  # noqa: F401
 
 
 def validate_shift_type(shift_type: str) -> bool:
@@ -31,67 +26,72 @@ def get_shift_times(shift_type: str) -> tuple[str, str]:
 
 # ── Assign / update shift ──────────────────────────────────────
 
-def set_shift(date: str, shift_type: str) -> dict:
+def set_shift(
+    date: str,
+    shift_type: str,
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+    precondition: Optional[Precondition] = None,
+) -> dict:
     """
     Assign *shift_type* to *date*.
 
-    • Snapshots the current state before writing.
-    • Saves a JSON Patch + human-readable description into history.
+    • Snapshots the current state, writes and saves a JSON Patch +
+      human-readable description into history in one transaction.
+    • Raises ``storage.VersionConflict`` when *precondition* rejects the
+      current row version.
     • Returns the saved shift dict.
     """
     if not validate_shift_type(shift_type):
         raise ValueError(f"Unknown shift type: {shift_type}")
 
-    # ── snapshot (before) ──
-    old = storage.get_shift(date)
-    old_json = old if old else {}
-
-    # ── write ──
-    start, end = get_shift_times(shift_type)
-    saved = storage.upsert_shift(date, shift_type, start, end)
-
-    # ── diff / history ──
-    # We embed the old snapshot as the first element so undo can restore it.
-    new_json = saved
-    patch = jsonpatch.make_patch(old_json, new_json)
-    patch_list: list = json.loads(patch.to_string())
-    # Prepend a private snapshot marker
-    patch_list.insert(0, {"_snapshot": old_json})
-    description = _describe_change(date, old_json, new_json)
-
-    storage.add_history(
-        timestamp=datetime.utcnow().isoformat(),
-        date=date,
-        patch=json.dumps(patch_list),
-        description=description,
+    _, saved = storage.swap_shift(
+        date, shift_type, schedule_id, precondition, history=_history_entry(date)
     )
-
+    scheduler.touch(date, schedule_id)
     return saved
 
 
-def remove_shift(date: str) -> bool:
+def remove_shift(
+    date: str,
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+    precondition: Optional[Precondition] = None,
+) -> bool:
     """Remove a shift from a date, recording the deletion in history."""
-    old = storage.get_shift(date)
+    old, _ = storage.swap_shift(
+        date, None, schedule_id, precondition, history=_history_entry(date)
+    )
     if old is None:
         return False
+    scheduler.touch(date, schedule_id)
+    return True
+
 
-    storage.delete_shift(date)
+# ── helpers ────────────────────────────────────────────────────
 
-    patch = jsonpatch.make_patch(old, {})
-    patch_list: list = json.loads(patch.to_string())
-    patch_list.insert(0, {"_snapshot": old})
-    description = f"Removed {old.get('type', '?')} from {date}"
+def _history_entry(date: str):
+    """History record for ``storage.swap_shift``: snapshot + JSON Patch."""
 
-    storage.add_history(
-        timestamp=datetime.utcnow().isoformat(),
-        date=date,
-        patch=json.dumps(patch_list),
-        description=description,
-    )
-    return True
+    def record(old: Optional[dict], new: Optional[dict]) -> tuple[str, str]:
+        import jsonpatch  # deferred – only writes need it
 
+        # Row versions are bookkeeping, not part of the recorded change.
+        old_json = _without_version(old)
+        new_json = _without_version(new)
+        patch_list: list = json.loads(jsonpatch.make_patch(old_json, new_json).to_string())
+        # Prepend a private snapshot marker so undo can restore it.
+        patch_list.insert(0, {"_snapshot": old_json})
+        if new is None:
+            description = f"Removed {old_json.get('type', '?')} from {date}"
+        else:
+            description = _describe_change(date, old_json, new_json)
+        return json.dumps(patch_list), description
+
+    return record
+
+
+def _without_version(shift: Optional[dict]) -> dict:
+    return {k: v for k, v in shift.items() if k != "version"} if shift else {}
 
-# ── helpers ────────────────────────────────────────────────────
 
 def _describe_change(date: str, old: dict, new: dict) -> str:
     old_type = old.get("type", "none")
@@ -0,0 +1,68 @@
+"""Schedule statistics – shift counts and worked hours per period."""
+
+from __future__ import annotations
+
+from . import storage
+from .cache import VersionedCache
+from .models import DEFAULT_SCHEDULE_ID
+
+STATS_GROUPS = ("month", "week", "type")
+
+_cache = VersionedCache("stats")
+
+
+def get_stats(
+    date_from: str,
+    date_to: str,
+    group: str = "month",
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+) -> dict:
+    """
+    Return totals for ``[date_from, date_to]`` grouped by *group*.
+
+    The aggregation runs in SQL (one query regardless of the range size)
+    and results are cached until the next shift write.
+    """
+    if group not in STATS_GROUPS:
+        raise ValueError(f"Unknown stats group: {group}")
+    return _cache.get_or_compute(
+        (schedule_id, date_from, date_to, group),
+        storage.get_data_version(),
+        lambda: _compute(date_from, date_to, group, schedule_id),
+    )
+
+
+def _compute(date_from: str, date_to: str, group: str, schedule_id: int) -> dict:
+    rows = storage.get_shift_stats(date_from, date_to, group, schedule_id)
+
+    buckets: dict[str, dict] = {}
+    total = _empty_totals()
+    for row in rows:
+        bucket = buckets.get(row["key"])
+        if bucket is None:
+            bucket = buckets[row["key"]] = {"key": row["key"], **_empty_totals()}
+        for target in (bucket, total):
+            _add(target, row["type"], row["shifts"], row["minutes"])
+
+    return {
+        "from": date_from,
+        "to": date_to,
+        "group": group,
+        "total": total,
+        "buckets": list(buckets.values()),
+    }
+
+
+# ── helpers ────────────────────────────────────────────────────
+
+def _empty_totals() -> dict:
+    return {"shifts": 0, "hours": 0.0, "by_type": {}}
+
+
+def _add(target: dict, shift_type: str, shifts: int, minutes: int) -> None:
+    hours = minutes / 60
+    target["shifts"] += shifts
+    target["hours"] += hours
+    per_type = target["by_type"].setdefault(shift_type, {"shifts": 0, "hours": 0.0})
+    per_type["shifts"] += shifts
+    per_type["hours"] += hours
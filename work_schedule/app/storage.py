@@ -3,19 +3,36 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from datetime import datetime
 from contextlib import contextmanager
-from typing import Generator, Optional, Sequence
+from typing import Callable, Generator, Optional, Sequence
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import case, create_engine, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
-from .models import Base, Shift, History, Meta
+from . import migrations
+from .models import (
+    DEFAULT_SCHEDULE_ID, Change, Schedule, Shift, History, Meta, epoch_day, iso_date,
+)
+from .shift_types import SHIFT_CODES, SHIFT_CODE_NAMES, shift_minutes
+from .metrics import Counter, Gauge, Histogram
 
 DB_PATH = os.environ.get("DB_PATH", "work_schedule.db")
 
 _engine = None
 _SessionLocal = None
 
+DB_SESSIONS = Counter("db_sessions_total", "DB sessions opened via get_db.")
+DB_SESSIONS_OPEN = Gauge("db_sessions_open", "DB sessions currently open.")
+DB_COMMIT_SECONDS = Histogram(
+    "db_commit_duration_seconds",
+    "Time spent committing get_db sessions.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+
 
 def _get_engine():
     global _engine
@@ -25,7 +42,7 @@ def _get_engine():
             echo=False,
             connect_args={"check_same_thread": False},
         )
-        Base.metadata.create_all(_engine)
+        migrations.upgrade(_engine)
     return _engine
 
 
@@ -37,30 +54,117 @@ def _get_session_factory():
 
 
 @contextmanager
-def get_db() -> Generator[Session, None, None]:
-    """Yield a transactional DB session."""
+def get_db(immediate: bool = False) -> Generator[Session, None, None]:
+    """
+    Yield a transactional DB session.
+
+    With *immediate* the session takes SQLite's write lock up front
+    (``BEGIN IMMEDIATE``), so what it reads cannot change before it writes.
+    """
     factory = _get_session_factory()
     session = factory()
+    DB_SESSIONS.inc()
+    DB_SESSIONS_OPEN.inc()
     try:
+        if immediate:
+            session.connection().exec_driver_sql("BEGIN IMMEDIATE")
         yield session
+        t0 = time.perf_counter()
         session.commit()
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - t0)
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
+        DB_SESSIONS_OPEN.dec()
 
 
-# ── Shifts ─────────────────────────────────────────────────────
+# ── Schedules ──────────────────────────────────────────────────
+
+def list_schedules() -> list[dict]:
+    """All schedules, default first."""
+    with get_db() as db:
+        rows = db.execute(select(Schedule).order_by(Schedule.id)).scalars().all()
+        return [r.to_dict() for r in rows]
+
+
+def schedule_exists(schedule_id: int) -> bool:
+    with get_db() as db:
+        return db.get(Schedule, schedule_id) is not None
+
 
-def get_shifts(date_from: str, date_to: str) -> list[dict]:
+def create_schedule(name: str) -> dict:
+    """Add a schedule.  Raises ValueError if the name is taken."""
+    try:
+        with get_db() as db:
+            row = Schedule(name=name)
+            db.add(row)
+            db.flush()
+            return row.to_dict()
+    except IntegrityError:
+        raise ValueError(f"Schedule '{name}' already exists")
+
+
+def delete_schedule(schedule_id: int) -> bool:
+    """Delete a schedule with its shifts and history.  Returns True if it existed."""
+    if schedule_id == DEFAULT_SCHEDULE_ID:
+        raise ValueError("The default schedule cannot be deleted")
+    with get_db() as db:
+        row = db.get(Schedule, schedule_id)
+        if row is None:
+            return False
+        db.execute(delete(Shift).where(Shift.schedule_id == schedule_id))
+        db.execute(delete(History).where(History.schedule_id == schedule_id))
+        db.execute(delete(Change).where(Change.schedule_id == schedule_id))
+        db.delete(row)
+        # Its change log is gone: cursors from before must resync.
+        _set_meta(db, CHANGES_FLOOR_KEY, str(_bump_data_version(db)))
+        return True
+
+
+# ── Shifts ─────────────────────────────────────────────────────
+# Dates are ISO strings at this boundary and epoch days (see
+# ``models.epoch_day``) in the table; invalid dates raise ValueError.
+# Every query is bounded by ``schedule_id`` – the leading primary-key
+# column – so its cost doesn't depend on how many schedules exist.
+
+def _in_range(schedule_id: int, date_from: str, date_to: str):
+    return (
+        Shift.schedule_id == schedule_id,
+        Shift.day >= epoch_day(date_from),
+        Shift.day <= epoch_day(date_to),
+    )
+
+
+def get_shifts(
+    date_from: str, date_to: str, schedule_id: int = DEFAULT_SCHEDULE_ID
+) -> list[dict]:
     """Return shifts between two dates (inclusive)."""
     with get_db() as db:
         rows = (
             db.execute(
                 select(Shift)
-                .where(Shift.date >= date_from, Shift.date <= date_to)
-                .order_by(Shift.date)
+                .where(*_in_range(schedule_id, date_from, date_to))
+                .order_by(Shift.day)
+            )
+            .scalars()
+            .all()
+        )
+        return [r.to_dict() for r in rows]
+
+
+def get_upcoming_shifts(
+    date_from: str, date_to: str, limit: int, schedule_id: int = DEFAULT_SCHEDULE_ID
+) -> list[dict]:
+    """Return the first *limit* shifts on or after *date_from* (up to *date_to*)."""
+    with get_db() as db:
+        rows = (
+            db.execute(
+                select(Shift)
+                .where(*_in_range(schedule_id, date_from, date_to))
+                .order_by(Shift.day)
+                .limit(limit)
             )
             .scalars()
             .all()
@@ -68,73 +172,290 @@ def get_shifts(date_from: str, date_to: str) -> list[dict]:
         return [r.to_dict() for r in rows]
 
 
-def get_shift(date: str) -> Optional[dict]:
+def get_shift(date: str, schedule_id: int = DEFAULT_SCHEDULE_ID) -> Optional[dict]:
     """Return a single shift or None."""
     with get_db() as db:
-        row = db.get(Shift, date)
+        row = db.get(Shift, (schedule_id, epoch_day(date)))
         return row.to_dict() if row else None
 
 
-def upsert_shift(date: str, shift_type: str, start: str, end: str) -> dict:
-    """Insert or update a shift for a given date."""
-    with get_db() as db:
-        row = db.get(Shift, date)
+class VersionConflict(Exception):
+    """A conditional write found the shift at another version."""
+
+    def __init__(self, current: Optional[dict]) -> None:
+        super().__init__("Shift was changed concurrently")
+        self.current = current
+
+
+# A write precondition: called with the current row version (None when
+# there is no shift), returns whether the write may go ahead.
+Precondition = Callable[[Optional[int]], bool]
+# Builds the ``(patch, description)`` of the history entry for a write
+# from the old and new shift, or returns None to record nothing.
+HistoryRecord = Callable[[Optional[dict], Optional[dict]], Optional[tuple[str, str]]]
+
+
+def _swap(
+    db: Session, schedule_id: int, date: str, shift_type: Optional[str]
+) -> tuple[Optional[dict], Optional[dict]]:
+    """Replace (or with None, delete) a shift inside a write session."""
+    day = epoch_day(date)
+    row = db.get(Shift, (schedule_id, day))
+    old = row.to_dict() if row else None
+    if shift_type is None:
         if row is None:
-            row = Shift(date=date, type=shift_type, start=start, end=end)
-            db.add(row)
-        else:
-            row.type = shift_type
-            row.start = start
-            row.end = end
-        db.flush()
-        return row.to_dict()
+            return None, None
+        db.delete(row)
+        _log_change(db, _bump_data_version(db), schedule_id, day)
+        return old, None
+    version = _bump_data_version(db)
+    _log_change(db, version, schedule_id, day)
+    if row is None:
+        row = Shift(schedule_id=schedule_id, day=day)
+        db.add(row)
+    row.code = SHIFT_CODES[shift_type]
+    row.version = version
+    db.flush()
+    return old, row.to_dict()
+
+
+def swap_shift(
+    date: str,
+    shift_type: Optional[str],
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+    precondition: Optional[Precondition] = None,
+    history: Optional[HistoryRecord] = None,
+) -> tuple[Optional[dict], Optional[dict]]:
+    """
+    Set the shift on *date* to *shift_type* (None removes it) and return
+    ``(old, new)``.
+
+    Read, check, write and history entry share one write transaction, so
+    concurrent writers can't interleave: the swap is atomic, and a failed
+    *precondition* raises VersionConflict without writing anything.
+    """
+    with get_db(immediate=True) as db:
+        if precondition is not None:
+            row = db.get(Shift, (schedule_id, epoch_day(date)))
+            if not precondition(row.version if row else None):
+                raise VersionConflict(row.to_dict() if row else None)
+        old, new = _swap(db, schedule_id, date, shift_type)
+        entry = history(old, new) if history and (old or new) else None
+        if entry is not None:
+            patch, description = entry
+            _add_history(db, date, patch, description, schedule_id)
+        return old, new
+
+
+def upsert_shift(
+    date: str, shift_type: str, schedule_id: int = DEFAULT_SCHEDULE_ID
+) -> dict:
+    """Insert or update a shift for a given date."""
+    return swap_shift(date, shift_type, schedule_id)[1]
 
 
-def delete_shift(date: str) -> bool:
+def delete_shift(date: str, schedule_id: int = DEFAULT_SCHEDULE_ID) -> bool:
     """Delete a shift. Returns True if it existed."""
+    return swap_shift(date, None, schedule_id)[0] is not None
+
+
+# ── Change log ─────────────────────────────────────────────────
+# Every shift write logs (version, schedule, day) in the same transaction
+# as the write and its history entry.  Only the last CHANGE_LOG_SIZE
+# writes are kept; a client that synced before that must refetch.
+
+CHANGE_LOG_SIZE = 10_000
+CHANGES_FLOOR_KEY = "changes_floor"
+
+
+def _log_change(db: Session, version: int, schedule_id: int, day: int) -> None:
+    db.add(Change(version=version, schedule_id=schedule_id, day=day))
+    if version > CHANGE_LOG_SIZE:
+        db.execute(delete(Change).where(Change.version <= version - CHANGE_LOG_SIZE))
+
+
+def get_changes(since: int, schedule_id: int = DEFAULT_SCHEDULE_ID) -> dict:
+    """
+    Shifts of a schedule written after data version *since*.
+
+    ``changed`` holds the current rows, ``deleted`` the dates whose shift
+    is gone.  When *since* is outside the change log – older than what it
+    kept, or from another database – ``resync`` is set instead and the
+    caller has to refetch its whole range.
+    """
     with get_db() as db:
-        row = db.get(Shift, date)
-        if row:
-            db.delete(row)
-            return True
-        return False
+        version = _read_data_version(db)
+        floor = max(int(_get_meta(db, CHANGES_FLOOR_KEY) or 0), version - CHANGE_LOG_SIZE)
+        out = {"version": version, "resync": False, "changed": [], "deleted": []}
+        if not floor <= since <= version:
+            out["resync"] = True
+            return out
+        days = (
+            select(Change.day)
+            .where(Change.schedule_id == schedule_id, Change.version > since)
+            .distinct()
+            .subquery()
+        )
+        rows = db.execute(
+            select(days.c.day, Shift)
+            .outerjoin(Shift, (Shift.schedule_id == schedule_id) & (Shift.day == days.c.day))
+            .order_by(days.c.day)
+        ).all()
+        for day, shift in rows:
+            if shift is None:
+                out["deleted"].append(iso_date(day))
+            else:
+                out["changed"].append(shift.to_dict())
+        return out
+
+
+# Bucket key per statistics grouping.  Weeks are keyed by their Monday
+# (epoch day 0, 1970-01-01, was a Thursday).
+_STATS_KEYS = {
+    "month": lambda: func.strftime("%Y-%m", Shift.day * 86400, "unixepoch"),
+    "week": lambda: func.date((Shift.day - (Shift.day + 3) % 7) * 86400, "unixepoch"),
+    "type": lambda: Shift.code,
+}
+
+
+def get_shift_stats(
+    date_from: str, date_to: str, group: str, schedule_id: int = DEFAULT_SCHEDULE_ID
+) -> list[dict]:
+    """
+    Aggregate shifts between two dates (inclusive) with a single
+    ``GROUP BY`` query.
+
+    Returns one row per (bucket, type) with the shift count and the
+    worked minutes.  Overnight shifts wrap past midnight and are
+    attributed to the day they start on.
+    """
+    key = _STATS_KEYS[group]().label("key")
+    duration = case(
+        {code: shift_minutes(name) for name, code in SHIFT_CODES.items()},
+        value=Shift.code,
+        else_=0,
+    )
+    with get_db() as db:
+        rows = db.execute(
+            select(
+                key,
+                Shift.code,
+                func.count().label("shifts"),
+                func.sum(duration).label("minutes"),
+            )
+            .where(*_in_range(schedule_id, date_from, date_to))
+            .group_by(key, Shift.code)
+            .order_by(key, Shift.code)
+        ).all()
+        return [
+            {
+                "key": SHIFT_CODE_NAMES[r.key] if group == "type" else r.key,
+                "type": SHIFT_CODE_NAMES[r.code],
+                "shifts": r.shifts,
+                "minutes": r.minutes or 0,
+            }
+            for r in rows
+        ]
 
 
 # ── History ────────────────────────────────────────────────────
 
-def add_history(timestamp: str, date: str, patch: str, description: str) -> int:
+def add_history(
+    timestamp: str,
+    date: str,
+    patch: str,
+    description: str,
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+) -> int:
     """Append a history entry; return its id."""
     with get_db() as db:
         entry = History(
-            timestamp=timestamp, date=date, patch=patch, description=description
+            schedule_id=schedule_id,
+            timestamp=timestamp,
+            date=date,
+            patch=patch,
+            description=description,
         )
         db.add(entry)
         db.flush()
         return entry.id
 
 
-def get_history(limit: int = 50) -> list[dict]:
-    """Most recent history entries."""
+def _add_history(
+    db: Session, date: str, patch: str, description: str, schedule_id: int
+) -> None:
+    db.add(History(
+        schedule_id=schedule_id,
+        timestamp=datetime.utcnow().isoformat(),
+        date=date,
+        patch=patch,
+        description=description,
+    ))
+
+
+def _history_of(schedule_id: int, before: Optional[int] = None):
+    # Walks ix_history_schedule backwards – an index seek per schedule
+    # (and per page: *before* is where the previous page ended).
+    query = select(History).where(History.schedule_id == schedule_id)
+    if before is not None:
+        query = query.where(History.id < before)
+    return query.order_by(History.id.desc())
+
+
+def get_history(
+    limit: int = 50,
+    schedule_id: int = DEFAULT_SCHEDULE_ID,
+    before: Optional[int] = None,
+) -> list[dict]:
+    """Most recent history entries of a schedule, older than id *before* if given."""
     with get_db() as db:
         rows = (
-            db.execute(select(History).order_by(History.id.desc()).limit(limit))
+            db.execute(_history_of(schedule_id, before).limit(limit))
             .scalars()
             .all()
         )
         return [r.to_dict() for r in rows]
 
 
-def get_last_history() -> Optional[dict]:
-    """Return the latest history entry or None."""
+def count_history() -> int:
+    """Number of rows in the history table."""
+    with get_db() as db:
+        return db.execute(select(func.count()).select_from(History)).scalar_one()
+
+
+HISTORY_ROWS = Gauge("history_rows", "Rows in the history table.", fn=count_history)
+
+
+def get_last_history(schedule_id: int = DEFAULT_SCHEDULE_ID) -> Optional[dict]:
+    """Return the schedule's latest history entry (top of its undo stack) or None."""
     with get_db() as db:
         row = (
-            db.execute(select(History).order_by(History.id.desc()).limit(1))
+            db.execute(_history_of(schedule_id).limit(1))
             .scalars()
             .first()
         )
         return row.to_dict() if row else None
 
 
+def pop_history(
+    schedule_id: int, restore: Callable[[dict], Optional[str]]
+) -> Optional[tuple[dict, Optional[dict]]]:
+    """
+    Consume the schedule's newest history entry and apply the shift type
+    *restore(entry)* returns (None removes the shift) in one write
+    transaction.  Returns ``(entry, restored shift)``, or None when the
+    history is empty.
+    """
+    with get_db(immediate=True) as db:
+        row = db.execute(_history_of(schedule_id).limit(1)).scalars().first()
+        if row is None:
+            return None
+        entry = row.to_dict()
+        _, restored = _swap(db, schedule_id, entry["date"], restore(entry))
+        db.delete(row)
+        return entry, restored
+
+
 def delete_history_entry(entry_id: int) -> bool:
     """Remove a history entry by id."""
     with get_db() as db:
@@ -147,16 +468,80 @@ def delete_history_entry(entry_id: int) -> bool:
 
 # ── Meta ───────────────────────────────────────────────────────
 
+DATA_VERSION_KEY = "data_version"
+
+# Highest data version this process has handed out – a restore moves past
+# it, including writes that landed while the snapshot was being copied in.
+_version_high_water = 0
+_high_water_lock = threading.Lock()
+
+
+def _note_version(version: int) -> None:
+    global _version_high_water
+    with _high_water_lock:
+        _version_high_water = max(_version_high_water, version)
+
+
+def _bump_data_version(db: Session) -> int:
+    """Increment the schedule data version inside an open session; return it."""
+    row = db.get(Meta, DATA_VERSION_KEY)
+    if row is None:
+        db.add(Meta(key=DATA_VERSION_KEY, value="1"))
+        version = 1
+    else:
+        version = int(row.value or 0) + 1
+        row.value = str(version)
+    _note_version(version)
+    return version
+
+
+def _read_data_version(db: Session) -> int:
+    value = _get_meta(db, DATA_VERSION_KEY)
+    return int(value) if value else 0
+
+
+def get_data_version() -> int:
+    """Return a counter that changes whenever any shift is written."""
+    with get_db() as db:
+        return _read_data_version(db)
+
+
+def _get_meta(db: Session, key: str) -> Optional[str]:
+    row = db.get(Meta, key)
+    return row.value if row else None
+
+
 def get_meta(key: str) -> Optional[str]:
     with get_db() as db:
-        row = db.get(Meta, key)
-        return row.value if row else None
+        return _get_meta(db, key)
+
+
+def _set_meta(db: Session, key: str, value: str) -> None:
+    row = db.get(Meta, key)
+    if row is None:
+        db.add(Meta(key=key, value=value))
+    else:
+        row.value = value
 
 
 def set_meta(key: str, value: str) -> None:
     with get_db() as db:
-        row = db.get(Meta, key)
-        if row is None:
-            db.add(Meta(key=key, value=value))
-        else:
-            row.value = value
+        _set_meta(db, key, value)
+
+
+def restamp_versions(at_least: int = 0) -> int:
+    """
+    Start afresh after the data was replaced wholesale; return the new version.
+
+    The data version moves past *at_least* and every version this process
+    handed out, every shift gets that version and the change log is
+    emptied – so no ETag or change cursor from before matches any more.
+    """
+    with get_db(immediate=True) as db:
+        version = max(_read_data_version(db), at_least, _version_high_water) + 1
+        _set_meta(db, DATA_VERSION_KEY, str(version))
+        _set_meta(db, CHANGES_FLOOR_KEY, str(version))
+        db.execute(update(Shift).values(version=version))
+        db.execute(delete(Change))
+        _note_version(version)
+        return version
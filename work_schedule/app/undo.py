@@ -10,50 +10,48 @@ from __future__ import annotations
 import json
 
 from . import storage
+from .models import DEFAULT_SCHEDULE_ID
+from .scheduler import scheduler
 
 
-def undo_last() -> dict | None:
+def undo_last(schedule_id: int = DEFAULT_SCHEDULE_ID) -> dict | None:
     """
-    Revert the last change recorded in history.
+    Revert the last change recorded in a schedule's history.
 
     1. Pop the newest history entry.
     2. Extract the ``_snapshot`` (previous state) stored inside it.
     3. Persist the restored state (or delete if empty).
     4. Remove the consumed history entry so repeated undo walks back.
 
+    All in one write transaction, so two concurrent undos can't both
+    consume the same entry.
+
     Returns ``{"message": …, "restored_date": …}`` or *None*.
     """
-    entry = storage.get_last_history()
-    if entry is None:
+    popped = storage.pop_history(schedule_id, _previous_type)
+    if popped is None:
         return None
 
+    entry, restored = popped
     affected_date: str = entry["date"]
-    patch_data = json.loads(entry["patch"])
-
-    # Extract the snapshot we embedded at write-time
-    previous = _extract_snapshot(patch_data)
-
-    # Persist the previous state
-    if previous and previous.get("type"):
-        storage.upsert_shift(
-            affected_date,
-            previous["type"],
-            previous["start"],
-            previous["end"],
-        )
-        msg = f"Undone → {affected_date} restored to {previous['type']}"
+    if restored is not None:
+        msg = f"Undone → {affected_date} restored to {restored['type']}"
     else:
-        storage.delete_shift(affected_date)
         msg = f"Undone → {affected_date} cleared"
-
-    # Remove the consumed entry (next undo goes one step further)
-    storage.delete_history_entry(entry["id"])
+    scheduler.touch(affected_date, schedule_id)
 
     return {"message": msg, "restored_date": affected_date}
 
 
 # ── helpers ────────────────────────────────────────────────────
 
+def _previous_type(entry: dict) -> str | None:
+    """The shift type recorded before the change (None: there was none)."""
+    # Extract the snapshot we embedded at write-time
+    previous = _extract_snapshot(json.loads(entry["patch"]))
+    return previous.get("type") or None
+
+
 def _extract_snapshot(patch_data: list) -> dict:
     """Pull the ``_snapshot`` marker we injected, or return ``{}``."""
     if patch_data and isinstance(patch_data[0], dict) and "_snapshot" in patch_data[0]:
@@ -0,0 +1,109 @@
+"""
+Calendar view models – precomputed grids for the UI.
+
+The browser only paints these: month grids are weeks × 7 days
+(Monday first) and quarter strips are one list of day codes per month.
+Shift types are encoded with ``SHIFT_CODES``; ``types`` in every payload
+maps a code back to its name (index 0 = no shift).  ``version`` is the
+data version the payload reflects, for clients that keep a local copy.
+"""
+
+from __future__ import annotations
+
+import calendar
+from datetime import date
+
+from . import storage
+from .cache import VersionedCache
+from .compact import day_codes
+from .models import DEFAULT_SCHEDULE_ID
+from .shifts import SHIFT_CODE_NAMES
+
+_cache = VersionedCache("views")
+
+
+def month_view(year: int, month: int, schedule_id: int = DEFAULT_SCHEDULE_ID) -> dict:
+    """Return the calendar grid for one month."""
+    version = storage.get_data_version()
+    return _cache.get_or_compute(
+        ("month", schedule_id, year, month),
+        version,
+        lambda: {**_build_month(year, month, schedule_id), "version": version},
+    )
+
+
+def quarter_view(year: int, quarter: int, schedule_id: int = DEFAULT_SCHEDULE_ID) -> dict:
+    """Return the timeline strips for the three months of a quarter."""
+    version = storage.get_data_version()
+    return _cache.get_or_compute(
+        ("quarter", schedule_id, year, quarter),
+        version,
+        lambda: {**_build_quarter(year, quarter, schedule_id), "version": version},
+    )
+
+
+# ── builders ───────────────────────────────────────────────────
+
+def _build_month(year: int, month: int, schedule_id: int) -> dict:
+    first, last = _month_bounds(year, month)
+    codes = _day_codes(first, last, schedule_id)
+
+    weeks: list[list] = []
+    week: list = [None] * first.weekday()
+    for day, code in enumerate(codes, 1):
+        week.append([day, code])
+        if len(week) == 7:
+            weeks.append(week)
+            week = []
+    if week:
+        weeks.append(week + [None] * (7 - len(week)))
+
+    return {
+        "year": year,
+        "month": month,
+        "start": first.isoformat(),
+        "end": last.isoformat(),
+        "types": SHIFT_CODE_NAMES,
+        "weeks": weeks,
+    }
+
+
+def _build_quarter(year: int, quarter: int, schedule_id: int) -> dict:
+    first_month = (quarter - 1) * 3 + 1
+    start, _ = _month_bounds(year, first_month)
+    _, end = _month_bounds(year, first_month + 2)
+    codes = _day_codes(start, end, schedule_id)
+
+    months = []
+    offset = 0
+    for month in range(first_month, first_month + 3):
+        first, last = _month_bounds(year, month)
+        months.append({
+            "month": month,
+            "start": first.isoformat(),
+            "first_weekday": first.weekday(),
+            "days": codes[offset:offset + last.day],
+        })
+        offset += last.day
+
+    return {
+        "year": year,
+        "quarter": quarter,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "types": SHIFT_CODE_NAMES,
+        "months": months,
+    }
+
+
+# ── helpers ────────────────────────────────────────────────────
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+    days = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, days)
+
+
+def _day_codes(start: date, end: date, schedule_id: int) -> list[int]:
+    """Return one shift code per day in ``[start, end]``."""
+    rows = storage.get_shifts(start.isoformat(), end.isoformat(), schedule_id)
+    return day_codes(rows, start, end)
@@ -0,0 +1,49 @@
+"""
+Startup warm-up – pay the first-request costs before serving.
+
+Run from the FastAPI lifespan hook so the first Home Assistant poll after
+an add-on restart hits an open engine, migrated schema, configured ORM
+mappers and compiled statements instead of a cold stack.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from . import storage, views
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def warm_up() -> dict[str, float]:
+    """Warm every cold path the first requests touch; return stage timings (ms)."""
+    timings: dict[str, float] = {}
+
+    def stage(name: str, fn) -> None:
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = (time.perf_counter() - t0) * 1000
+
+    today = date.today()
+    stage("engine", _warm_engine)
+    # Same query as /api/next_shift: maps Shift and loads the primary-key pages.
+    stage("next_shift", lambda: storage.get_upcoming_shifts(
+        today.isoformat(), (today + timedelta(days=90)).isoformat(), limit=2,
+    ))
+    stage("views", lambda: views.month_view(today.year, today.month))
+    _LOGGER.info(
+        "Warm-up done in %.1f ms (%s)",
+        sum(timings.values()),
+        ", ".join(f"{k} {v:.1f} ms" for k, v in timings.items()),
+    )
+    return timings
+
+
+def _warm_engine() -> None:
+    # Creating the engine runs the schema migrations.
+    with storage._get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
@@ -0,0 +1 @@
+"""Package marker for the benchmarks (run from ``work_schedule/``)."""
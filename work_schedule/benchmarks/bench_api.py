@@ -0,0 +1,87 @@
+"""
+Core add-on operations against a file-backed SQLite database.
+
+Seeds a realistic multi-year schedule (with its history) and measures
+the hot paths: ``set_shift``, ``undo_last``, ``get_shifts`` for several
+range sizes, ``next_shift`` and SSE fan-out to N subscribers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app import events, storage
+from app.api.ha import next_shift
+from app.models import DEFAULT_SCHEDULE_ID
+from app.shifts import set_shift
+from app.undo import undo_last
+
+from .common import file_database, measure, seed_schedule, shift_type_cycle, summarize
+
+RANGE_SIZES = {"month": 31, "quarter": 92, "year": 366, "3years": 1096}
+SSE_SUBSCRIBERS = (1, 10, 100)
+
+
+def run(years: int = 3, iterations: int = 200) -> dict:
+    results: dict = {}
+    today = date.today()
+    start = today - timedelta(days=365 * (years - 1))
+
+    with file_database():
+        t0 = time.perf_counter()
+        writes = seed_schedule(start, 365 * years)
+        results["seed"] = {
+            "writes": writes,
+            "history_rows": len(storage.get_history(limit=writes)),
+            "seconds": time.perf_counter() - t0,
+        }
+
+        for name, days in RANGE_SIZES.items():
+            date_from = start.isoformat()
+            date_to = (start + timedelta(days=days - 1)).isoformat()
+            results[f"get_shifts[{name}]"] = measure(
+                lambda: storage.get_shifts(date_from, date_to), iterations
+            )
+
+        results["next_shift"] = measure(lambda: next_shift(DEFAULT_SCHEDULE_ID), iterations)
+
+        # Writes land a year ahead so they don't disturb the reads above.
+        next_type = shift_type_cycle()
+        target = start + timedelta(days=365 * years)
+        offsets = iter(range(10**9))
+        results["set_shift"] = measure(
+            lambda: set_shift(
+                (target + timedelta(days=next(offsets) % 365)).isoformat(), next_type()
+            ),
+            iterations,
+        )
+
+        # Each undo consumes one history entry – the seed left plenty.
+        results["undo_last"] = measure(undo_last, iterations)
+
+    for subscribers in SSE_SUBSCRIBERS:
+        results[f"sse_fanout[{subscribers}]"] = asyncio.run(
+            _sse_fanout(subscribers, iterations)
+        )
+    return results
+
+
+async def _sse_fanout(subscribers: int, iterations: int) -> dict:
+    """Broadcast one event and wait until every subscriber has received it."""
+    # Without a batching window, so this measures the hub rather than the wait.
+    window, events.EVENT_BATCH_MS = events.EVENT_BATCH_MS, 0
+    queues = [events.subscribe() for _ in range(subscribers)]
+    try:
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            events.broadcast("shift_changed", {"date": "2026-01-01", "shift_type": "day8"})
+            await asyncio.gather(*(q.get() for q in queues))
+            samples.append(time.perf_counter() - t0)
+        return summarize(samples)
+    finally:
+        for q in queues:
+            events.unsubscribe(q)
+        events.EVENT_BATCH_MS = window
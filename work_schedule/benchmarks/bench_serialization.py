@@ -0,0 +1,83 @@
+"""
+Serialization cost of shift payloads, per 1 000 rows.
+
+Compares the FastAPI default path (``response_model`` validation +
+stdlib ``json``) with direct ``orjson`` encoding and reports the
+compressed sizes.
+
+Run from ``work_schedule/``:
+    python -m benchmarks.bench_serialization [--rows 1000] [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+import timeit
+from datetime import date, timedelta
+
+import brotli
+import orjson
+from pydantic import TypeAdapter
+
+from app.schemas import ShiftOut
+from app.shifts import SHIFT_TYPES
+
+_adapter = TypeAdapter(list[ShiftOut])
+
+
+def make_rows(count: int) -> list[dict]:
+    """Build *count* consecutive daily shift dicts (as ``Shift.to_dict``)."""
+    types = list(SHIFT_TYPES)
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        t = types[i % len(types)]
+        rows.append({
+            "date": (start + timedelta(days=i)).isoformat(),
+            "type": t,
+            **SHIFT_TYPES[t],
+            "version": i + 1,
+        })
+    return rows
+
+
+def validated_stdlib(rows: list[dict]) -> bytes:
+    """What FastAPI does for ``response_model=list[ShiftOut]`` + JSONResponse."""
+    content = _adapter.dump_python(_adapter.validate_python(rows), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def direct_orjson(rows: list[dict]) -> bytes:
+    return orjson.dumps(rows)
+
+
+def run(rows_count: int = 1000, repeat: int = 200) -> dict:
+    rows = make_rows(rows_count)
+    results = {}
+    for name, fn in (("validated_stdlib", validated_stdlib), ("orjson", direct_orjson)):
+        seconds = timeit.timeit(lambda: fn(rows), number=repeat) / repeat
+        results[name] = {"ms_per_1k_rows": seconds * 1000 * 1000 / rows_count}
+
+    body = direct_orjson(rows)
+    results["size_bytes"] = {
+        "raw": len(body),
+        "gzip": len(gzip.compress(body, compresslevel=6)),
+        "br": len(brotli.compress(body, quality=4)),
+    }
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+    json.dump(run(args.rows, args.repeat), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Cold start: import time, lifespan warm-up and the first requests.
+
+Every sample is a fresh interpreter (``python -m benchmarks.bench_startup
+--child``) against a seeded database file, so module imports, engine
+creation and statement compilation are paid for real.  ``warm`` runs the
+lifespan hook before the first request; ``cold`` skips it to show what
+the first Home Assistant poll would pay without the warm-up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from .common import file_database, seed_schedule, summarize
+
+FIRST_REQUESTS = ("/api/next_shift", "/api/views/month")
+
+
+def run(samples: int = 10, days: int = 365) -> dict:
+    with file_database() as path:
+        seed_schedule(date.today() - timedelta(days=days // 2), days)
+        raw = {mode: [_spawn(path, mode) for _ in range(samples)] for mode in ("warm", "cold")}
+
+    results: dict = {}
+    for mode, runs in raw.items():
+        for key in runs[0]:
+            results[f"{mode}.{key}"] = summarize([r[key] for r in runs])
+    return results
+
+
+def _spawn(db_path: str, mode: str) -> dict[str, float]:
+    env = dict(os.environ, DB_PATH=db_path)
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def _child(mode: str) -> None:
+    timings: dict[str, float] = {}
+    t0 = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    timings["import"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    client = TestClient(app)
+    if mode == "warm":
+        client.__enter__()  # runs the lifespan hook
+    timings["startup"] = time.perf_counter() - t0
+
+    for path in FIRST_REQUESTS:
+        t0 = time.perf_counter()
+        client.get(path)
+        timings[f"first{path.replace('/', '_')}"] = time.perf_counter() - t0
+
+    json.dump(timings, sys.stdout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", choices=("warm", "cold"), required=True)
+    _child(parser.parse_args().child)
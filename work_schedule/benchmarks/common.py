@@ -0,0 +1,107 @@
+"""Shared benchmark helpers – file-backed database, seeding, timing."""
+
+from __future__ import annotations
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Generator
+
+from app import cache, storage
+from app.shifts import SHIFT_TYPES, set_shift
+
+# A common rotation: two days, two nights, four off.
+ROTATION = ["day12", "day12", "night12", "night12", None, None, None, None]
+
+
+@contextmanager
+def file_database() -> Generator[str, None, None]:
+    """Point ``storage`` at a fresh SQLite file for the duration of a run."""
+    previous = storage.DB_PATH
+    with tempfile.TemporaryDirectory(prefix="ws-bench-") as tmp:
+        path = os.path.join(tmp, "work_schedule.db")
+        _reset_storage(path)
+        try:
+            yield path
+        finally:
+            if storage._engine is not None:
+                storage._engine.dispose()
+            _reset_storage(previous)
+
+
+def _reset_storage(path: str) -> None:
+    storage.DB_PATH = path
+    storage._engine = None
+    storage._SessionLocal = None
+    cache.clear_all()
+
+
+def seed_schedule(start: date, days: int, reedit_every: int = 2) -> int:
+    """
+    Fill ``[start, start + days)`` with a rotating schedule through the
+    normal write path, so history grows the way it does in real use.
+
+    Every *reedit_every*-th day is written a second time (e.g. a 12 h day
+    swapped for an 8 h one).  Returns the number of writes performed.
+    """
+    writes = 0
+    for i in range(days):
+        shift_type = ROTATION[i % len(ROTATION)]
+        if shift_type is None:
+            continue
+        day = (start + timedelta(days=i)).isoformat()
+        set_shift(day, shift_type)
+        writes += 1
+        if reedit_every and i % reedit_every == 0:
+            set_shift(day, "day8" if shift_type == "day12" else shift_type)
+            writes += 1
+    return writes
+
+
+def measure(
+    fn: Callable[[], object], iterations: int, warmup: int = 5
+) -> dict:
+    """Time *fn* and return latency percentiles (ms) and throughput."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def summarize(samples: list[float]) -> dict:
+    """Reduce raw durations (seconds) to the reported statistics."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))
+        return ordered[index] * 1000
+
+    return {
+        "n": len(ordered),
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def shift_type_cycle() -> Callable[[], str]:
+    """Return a function yielding shift types round-robin."""
+    types = list(SHIFT_TYPES)
+    state = {"i": 0}
+
+    def next_type() -> str:
+        state["i"] += 1
+        return types[state["i"] % len(types)]
+
+    return next_type
@@ -0,0 +1,68 @@
+"""
+Compare two benchmark reports produced by ``benchmarks.run``.
+
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+
+Prints the p50 / p99 latency change per benchmark and exits with status 1
+when any p50 regressed by more than ``--threshold`` percent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+
+def _flatten(report: dict) -> dict[str, dict]:
+    out = {}
+    for suite, results in report["results"].items():
+        for name, stats in results.items():
+            if isinstance(stats, dict) and "p50_ms" in stats:
+                out[f"{suite}.{name}"] = stats
+    return out
+
+
+def _change(base: float, head: float) -> float:
+    return (head - base) / base * 100 if base else 0.0
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[str], bool]:
+    """Return the report lines and whether a regression was found."""
+    base_stats, head_stats = _flatten(base), _flatten(head)
+    lines = [f"{'benchmark':<36} {'p50 ms':>18} {'Δ':>8} {'p99 ms':>18} {'Δ':>8}"]
+    regressed = False
+    for name in sorted(base_stats.keys() & head_stats.keys()):
+        b, h = base_stats[name], head_stats[name]
+        d50 = _change(b["p50_ms"], h["p50_ms"])
+        d99 = _change(b["p99_ms"], h["p99_ms"])
+        flag = ""
+        if d50 > threshold:
+            regressed = True
+            flag = "  ← regression"
+        lines.append(
+            f"{name:<36} {b['p50_ms']:>8.3f} → {h['p50_ms']:<7.3f} {d50:>+7.1f}%"
+            f" {b['p99_ms']:>8.3f} → {h['p99_ms']:<7.3f} {d99:>+7.1f}%{flag}"
+        )
+    return lines, regressed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p50 slowdown in %%")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    lines, regressed = compare(base, head, args.threshold)
+    print("\n".join(lines))
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
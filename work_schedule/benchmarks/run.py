@@ -0,0 +1,73 @@
+"""
+Run the benchmark suite and emit machine-readable results.
+
+Run from ``work_schedule/``:
+    python -m benchmarks.run [--quick] [--output results.json]
+
+Compare two runs (e.g. two commits) with ``python -m benchmarks.compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from . import bench_api, bench_serialization, bench_startup
+
+SUITES = {
+    "api": lambda quick: bench_api.run(
+        years=1 if quick else 3, iterations=50 if quick else 200
+    ),
+    "serialization": lambda quick: bench_serialization.run(
+        repeat=20 if quick else 200
+    ),
+    "startup": lambda quick: bench_startup.run(samples=3 if quick else 10),
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Work Schedule benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller data set, fewer iterations")
+    parser.add_argument("--only", choices=sorted(SUITES), action="append", help="run selected suites")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "quick": args.quick,
+        },
+        "results": {},
+    }
+    for name in args.only or SUITES:
+        print(f"running {name} …", file=sys.stderr)
+        report["results"][name] = SUITES[name](args.quick)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,12 @@ if [ -z "$MODE" ]; then
 fi
 export MODE
 
+# Opt-in request profiling (Server-Timing header + slow-query log)
+if [ -z "$PROFILE" ] && command -v bashio > /dev/null 2>&1; then
+  PROFILE=$(bashio::config 'profile' 'false' 2>/dev/null || echo 'false')
+fi
+export PROFILE="${PROFILE:-false}"
+
 # DB path: honour env, then default
 export DB_PATH="${DB_PATH:-/data/work_schedule.db}"
 
@@ -10,12 +10,12 @@ import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # ── Force in-memory DB BEFORE any app module touches storage ────
 os.environ["DB_PATH"] = ":memory:"
 
-from app import storage                   # noqa: E402
-from app.models import Base               # noqa: E402
+from app import cache, migrations, storage  # noqa: E402
 
 
 def _reset_db():
@@ -24,13 +24,17 @@ def _reset_db():
         "sqlite:///:memory:",
         echo=False,
         connect_args={"check_same_thread": False},
+        # One shared connection – TestClient runs sync routes in worker
+        # threads, and each new connection would see an empty :memory: DB.
+        poolclass=StaticPool,
     )
-    Base.metadata.create_all(engine)
+    migrations.upgrade(engine)
     factory = sessionmaker(bind=engine)
 
     # Monkey-patch storage globals so all code uses this engine
     storage._engine = engine
     storage._SessionLocal = factory
+    cache.clear_all()
 
 
 @pytest.fixture(autouse=True)
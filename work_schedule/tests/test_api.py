@@ -1,5 +1,9 @@
 """Integration tests – full API via FastAPI TestClient."""
 
+import asyncio
+import json
+from datetime import date
+
 import pytest
 
 
@@ -64,10 +68,26 @@ class TestPutShift:
         r = client.put("/api/shifts/2026-06-01", json={"type": "bogus"})
         assert r.status_code == 400
 
+    def test_invalid_date_400(self, client):
+        r = client.put("/api/shifts/2026-13-01", json={"type": "day8"})
+        assert r.status_code == 400
+
     def test_missing_type_422(self, client):
         r = client.put("/api/shifts/2026-06-01", json={})
         assert r.status_code == 422
 
+    def test_broadcasts_shift_changed(self, client):
+        from app import events
+
+        queue = events.subscribe()
+        try:
+            client.put("/api/shifts/2026-06-01", json={"type": "day12"})
+            event = json.loads(queue.get_nowait())
+        finally:
+            events.unsubscribe(queue)
+        assert event["type"] == "shift_changed"
+        assert event["shift_type"] == "day12"
+
 
 # ═══════════════════════════════════════════════════════════════
 #  GET /api/shifts?from=&to=
@@ -96,6 +116,67 @@ class TestGetShifts:
         assert r.status_code == 422
 
 
+class TestGetShiftsCompact:
+    COLUMNS = "application/vnd.work-schedule.columns+json"
+    DAYS = "application/vnd.work-schedule.days+json"
+    RANGE = {"from": "2026-06-01", "to": "2026-06-05"}
+
+    def _seed(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.put("/api/shifts/2026-06-04", json={"type": "night12"})
+
+    def test_default_is_row_objects(self, client):
+        self._seed(client)
+        r = client.get("/api/shifts", params=self.RANGE)
+        assert r.headers["content-type"] == "application/json"
+        assert r.headers["vary"] == "Accept"
+        assert r.json()[0]["start"] == "07:00"
+
+    def test_columns(self, client):
+        self._seed(client)
+        r = client.get("/api/shifts", params=self.RANGE, headers={"Accept": self.COLUMNS})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == self.COLUMNS
+        assert r.json() == {
+            "date": ["2026-06-01", "2026-06-04"],
+            "type": ["day8", "night12"],
+        }
+
+    def test_day_codes(self, client):
+        self._seed(client)
+        r = client.get("/api/shifts", params=self.RANGE, headers={"Accept": self.DAYS})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["start"] == "2026-06-01"
+        assert data["end"] == "2026-06-05"
+        types = data["types"]
+        assert [types[c] for c in data["days"]] == ["day8", "", "", "night12", ""]
+
+    def test_day_codes_span_limit(self, client):
+        r = client.get(
+            "/api/shifts",
+            params={"from": "0001-01-01", "to": "9999-12-31"},
+            headers={"Accept": self.DAYS},
+        )
+        assert r.status_code == 400
+        r = client.get(
+            "/api/shifts",
+            params={"from": "2026-01-01", "to": "2028-12-31"},
+            headers={"Accept": self.DAYS},
+        )
+        assert r.status_code == 200
+        assert len(r.json()["days"]) == 1096
+
+    def test_bad_date_400(self, client):
+        r = client.get(
+            "/api/shifts",
+            params={"from": "june", "to": "2026-06-05"},
+            headers={"Accept": self.DAYS},
+        )
+        assert r.status_code == 400
+        assert client.get("/api/shifts", params={"from": "june", "to": "july"}).status_code == 400
+
+
 # ═══════════════════════════════════════════════════════════════
 #  GET /api/shifts/{date}
 # ═══════════════════════════════════════════════════════════════
@@ -132,6 +213,285 @@ class TestDeleteShift:
         assert r.status_code == 404
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Conditional writes – ETag / If-Match
+# ═══════════════════════════════════════════════════════════════
+
+class TestConditionalWrites:
+    def test_etag_is_row_version(self, client):
+        r = client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        assert r.headers["etag"] == f'"{r.json()["version"]}"'
+        assert client.get("/api/shifts/2026-06-01").headers["etag"] == r.headers["etag"]
+
+    def test_matching_if_match_writes(self, client):
+        etag = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).headers["etag"]
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "night12"}, headers={"If-Match": etag}
+        )
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_stale_if_match_conflicts(self, client):
+        stale = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).headers["etag"]
+        current = client.put("/api/shifts/2026-06-01", json={"type": "day12"}).headers["etag"]
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "night12"}, headers={"If-Match": stale}
+        )
+        assert r.status_code == 409
+        assert r.headers["etag"] == current
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "day12"
+        assert len(client.get("/api/history").json()) == 2
+
+    def test_stale_delete_conflicts(self, client):
+        stale = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).headers["etag"]
+        client.put("/api/shifts/2026-06-01", json={"type": "day12"})
+        r = client.delete("/api/shifts/2026-06-01", headers={"If-Match": stale})
+        assert r.status_code == 409
+        assert client.get("/api/shifts/2026-06-01").status_code == 200
+
+    def test_recreated_shift_gets_new_version(self, client):
+        old = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).headers["etag"]
+        client.delete("/api/shifts/2026-06-01")
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        r = client.delete("/api/shifts/2026-06-01", headers={"If-Match": old})
+        assert r.status_code == 409
+
+    def test_weak_if_match_never_matches(self, client):
+        etag = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).headers["etag"]
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "night12"}, headers={"If-Match": f"W/{etag}"}
+        )
+        assert r.status_code == 409
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "night12"},
+            headers={"If-Match": f"W/{etag}, {etag}"},
+        )
+        assert r.status_code == 200
+
+    def test_if_none_match_creates_only(self, client):
+        headers = {"If-None-Match": "*"}
+        assert client.put(
+            "/api/shifts/2026-06-01", json={"type": "day8"}, headers=headers
+        ).status_code == 200
+        assert client.put(
+            "/api/shifts/2026-06-01", json={"type": "day12"}, headers=headers
+        ).status_code == 409
+
+    def test_if_match_star_requires_existing(self, client):
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "day8"}, headers={"If-Match": "*"}
+        )
+        assert r.status_code == 409
+
+    def test_malformed_if_match(self, client):
+        r = client.put(
+            "/api/shifts/2026-06-01", json={"type": "day8"}, headers={"If-Match": "abc"}
+        )
+        assert r.status_code == 400
+
+
+class TestConditionalReads:
+    RANGE = {"from": "2026-06-01", "to": "2026-06-30"}
+
+    def test_unchanged_range_304(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        r = client.get("/api/shifts", params=self.RANGE)
+        etag = r.headers["etag"]
+        again = client.get("/api/shifts", params=self.RANGE, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+        assert again.content == b""
+
+    def test_write_changes_etag(self, client):
+        etag = client.get("/api/shifts", params=self.RANGE).headers["etag"]
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        r = client.get("/api/shifts", params=self.RANGE, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+        assert len(r.json()) == 1
+
+    def test_etag_per_representation(self, client):
+        plain = client.get("/api/shifts", params=self.RANGE).headers["etag"]
+        days = client.get(
+            "/api/shifts",
+            params=self.RANGE,
+            headers={"Accept": "application/vnd.work-schedule.days+json"},
+        ).headers["etag"]
+        assert plain != days
+
+    def test_month_view_304(self, client):
+        params = {"year": 2026, "month": 6}
+        r = client.get("/api/views/month", params=params)
+        assert r.headers["etag"] == f'W/"{r.json()["version"]}"'
+        again = client.get(
+            "/api/views/month", params=params, headers={"If-None-Match": r.headers["etag"]}
+        )
+        assert again.status_code == 304
+
+    def test_quarter_view_304(self, client):
+        params = {"year": 2026, "quarter": 2}
+        etag = client.get("/api/views/quarter", params=params).headers["etag"]
+        r = client.get("/api/views/quarter", params=params, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+
+
+# ═══════════════════════════════════════════════════════════════
+#  POST /api/shifts/batch
+# ═══════════════════════════════════════════════════════════════
+
+class TestBatch:
+    def test_applies_in_order(self, client):
+        r = client.post("/api/shifts/batch", json={"edits": [
+            {"op": "set", "date": "2026-06-01", "type": "day8"},
+            {"op": "set", "date": "2026-06-01", "type": "night12"},
+            {"op": "set", "date": "2026-06-02", "type": "day12"},
+        ]})
+        assert r.status_code == 200
+        assert [res["status"] for res in r.json()["results"]] == [200, 200, 200]
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "night12"
+        assert len(client.get("/api/history").json()) == 3
+
+    def test_failures_are_per_edit(self, client):
+        r = client.post("/api/shifts/batch", json={"edits": [
+            {"op": "set", "date": "2026-06-01", "type": "bogus"},
+            {"op": "delete", "date": "2026-06-02"},
+            {"op": "set", "date": "2026-06-03", "type": "day8", "if_match": "*"},
+            {"op": "set", "date": "2026-06-04", "type": "day8"},
+        ]})
+        results = r.json()["results"]
+        assert [res["status"] for res in results] == [400, 404, 409, 200]
+        assert results[3]["shift"]["type"] == "day8"
+        assert client.get("/api/shifts/2026-06-04").status_code == 200
+
+    def test_broadcasts_each_change(self, client, monkeypatch):
+        from app.api import edits
+
+        sent = []
+        monkeypatch.setattr(edits, "broadcast", lambda *a: sent.append(a))
+        client.post("/api/shifts/batch", json={"edits": [
+            {"op": "set", "date": "2026-06-01", "type": "day8"},
+            {"op": "delete", "date": "2026-06-01"},
+        ]})
+        assert [(e, d["date"]) for e, d in sent] == [
+            ("shift_changed", "2026-06-01"), ("shift_deleted", "2026-06-01"),
+        ]
+
+    def test_non_string_fields_400(self, client):
+        r = client.post("/api/shifts/batch", json={"edits": [
+            {"op": "set", "date": "2026-06-01", "type": ["day8"]},
+            {"op": "set", "date": "2026-06-01", "type": {"name": "day8"}},
+            {"op": "delete", "date": 20605},
+        ]})
+        assert [res["status"] for res in r.json()["results"]] == [400, 400, 400]
+
+    def test_too_many_edits_422(self, client):
+        edits = [{"op": "delete", "date": "2026-06-01"}] * 501
+        assert client.post("/api/shifts/batch", json={"edits": edits}).status_code == 422
+
+
+# ═══════════════════════════════════════════════════════════════
+#  /api/ws – WebSocket edits and live updates
+# ═══════════════════════════════════════════════════════════════
+
+def _ws_until(ws, type_: str) -> dict:
+    """Next message of *type_*, skipping others."""
+    while True:
+        msg = ws.receive_json()
+        if msg["type"] == type_:
+            return msg
+
+
+class TestWebSocket:
+    def test_set_is_acked_and_saved(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"seq": 1, "op": "set", "date": "2026-06-01", "type": "day8"})
+            ack = _ws_until(ws, "ack")
+        assert ack["seq"] == 1
+        assert ack["status"] == 200
+        assert ack["shift"]["type"] == "day8"
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "day8"
+
+    def test_pipelined_edits_acked_in_order(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            for seq, day in enumerate(range(1, 11), start=1):
+                ws.send_json({"seq": seq, "op": "set", "date": f"2026-06-{day:02d}", "type": "day12"})
+            acks = [_ws_until(ws, "ack") for _ in range(10)]
+        assert [a["seq"] for a in acks] == list(range(1, 11))
+        assert len(client.get("/api/shifts", params={"from": "2026-06-01", "to": "2026-06-30"}).json()) == 10
+
+    def test_change_events_pushed(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"seq": 1, "op": "set", "date": "2026-06-01", "type": "night12"})
+            event = _ws_until(ws, "shift_changed")
+        assert event["date"] == "2026-06-01"
+        assert event["shift_type"] == "night12"
+
+    def test_delete_and_undo(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"seq": 1, "op": "delete", "date": "2026-06-01"})
+            assert _ws_until(ws, "ack")["status"] == 200
+            ws.send_json({"seq": 2, "op": "undo"})
+            ack = _ws_until(ws, "ack")
+        assert ack["restored_date"] == "2026-06-01"
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "day8"
+
+    def test_conflict_ack(self, client):
+        stale = client.put("/api/shifts/2026-06-01", json={"type": "day8"}).json()["version"]
+        current = client.put("/api/shifts/2026-06-01", json={"type": "day12"}).json()["version"]
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({
+                "seq": 5, "op": "set", "date": "2026-06-01", "type": "night12", "if_match": stale,
+            })
+            ack = _ws_until(ws, "ack")
+        assert (ack["seq"], ack["status"], ack["version"]) == (5, 409, current)
+
+    def test_bad_edits_rejected(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_text("not json")
+            ws.send_json({"seq": 2, "op": "set", "date": "2026-02-30", "type": "day8"})
+            ws.send_json({"seq": 3, "op": "set", "date": "2026-06-01", "type": "bogus"})
+            ws.send_json({"seq": 4, "op": "explode"})
+            ws.send_json({"seq": 5, "op": "set", "date": "2026-06-01", "type": []})
+            ws.send_json({"seq": 6, "op": "set", "date": {}, "type": "day8"})
+            acks = [_ws_until(ws, "ack") for _ in range(6)]
+        assert [(a["seq"], a["status"]) for a in acks] == [
+            (None, 400), (2, 400), (3, 400), (4, 400), (5, 400), (6, 400),
+        ]
+
+    def test_scoped_to_schedule(self, client):
+        sid = client.post("/api/schedules", json={"name": "Alex"}).json()["id"]
+        with client.websocket_connect(f"/api/schedules/{sid}/ws") as ws:
+            ws.send_json({"seq": 1, "op": "set", "date": "2026-06-01", "type": "day8"})
+            assert _ws_until(ws, "ack")["status"] == 200
+        assert client.get("/api/shifts/2026-06-01").status_code == 404
+        assert client.get(f"/api/schedules/{sid}/shifts/2026-06-01").status_code == 200
+
+    def test_too_many_pending_edits_closes(self, client, monkeypatch):
+        from starlette.websockets import WebSocketDisconnect
+
+        from app.api import ws as ws_module
+
+        async def stalled(inbox, send, schedule_id):
+            await asyncio.Event().wait()
+
+        monkeypatch.setattr(ws_module, "MAX_PENDING_EDITS", 2)
+        monkeypatch.setattr(ws_module, "_apply_edits", stalled)
+        with client.websocket_connect("/api/ws") as ws:
+            for seq in range(3):
+                ws.send_json({"seq": seq, "op": "delete", "date": "2026-06-01"})
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+        assert exc.value.code == 1008
+
+    def test_unknown_schedule_refused(self, client):
+        from starlette.websockets import WebSocketDisconnect
+
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/api/schedules/99/ws") as ws:
+                ws.receive_json()
+
+
 # ═══════════════════════════════════════════════════════════════
 #  POST /api/undo
 # ═══════════════════════════════════════════════════════════════
@@ -151,6 +511,15 @@ class TestUndo:
         r = client.get("/api/shifts/2026-06-01")
         assert r.status_code == 404
 
+    def test_undo_broadcasts_date(self, client, monkeypatch):
+        from app.api import shifts as shifts_api
+
+        sent = []
+        monkeypatch.setattr(shifts_api, "broadcast", lambda *a: sent.append(a))
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.post("/api/undo")
+        assert sent[-1] == ("undo", {"schedule_id": 1, "date": "2026-06-01"})
+
     def test_undo_reverts_update(self, client):
         client.put("/api/shifts/2026-06-01", json={"type": "day8"})
         client.put("/api/shifts/2026-06-01", json={"type": "night12"})
@@ -209,6 +578,19 @@ class TestHistory:
         assert data[0]["date"] == "2026-06-02"
         assert data[1]["date"] == "2026-06-01"
 
+    def test_history_pages_with_before_cursor(self, client):
+        for day in range(1, 6):
+            client.put(f"/api/shifts/2026-06-0{day}", json={"type": "day8"})
+        first = client.get("/api/history", params={"limit": 2}).json()
+        second = client.get(
+            "/api/history", params={"limit": 2, "before": first[-1]["id"]}
+        ).json()
+        last = client.get(
+            "/api/history", params={"limit": 2, "before": second[-1]["id"]}
+        ).json()
+        dates = [e["date"] for e in first + second + last]
+        assert dates == [f"2026-06-0{day}" for day in range(5, 0, -1)]
+
 
 # ═══════════════════════════════════════════════════════════════
 #  GET /api/next_shift
@@ -237,6 +619,314 @@ class TestNextShift:
         assert "T" in data["datetime"]
 
 
+# ═══════════════════════════════════════════════════════════════
+#  GET /api/stats
+# ═══════════════════════════════════════════════════════════════
+
+class TestStats:
+    def test_empty(self, client):
+        r = client.get("/api/stats", params={"from": "2026-01-01", "to": "2026-12-31"})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"]["shifts"] == 0
+        assert data["buckets"] == []
+
+    def test_monthly_totals(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.put("/api/shifts/2026-06-02", json={"type": "night12"})
+        client.put("/api/shifts/2026-07-01", json={"type": "day12"})
+
+        data = client.get(
+            "/api/stats", params={"from": "2026-01-01", "to": "2026-12-31"}
+        ).json()
+        assert data["group"] == "month"
+        assert data["total"]["shifts"] == 3
+        assert data["total"]["hours"] == 32
+        june, july = data["buckets"]
+        assert june["key"] == "2026-06"
+        assert june["hours"] == 20
+        assert june["by_type"]["night12"] == {"shifts": 1, "hours": 12}
+        assert july["by_type"] == {"day12": {"shifts": 1, "hours": 12}}
+
+    def test_group_by_type(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "night12"})
+        client.put("/api/shifts/2026-06-05", json={"type": "night12"})
+        data = client.get(
+            "/api/stats",
+            params={"from": "2026-04-01", "to": "2026-06-30", "group": "type"},
+        ).json()
+        assert data["buckets"][0]["key"] == "night12"
+        assert data["buckets"][0]["shifts"] == 2
+
+    def test_reflects_writes_after_caching(self, client):
+        params = {"from": "2026-06-01", "to": "2026-06-30"}
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        assert client.get("/api/stats", params=params).json()["total"]["shifts"] == 1
+        client.delete("/api/shifts/2026-06-01")
+        assert client.get("/api/stats", params=params).json()["total"]["shifts"] == 0
+
+    def test_invalid_group_422(self, client):
+        r = client.get(
+            "/api/stats",
+            params={"from": "2026-01-01", "to": "2026-12-31", "group": "day"},
+        )
+        assert r.status_code == 422
+
+
+# ═══════════════════════════════════════════════════════════════
+#  GET /api/views/month, /api/views/quarter
+# ═══════════════════════════════════════════════════════════════
+
+class TestViews:
+    def test_month_grid(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.put("/api/shifts/2026-06-30", json={"type": "night12"})
+        r = client.get("/api/views/month", params={"year": 2026, "month": 6})
+        assert r.status_code == 200
+        data = r.json()
+        types = data["types"]
+        weeks = data["weeks"]
+        # June 2026 starts on a Monday and spans 5 weeks
+        assert len(weeks) == 5
+        assert all(len(w) == 7 for w in weeks)
+        assert weeks[0][0] == [1, types.index("day8")]
+        assert weeks[0][1] == [2, 0]
+        assert weeks[4][1] == [30, types.index("night12")]
+        assert weeks[4][2] is None
+
+    def test_month_leading_padding(self, client):
+        # March 2026 starts on a Sunday
+        data = client.get("/api/views/month", params={"year": 2026, "month": 3}).json()
+        assert data["weeks"][0][:6] == [None] * 6
+        assert data["weeks"][0][6] == [1, 0]
+
+    def test_quarter_strips(self, client):
+        client.put("/api/shifts/2026-08-15", json={"type": "day12"})
+        r = client.get("/api/views/quarter", params={"year": 2026, "quarter": 3})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["start"] == "2026-07-01"
+        assert data["end"] == "2026-09-30"
+        july, august, september = data["months"]
+        assert len(july["days"]) == 31
+        assert len(september["days"]) == 30
+        assert august["days"][14] == data["types"].index("day12")
+        assert sum(july["days"]) == 0
+
+    def test_view_refreshed_after_write(self, client):
+        params = {"year": 2026, "month": 6}
+        assert client.get("/api/views/month", params=params).json()["weeks"][0][0] == [1, 0]
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        assert client.get("/api/views/month", params=params).json()["weeks"][0][0][1] != 0
+
+    def test_invalid_month_422(self, client):
+        r = client.get("/api/views/month", params={"year": 2026, "month": 13})
+        assert r.status_code == 422
+
+    def test_views_carry_data_version(self, client):
+        params = {"year": 2026, "month": 6}
+        before = client.get("/api/views/month", params=params).json()["version"]
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        month = client.get("/api/views/month", params=params).json()
+        quarter = client.get("/api/views/quarter", params={"year": 2026, "quarter": 2}).json()
+        assert month["version"] == quarter["version"] == before + 1
+        assert month["version"] == client.get("/api/version").json()["version"]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  GET /api/version, /api/changes, /sw.js
+# ═══════════════════════════════════════════════════════════════
+
+class TestOffline:
+    def test_version_bumped_by_writes(self, client):
+        r = client.get("/api/version")
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == "no-cache"
+        before = r.json()["version"]
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.delete("/api/shifts/2026-06-01")
+        assert client.get("/api/version").json()["version"] == before + 2
+
+    def test_version_per_schedule_prefix(self, client):
+        assert client.get("/api/schedules/1/version").json() == client.get("/api/version").json()
+
+    def test_changes_since(self, client):
+        since = client.get("/api/version").json()["version"]
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.put("/api/shifts/2026-06-02", json={"type": "day8"})
+        client.delete("/api/shifts/2026-06-02")
+        r = client.get("/api/changes", params={"since": since})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["version"] == since + 3
+        assert [s["date"] for s in data["changed"]] == ["2026-06-01"]
+        assert data["deleted"] == ["2026-06-02"]
+        assert client.get("/api/changes", params={"since": data["version"]}).json()["changed"] == []
+
+    def test_changes_resync_hint(self, client):
+        r = client.get("/api/changes", params={"since": 10**6})
+        assert r.json()["resync"] is True
+
+    def test_changes_per_schedule(self, client):
+        sid = client.post("/api/schedules", json={"name": "Alex"}).json()["id"]
+        client.put(f"/api/schedules/{sid}/shifts/2026-06-01", json={"type": "day8"})
+        assert client.get("/api/changes", params={"since": 0}).json()["changed"] == []
+        scoped = client.get(f"/api/schedules/{sid}/changes", params={"since": 0}).json()
+        assert len(scoped["changed"]) == 1
+
+    def test_changes_requires_since(self, client):
+        assert client.get("/api/changes").status_code == 422
+
+    def test_service_worker_served_from_root(self, client):
+        r = client.get("/sw.js")
+        assert r.status_code == 200
+        assert "javascript" in r.headers["content-type"]
+        assert "no-cache" in r.headers["cache-control"]
+        assert "addEventListener" in r.text
+
+
+# ═══════════════════════════════════════════════════════════════
+#  /api/schedules – multiple schedules
+# ═══════════════════════════════════════════════════════════════
+
+class TestSchedules:
+    def _create(self, client, name="Alex") -> int:
+        r = client.post("/api/schedules", json={"name": name})
+        assert r.status_code == 201
+        return r.json()["id"]
+
+    def test_list_has_default(self, client):
+        assert client.get("/api/schedules").json() == [{"id": 1, "name": "default"}]
+
+    def test_duplicate_name_conflicts(self, client):
+        self._create(client)
+        assert client.post("/api/schedules", json={"name": "Alex"}).status_code == 409
+
+    def test_scoped_routes_are_isolated(self, client):
+        sid = self._create(client)
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.put(f"/api/schedules/{sid}/shifts/2026-06-01", json={"type": "night12"})
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "day8"
+        assert client.get(f"/api/schedules/{sid}/shifts/2026-06-01").json()["type"] == "night12"
+        assert client.get("/api/schedules/1/shifts/2026-06-01").json()["type"] == "day8"
+        month = client.get(
+            f"/api/schedules/{sid}/views/month", params={"year": 2026, "month": 6}
+        ).json()
+        cells = [c for week in month["weeks"] for c in week if c and c[1]]
+        assert cells == [[1, 3]]
+
+    def test_undo_is_per_schedule(self, client):
+        sid = self._create(client)
+        client.put(f"/api/schedules/{sid}/shifts/2026-06-01", json={"type": "day8"})
+        assert client.post("/api/undo").status_code == 404
+        assert client.post(f"/api/schedules/{sid}/undo").status_code == 200
+        assert client.get(f"/api/schedules/{sid}/shifts/2026-06-01").status_code == 404
+
+    def test_unknown_schedule_404(self, client):
+        assert client.get("/api/schedules/99/history").status_code == 404
+        assert client.put(
+            "/api/schedules/99/shifts/2026-06-01", json={"type": "day8"}
+        ).status_code == 404
+
+    def test_delete(self, client):
+        sid = self._create(client)
+        client.put(f"/api/schedules/{sid}/shifts/2026-06-01", json={"type": "day8"})
+        assert client.delete(f"/api/schedules/{sid}").status_code == 200
+        assert client.get(f"/api/schedules/{sid}/shifts/2026-06-01").status_code == 404
+        assert client.delete(f"/api/schedules/{sid}").status_code == 404
+        assert client.delete("/api/schedules/1").status_code == 400
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Response compression
+# ═══════════════════════════════════════════════════════════════
+
+class TestCompression:
+    def _seed_month(self, client):
+        for day in range(1, 31):
+            client.put(f"/api/shifts/2026-06-{day:02}", json={"type": "day8"})
+
+    def test_large_response_brotli(self, client):
+        self._seed_month(client)
+        r = client.get(
+            "/api/shifts",
+            params={"from": "2026-06-01", "to": "2026-06-30"},
+            headers={"Accept-Encoding": "gzip, br"},
+        )
+        assert r.headers["content-encoding"] == "br"
+        assert "Accept-Encoding" in r.headers["vary"]
+        assert len(r.json()) == 30
+
+    def test_large_response_gzip(self, client):
+        self._seed_month(client)
+        r = client.get(
+            "/api/shifts",
+            params={"from": "2026-06-01", "to": "2026-06-30"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert r.headers["content-encoding"] == "gzip"
+        assert len(r.json()) == 30
+
+    def test_small_response_uncompressed(self, client):
+        r = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+        assert "content-encoding" not in r.headers
+
+    def test_compressed_types_and_encoded_bodies_pass_through(self):
+        from fastapi import FastAPI, Response
+        from fastapi.testclient import TestClient
+
+        from app.compression import CompressionMiddleware
+
+        body = b"a" * 4096
+        app = FastAPI()
+
+        @app.get("/{media_type:path}")
+        def raw(media_type: str, encoded: bool = False):
+            headers = {"Content-Encoding": "identity"} if encoded else None
+            return Response(body, media_type=media_type, headers=headers)
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        c = TestClient(app)
+        headers = {"Accept-Encoding": "gzip"}
+        for media_type in ("application/gzip", "application/zip", "image/png", "font/woff2"):
+            r = c.get(f"/{media_type}", headers=headers)
+            assert "content-encoding" not in r.headers, media_type
+            assert r.content == body
+        assert c.get("/text/plain", params={"encoded": True}, headers=headers).headers[
+            "content-encoding"
+        ] == "identity"
+        assert c.get("/image/svg+xml", headers=headers).headers["content-encoding"] == "gzip"
+        assert c.get("/text/plain", headers=headers).headers["content-encoding"] == "gzip"
+
+    def test_choose_encoding(self):
+        from app.compression import choose_encoding
+
+        assert choose_encoding("gzip, deflate, br") == "br"
+        assert choose_encoding("gzip") == "gzip"
+        assert choose_encoding("br;q=0, gzip") == "gzip"
+        assert choose_encoding("identity") is None
+        assert choose_encoding("") is None
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Startup warm-up
+# ═══════════════════════════════════════════════════════════════
+
+class TestWarmUp:
+    def test_stages_timed(self):
+        from app.warmup import warm_up
+
+        assert set(warm_up()) == {"engine", "next_shift", "views"}
+
+    def test_lifespan_fills_view_cache(self, client):
+        from app import views
+
+        today = date.today()
+        hits = views._cache.hits
+        client.get("/api/views/month", params={"year": today.year, "month": today.month})
+        assert views._cache.hits == hits + 1
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Full workflow – end-to-end scenario
 # ═══════════════════════════════════════════════════════════════
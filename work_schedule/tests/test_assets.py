@@ -0,0 +1,103 @@
+"""Tests for the static UI asset pipeline."""
+
+import gzip
+import json
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.assets import IMMUTABLE, REVALIDATE, AssetFiles, build
+
+
+@pytest.fixture()
+def ui_src(tmp_path):
+    src = tmp_path / "ui"
+    src.mkdir()
+    (src / "app.js").write_text("console.log('hi');\n" * 100)
+    (src / "style.css").write_text("body { color: red; }\n")
+    (src / "index.html").write_text(
+        '<link rel="stylesheet" href="ui/style.css" />\n'
+        '<script src="ui/app.js"></script>\n'
+    )
+    return src
+
+
+@pytest.fixture()
+def dist(tmp_path, ui_src):
+    out = tmp_path / "dist"
+    manifest = build(str(ui_src), str(out))
+    return out, manifest
+
+
+# ═══════════════════════════════════════════════════════════════
+#  build()
+# ═══════════════════════════════════════════════════════════════
+
+class TestBuild:
+    def test_hashed_names(self, dist):
+        out, manifest = dist
+        assert manifest["app.js"].startswith("app.")
+        assert manifest["app.js"].endswith(".js")
+        assert (out / manifest["app.js"]).exists()
+        assert json.loads((out / "manifest.json").read_text()) == manifest
+
+    def test_hash_changes_with_content(self, tmp_path, ui_src, dist):
+        _, first = dist
+        (ui_src / "app.js").write_text("console.log('changed');\n")
+        second = build(str(ui_src), str(tmp_path / "dist2"))
+        assert first["app.js"] != second["app.js"]
+        assert first["style.css"] == second["style.css"]
+
+    def test_index_references_rewritten(self, dist):
+        out, manifest = dist
+        index = (out / "index.html").read_text()
+        assert f'"ui/{manifest["app.js"]}"' in index
+        assert '"ui/app.js"' not in index
+
+    def test_precompressed_variants(self, ui_src, dist):
+        out, manifest = dist
+        original = (ui_src / "app.js").read_bytes()
+        hashed = out / manifest["app.js"]
+        assert gzip.decompress((out / (hashed.name + ".gz")).read_bytes()) == original
+        assert brotli.decompress((out / (hashed.name + ".br")).read_bytes()) == original
+
+
+# ═══════════════════════════════════════════════════════════════
+#  AssetFiles serving
+# ═══════════════════════════════════════════════════════════════
+
+class TestAssetFiles:
+    @pytest.fixture()
+    def static_client(self, dist):
+        out, manifest = dist
+        app = Starlette(routes=[Mount("/ui", AssetFiles(directory=str(out), html=True))])
+        return TestClient(app), manifest
+
+    def test_hashed_asset_immutable(self, static_client):
+        c, manifest = static_client
+        r = c.get(f"/ui/{manifest['app.js']}", headers={"Accept-Encoding": "identity"})
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == IMMUTABLE
+        assert "content-encoding" not in r.headers
+
+    def test_precompressed_brotli(self, static_client):
+        c, manifest = static_client
+        r = c.get(f"/ui/{manifest['app.js']}", headers={"Accept-Encoding": "gzip, br"})
+        assert r.headers["content-encoding"] == "br"
+        assert "javascript" in r.headers["content-type"]
+        assert r.text.startswith("console.log")
+
+    def test_precompressed_gzip(self, static_client):
+        c, manifest = static_client
+        r = c.get(f"/ui/{manifest['style.css']}", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.text.startswith("body")
+
+    def test_index_revalidated(self, static_client):
+        c, _ = static_client
+        r = c.get("/ui/index.html")
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == REVALIDATE
@@ -0,0 +1,189 @@
+"""Tests for database snapshots – backup, rotation and restore."""
+
+import gzip
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import backup, migrations, storage
+
+
+@pytest.fixture(autouse=True)
+def backup_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _snapshot_rows(path, sql: str) -> list:
+    db = path.with_suffix("")
+    db.write_bytes(gzip.decompress(path.read_bytes()))
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  create_backup / rotation
+# ═══════════════════════════════════════════════════════════════
+
+class TestCreate:
+    def test_snapshot_holds_live_data(self, backup_dir):
+        storage.upsert_shift("2026-06-01", "day8")
+        entry = backup.create_backup()
+        assert entry["pages"] > 0
+        assert entry["size"] == os.path.getsize(backup_dir / entry["name"])
+        rows = _snapshot_rows(backup_dir / entry["name"], "SELECT count(*) FROM shifts")
+        assert rows == [(1,)]
+
+    def test_no_temp_files_left(self, backup_dir):
+        entry = backup.create_backup()
+        assert os.listdir(backup_dir) == [entry["name"]]
+
+    def test_rotation_keeps_newest(self, monkeypatch):
+        monkeypatch.setattr(backup, "BACKUP_KEEP", 2)
+        names = [backup.create_backup()["name"] for _ in range(3)]
+        assert [b["name"] for b in backup.list_backups()] == names[:0:-1]
+
+    def test_busy(self):
+        with backup._lock:
+            with pytest.raises(backup.BackupBusy):
+                backup.create_backup()
+
+    def test_backup_path_rejects_other_names(self, backup_dir):
+        (backup_dir / "notes.txt").write_text("x")
+        assert backup.backup_path("notes.txt") is None
+        assert backup.backup_path("../work_schedule.db") is None
+
+
+# ═══════════════════════════════════════════════════════════════
+#  restore_backup
+# ═══════════════════════════════════════════════════════════════
+
+class TestRestore:
+    def test_restores_snapshot(self):
+        storage.upsert_shift("2026-06-01", "day8")
+        name = backup.create_backup()["name"]
+        storage.upsert_shift("2026-06-01", "night12")
+        storage.upsert_shift("2026-06-02", "day12")
+        seen = storage.get_data_version()
+
+        version = backup.restore_backup(name)
+        assert version > seen
+        assert storage.get_data_version() == version
+        [shift] = storage.get_shifts("2026-06-01", "2026-06-30")
+        assert shift["type"] == "day8"
+        # Row versions and sync cursors from before the restore are void.
+        assert shift["version"] == version
+        assert storage.get_changes(seen)["resync"]
+
+    def test_writes_continue_after_restore(self):
+        name = backup.create_backup()["name"]
+        version = backup.restore_backup(name)
+        storage.upsert_shift("2026-06-03", "day8")
+        changes = storage.get_changes(version)
+        assert not changes["resync"]
+        assert [s["date"] for s in changes["changed"]] == ["2026-06-03"]
+
+    def test_write_racing_the_copy_gets_no_restored_version(self, monkeypatch):
+        storage.upsert_shift("2026-06-01", "day8")
+        name = backup.create_backup()["name"]
+        copy = backup._copy_into_live
+        raced = []
+
+        def racing_copy(path):
+            raced.append(storage.upsert_shift("2026-06-02", "day12")["version"])
+            copy(path)
+
+        monkeypatch.setattr(backup, "_copy_into_live", racing_copy)
+        version = backup.restore_backup(name)
+        assert version > raced[0]
+        assert storage.get_shift("2026-06-01")["version"] == version
+
+    def test_older_schema_snapshot_migrated(self, backup_dir):
+        # A snapshot written before the change log (schema 5).
+        old = backup_dir / "old.db"
+        engine = create_engine(f"sqlite:///{old}")
+        migrations.upgrade(engine, [m for m in migrations.MIGRATIONS if m.version <= 5])
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO shifts (schedule_id, day, code, version) VALUES (1, 20605, 3, 7)"
+            )
+            conn.exec_driver_sql("INSERT INTO meta (key, value) VALUES ('data_version', '7')")
+        engine.dispose()
+        name = "work_schedule-20260101-000000-000000.db.gz"
+        (backup_dir / name).write_bytes(gzip.compress(old.read_bytes()))
+
+        version = backup.restore_backup(name)
+        assert storage.get_shift("2026-06-01") == {
+            "date": "2026-06-01", "type": "night12", "start": "19:00", "end": "07:00",
+            "version": version,
+        }
+        assert migrations.get_version(storage._get_engine()) == max(
+            m.version for m in migrations.MIGRATIONS
+        )
+        storage.upsert_shift("2026-06-02", "day8")
+        assert [s["date"] for s in storage.get_changes(version)["changed"]] == ["2026-06-02"]
+
+    def test_unknown_name(self):
+        with pytest.raises(FileNotFoundError):
+            backup.restore_backup("work_schedule-20260101-000000-000000.db.gz")
+
+    def test_corrupt_snapshot_rejected(self, backup_dir):
+        storage.upsert_shift("2026-06-01", "day8")
+        name = "work_schedule-20260101-000000-000000.db.gz"
+        (backup_dir / name).write_bytes(gzip.compress(b"not a database" * 100))
+        with pytest.raises(backup.BackupInvalid):
+            backup.restore_backup(name)
+        assert storage.get_shift("2026-06-01")["type"] == "day8"
+
+    def test_newer_schema_rejected(self, backup_dir):
+        name = backup.create_backup()["name"]
+        path = backup_dir / name
+        db = backup_dir / "newer.db"
+        db.write_bytes(gzip.decompress(path.read_bytes()))
+        conn = sqlite3.connect(db)
+        with conn:
+            conn.execute(
+                "UPDATE meta SET value = ? WHERE key = ?",
+                (str(max(m.version for m in migrations.MIGRATIONS) + 1),
+                 migrations.SCHEMA_VERSION_KEY),
+            )
+        conn.close()
+        path.write_bytes(gzip.compress(db.read_bytes()))
+        with pytest.raises(backup.BackupInvalid, match="newer"):
+            backup.restore_backup(name)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════
+
+class TestBackupAPI:
+    def test_create_list_download(self, client):
+        r = client.post("/api/backups")
+        assert r.status_code == 201
+        name = r.json()["name"]
+        assert [b["name"] for b in client.get("/api/backups").json()] == [name]
+        r = client.get(f"/api/backups/{name}")
+        assert r.status_code == 200
+        assert gzip.decompress(r.content).startswith(b"SQLite format 3")
+
+    def test_restore(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        name = client.post("/api/backups").json()["name"]
+        client.delete("/api/shifts/2026-06-01")
+        r = client.post(f"/api/backups/{name}/restore")
+        assert r.status_code == 200
+        assert r.json()["version"] == client.get("/api/version").json()["version"]
+        assert client.get("/api/shifts/2026-06-01").json()["type"] == "day8"
+
+    def test_restore_errors(self, client, backup_dir):
+        assert client.post("/api/backups/nope.db.gz/restore").status_code == 404
+        name = "work_schedule-20260101-000000-000000.db.gz"
+        (backup_dir / name).write_bytes(b"garbage")
+        assert client.post(f"/api/backups/{name}/restore").status_code == 422
+        assert client.get("/api/backups/nope.db.gz").status_code == 404
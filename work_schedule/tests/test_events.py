@@ -0,0 +1,160 @@
+"""Tests for the event hub's per-subscriber batching."""
+
+import asyncio
+import json
+
+import pytest
+
+from app import events
+from app.api.ws import _for_schedule
+
+
+@pytest.fixture()
+def window(monkeypatch):
+    def set_window(ms: float) -> None:
+        monkeypatch.setattr(events, "EVENT_BATCH_MS", ms)
+    return set_window
+
+
+async def _collect(queue: asyncio.Queue, wait: float = 0.1) -> list[dict]:
+    """Every message that arrives on *queue* within *wait* seconds."""
+    out = []
+    try:
+        while True:
+            out.append(json.loads(await asyncio.wait_for(queue.get(), wait)))
+    except asyncio.TimeoutError:
+        return out
+
+
+def _run(send, wait: float = 0.1) -> list[dict]:
+    async def main():
+        queue = events.subscribe()
+        try:
+            await send()
+            return await _collect(queue, wait)
+        finally:
+            events.unsubscribe(queue)
+    return asyncio.run(main())
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Batching
+# ═══════════════════════════════════════════════════════════════
+
+class TestBatching:
+    def test_burst_becomes_one_message(self, window):
+        window(20)
+
+        async def send():
+            for day in (3, 1, 2, 1):
+                events.broadcast("shift_changed", {"schedule_id": 1, "date": f"2026-06-0{day}"})
+
+        [message] = _run(send)
+        assert message["type"] == "batch"
+        assert message["dates"] == ["2026-06-01", "2026-06-02", "2026-06-03"]
+        assert [e["date"] for e in message["events"]] == [
+            "2026-06-03", "2026-06-01", "2026-06-02", "2026-06-01",
+        ]
+
+    def test_lone_event_sent_as_is(self, window):
+        window(20)
+
+        async def send():
+            events.broadcast("shift_deleted", {"date": "2026-06-01"})
+
+        [message] = _run(send)
+        assert message["type"] == "shift_deleted"
+
+    def test_zero_window_sends_each(self, window):
+        window(0)
+
+        async def send():
+            events.broadcast("shift_changed", {"date": "2026-06-01"})
+            events.broadcast("shift_changed", {"date": "2026-06-02"})
+
+        assert [m["type"] for m in _run(send)] == ["shift_changed", "shift_changed"]
+
+    def test_windows_do_not_merge(self, window):
+        window(20)
+
+        async def send():
+            events.broadcast("shift_changed", {"date": "2026-06-01"})
+            await asyncio.sleep(0.06)
+            events.broadcast("shift_changed", {"date": "2026-06-02"})
+
+        assert [m["date"] for m in _run(send)] == ["2026-06-01", "2026-06-02"]
+
+    def test_broadcast_from_worker_threads(self, window):
+        window(50)
+
+        async def send():
+            await asyncio.gather(*(
+                asyncio.to_thread(events.broadcast, "shift_changed", {"date": f"2026-06-0{d}"})
+                for d in (1, 2, 3)
+            ))
+
+        [message] = _run(send)
+        assert message["dates"] == ["2026-06-01", "2026-06-02", "2026-06-03"]
+
+    def test_unsubscribe_cancels_pending_flush(self, window):
+        window(20)
+
+        async def main():
+            queue = events.subscribe()
+            events.broadcast("shift_changed", {"date": "2026-06-01"})
+            events.unsubscribe(queue)
+            await asyncio.sleep(0.05)
+            return queue.empty()
+
+        assert asyncio.run(main())
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Per-schedule filtering (WebSocket)
+# ═══════════════════════════════════════════════════════════════
+
+class TestForSchedule:
+    def _batch(self, *schedule_ids):
+        return json.dumps(events.batch([
+            {"type": "shift_changed", "ts": 0, "schedule_id": sid, "date": f"2026-06-0{i}"}
+            for i, sid in enumerate(schedule_ids, 1)
+        ]))
+
+    def test_own_batch_untouched(self):
+        payload = self._batch(1, 1)
+        assert _for_schedule(payload, 1) == payload
+
+    def test_batch_narrowed_to_schedule(self):
+        assert json.loads(_for_schedule(self._batch(1, 2, 1), 1))["dates"] == [
+            "2026-06-01", "2026-06-03",
+        ]
+        assert json.loads(_for_schedule(self._batch(1, 2), 2))["type"] == "shift_changed"
+        assert _for_schedule(self._batch(2, 2), 1) is None
+
+    def test_unscoped_events_reach_everyone(self):
+        payload = json.dumps({"type": "refresh", "ts": 0})
+        assert _for_schedule(payload, 5) == payload
+
+
+# ═══════════════════════════════════════════════════════════════
+#  SSE stream
+# ═══════════════════════════════════════════════════════════════
+
+class TestSSEStream:
+    def test_ends_when_hub_drops_the_queue(self, window, monkeypatch):
+        window(0)
+
+        async def main():
+            queue = events.subscribe()
+            monkeypatch.setattr(queue, "put_nowait", _full)
+            stream = events._sse_generator(queue)
+            assert await stream.__anext__() == ": connected\n\n"
+            events.broadcast("shift_changed", {"date": "2026-06-01"})
+            assert not events.is_subscribed(queue)
+            return [m async for m in stream]
+
+        assert asyncio.run(asyncio.wait_for(main(), 1)) == []
+
+
+def _full(item):
+    raise asyncio.QueueFull
@@ -0,0 +1,70 @@
+"""Tests for the Prometheus metrics registry and /metrics endpoint."""
+
+import pytest
+
+from app import metrics
+from app.metrics import Counter, Gauge, Histogram
+
+
+@pytest.fixture(autouse=True)
+def _own_registry(monkeypatch):
+    # Metrics made here register into a copy, so /metrics elsewhere never sees them.
+    monkeypatch.setattr(metrics, "_registry", list(metrics._registry))
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Metric types
+# ═══════════════════════════════════════════════════════════════
+
+class TestMetricTypes:
+    def test_counter_labels(self):
+        c = Counter("test_counter_total", "help")
+        c.inc(route="/a")
+        c.inc(2, route="/a")
+        c.inc(route="/b")
+        lines = list(c.render())
+        assert "# TYPE work_schedule_test_counter_total counter" in lines
+        assert 'work_schedule_test_counter_total{route="/a"} 3' in lines
+        assert 'work_schedule_test_counter_total{route="/b"} 1' in lines
+
+    def test_gauge_callback(self):
+        g = Gauge("test_gauge", "help", fn=lambda: 7)
+        assert "work_schedule_test_gauge 7" in list(g.render())
+
+    def test_histogram_cumulative_buckets(self):
+        h = Histogram("test_seconds", "help", buckets=(0.1, 1.0))
+        h.observe(0.05)
+        h.observe(0.1)
+        h.observe(0.5)
+        h.observe(3)
+        lines = list(h.render())
+        assert 'work_schedule_test_seconds_bucket{le="0.1"} 2' in lines
+        assert 'work_schedule_test_seconds_bucket{le="1.0"} 3' in lines
+        assert 'work_schedule_test_seconds_bucket{le="+Inf"} 4' in lines
+        assert "work_schedule_test_seconds_count 4" in lines
+        assert "work_schedule_test_seconds_sum 3.65" in lines
+
+
+# ═══════════════════════════════════════════════════════════════
+#  GET /metrics
+# ═══════════════════════════════════════════════════════════════
+
+class TestMetricsEndpoint:
+    def test_exposition(self, client):
+        client.put("/api/shifts/2026-06-01", json={"type": "day8"})
+        client.get("/api/stats", params={"from": "2026-06-01", "to": "2026-06-30"})
+        client.get("/api/stats", params={"from": "2026-06-01", "to": "2026-06-30"})
+
+        r = client.get("/metrics")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/plain")
+        body = r.text
+        assert (
+            'work_schedule_http_request_duration_seconds_count'
+            '{method="PUT",route="/api/shifts/{date}"}' in body
+        )
+        assert "work_schedule_db_sessions_total" in body
+        assert "work_schedule_db_commit_duration_seconds_bucket" in body
+        assert "work_schedule_history_rows 1" in body
+        assert "work_schedule_sse_subscribers 0" in body
+        assert 'work_schedule_cache_hits_total{cache="stats"}' in body
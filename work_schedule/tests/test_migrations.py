@@ -0,0 +1,266 @@
+"""Tests for the schema migration runner."""
+
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import migrations
+from app.migrations import Migration
+from app.models import Base
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield eng
+    eng.dispose()
+
+
+def _schema(eng) -> dict:
+    """Table columns and index names, for comparing two databases."""
+    with eng.connect() as conn:
+        names = conn.execute(
+            text("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")
+        ).all()
+        out = {}
+        for kind, name in names:
+            if kind == "table":
+                cols = conn.exec_driver_sql(f"PRAGMA table_info({name})").all()
+                out[name] = sorted((c[1], c[2].upper(), c[3], c[5]) for c in cols)
+            else:
+                out[name] = kind
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Runner
+# ═══════════════════════════════════════════════════════════════
+
+class TestUpgrade:
+    def test_fresh_database_reaches_latest(self, engine):
+        latest = max(m.version for m in migrations.MIGRATIONS)
+        assert migrations.upgrade(engine) == latest
+        assert migrations.get_version(engine) == latest
+
+    def test_matches_models(self, engine, tmp_path):
+        reference = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+        Base.metadata.create_all(reference)
+        migrations.upgrade(engine)
+        expected = _schema(reference)
+        reference.dispose()
+        assert _schema(engine) == expected
+
+    def test_idempotent(self, engine):
+        calls = []
+        steps = [*migrations.MIGRATIONS[:1], Migration(2, "two", lambda conn: calls.append(2))]
+        migrations.upgrade(engine, steps)
+        migrations.upgrade(engine, steps)
+        assert calls == [2]
+
+    def test_steps_run_in_order(self, engine):
+        calls = []
+        steps = [
+            Migration(3, "c", lambda conn: calls.append(3)),
+            *migrations.MIGRATIONS[:1],
+            Migration(2, "b", lambda conn: calls.append(2)),
+        ]
+        assert migrations.upgrade(engine, steps) == 3
+        assert calls == [2, 3]
+
+    def test_concurrent_upgraders(self, tmp_path, monkeypatch):
+        # Both read the version before either migrates (two workers, or
+        # an overlapping restart).
+        path = tmp_path / "shared.db"
+        barrier = threading.Barrier(2)
+        read_version = migrations.get_version
+
+        def get_version(engine):
+            version = read_version(engine)
+            barrier.wait(timeout=5)
+            return version
+
+        monkeypatch.setattr(migrations, "get_version", get_version)
+        engines = [create_engine(f"sqlite:///{path}") for _ in range(2)]
+        results, errors = [], []
+
+        def run(engine):
+            try:
+                results.append(migrations.upgrade(engine))
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=run, args=(e,)) for e in engines]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for e in engines:
+            e.dispose()
+        latest = max(m.version for m in migrations.MIGRATIONS)
+        assert errors == []
+        assert results == [latest, latest]
+
+    def test_failed_step_rolls_back_ddl(self, engine):
+        def broken(conn):
+            conn.exec_driver_sql("CREATE TABLE half_done (x INTEGER)")
+            raise RuntimeError("boom")
+
+        steps = [*migrations.MIGRATIONS[:1], Migration(2, "broken", broken)]
+        with pytest.raises(RuntimeError):
+            migrations.upgrade(engine, steps)
+        assert migrations.get_version(engine) == 1
+        assert "half_done" not in _schema(engine)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Batched data migrations
+# ═══════════════════════════════════════════════════════════════
+
+def _fill_history(engine, n: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO history (timestamp, date, patch, description) "
+                "VALUES ('t', '2026-03-01', '[]', :d)"
+            ),
+            [{"d": f"entry {i}"} for i in range(n)],
+        )
+
+
+def _upper_descriptions(conn, cursor, batch_size):
+    after = cursor or 0
+    ids = [r[0] for r in conn.execute(
+        text("SELECT id FROM history WHERE id > :a ORDER BY id LIMIT :n"),
+        {"a": after, "n": batch_size},
+    )]
+    if not ids:
+        return None
+    conn.execute(
+        text("UPDATE history SET description = upper(description) WHERE id BETWEEN :lo AND :hi"),
+        {"lo": ids[0], "hi": ids[-1]},
+    )
+    return ids[-1]
+
+
+class TestBatchedMigration:
+    def test_processes_every_row_in_batches(self, engine):
+        migrations.upgrade(engine)
+        base = migrations.get_version(engine)
+        _fill_history(engine, 25)
+
+        batches = []
+
+        def step(conn, cursor, batch_size):
+            batches.append(cursor)
+            return _upper_descriptions(conn, cursor, batch_size)
+
+        steps = [*migrations.MIGRATIONS, Migration(base + 1, "upper", step, batch_size=10)]
+        assert migrations.upgrade(engine, steps) == base + 1
+        assert batches == [None, 10, 20, 25]
+        with engine.connect() as conn:
+            lower = conn.execute(
+                text("SELECT count(*) FROM history WHERE description != upper(description)")
+            ).scalar_one()
+            progress = conn.execute(
+                text("SELECT count(*) FROM meta WHERE key LIKE 'migration_progress:%'")
+            ).scalar_one()
+        assert lower == 0
+        assert progress == 0
+
+    def test_resumes_after_interruption(self, engine):
+        migrations.upgrade(engine)
+        base = migrations.get_version(engine)
+        _fill_history(engine, 25)
+
+        seen = []
+
+        def flaky(conn, cursor, batch_size):
+            seen.append(cursor)
+            if cursor == 20 and len(seen) == 3:
+                raise RuntimeError("interrupted")
+            return _upper_descriptions(conn, cursor, batch_size)
+
+        steps = [*migrations.MIGRATIONS, Migration(base + 1, "upper", flaky, batch_size=10)]
+        with pytest.raises(RuntimeError):
+            migrations.upgrade(engine, steps)
+        assert migrations.get_version(engine) == base
+
+        migrations.upgrade(engine, steps)
+        assert seen == [None, 10, 20, 20, 25]
+        assert migrations.get_version(engine) == base + 1
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Existing databases
+# ═══════════════════════════════════════════════════════════════
+
+class TestExistingDatabases:
+    def test_unversioned_1_0_database_adopted(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        con = sqlite3.connect(path)
+        con.executescript(
+            """
+            CREATE TABLE shifts (date TEXT PRIMARY KEY, type TEXT NOT NULL,
+                                 start TEXT NOT NULL, "end" TEXT NOT NULL);
+            CREATE TABLE history (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL,
+                                  date TEXT NOT NULL, patch TEXT NOT NULL, description TEXT);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO shifts VALUES ('2026-03-01', 'day12', '07:00', '19:00');
+            INSERT INTO history VALUES (1, 't', '2026-03-01', '[]', 'kept');
+            INSERT INTO meta VALUES ('data_version', '7');
+            """
+        )
+        con.commit()
+        con.close()
+
+        eng = create_engine(f"sqlite:///{path}")
+        migrations.upgrade(eng)
+        with eng.connect() as conn:
+            assert conn.execute(text("SELECT day, code FROM shifts")).all() == [(20513, 2)]
+            assert conn.execute(text("SELECT description FROM history")).scalar_one() == "kept"
+            assert conn.execute(
+                text("SELECT value FROM meta WHERE key = 'data_version'")
+            ).scalar_one() == "7"
+            indexes = conn.exec_driver_sql("PRAGMA index_list(history)").all()
+        eng.dispose()
+        assert "ix_history_date" in {i[1] for i in indexes}
+
+    def test_unconvertible_1_0_rows_kept(self, engine, caplog):
+        steps = [m for m in migrations.MIGRATIONS if m.version < 2]
+        migrations.upgrade(engine, steps)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO shifts VALUES ('2026-03-01', 'day8', '07:00', '15:00'), "
+                "('2026-02-30', 'day8', '07:00', '15:00'), "
+                "('2026-03-02', 'early6', '06:00', '12:00')"
+            )
+        with caplog.at_level("WARNING", logger="app.migrations"):
+            migrations.upgrade(engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT day, code FROM shifts")).all() == [(20513, 1)]
+            assert conn.execute(
+                text("SELECT date, type FROM shifts_legacy_rejected ORDER BY date")
+            ).all() == [("2026-02-30", "day8"), ("2026-03-02", "early6")]
+        assert "2 shift rows kept" in caplog.text
+        assert "'2026-02-30'" in caplog.text
+
+    def test_history_moves_to_default_schedule(self, engine):
+        steps = [m for m in migrations.MIGRATIONS if m.version < 4]
+        migrations.upgrade(engine, steps)
+        _fill_history(engine, 2)
+        migrations.upgrade(engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT DISTINCT schedule_id FROM history")).all() == [(1,)]
+            assert conn.execute(text("SELECT id, name FROM schedules")).all() == [(1, "default")]
+
+    def test_change_log_starts_at_current_version(self, engine):
+        steps = [m for m in migrations.MIGRATIONS if m.version < 6]
+        migrations.upgrade(engine, steps)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO meta (key, value) VALUES ('data_version', '42')")
+        migrations.upgrade(engine)
+        with engine.connect() as conn:
+            floor = conn.execute(text("SELECT value FROM meta WHERE key = 'changes_floor'"))
+            assert floor.scalar_one() == "42"
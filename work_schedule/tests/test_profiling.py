@@ -0,0 +1,70 @@
+"""Tests for the opt-in request profiling hooks."""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import profiling, storage
+
+
+@pytest.fixture()
+def profiled_client():
+    """A minimal app wrapped in ProfilingMiddleware, with hooks installed."""
+    profiling.install()
+    app = FastAPI()
+
+    @app.get("/two-reads")
+    def two_reads():
+        storage.get_shift("2026-06-01")
+        storage.get_shifts("2026-06-01", "2026-06-30")
+        return {"ok": True}
+
+    app.add_middleware(profiling.ProfilingMiddleware)
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        profiling.uninstall()
+
+
+class TestServerTiming:
+    def test_header_counts_queries_and_sessions(self, profiled_client):
+        r = profiled_client.get("/two-reads")
+        assert r.status_code == 200
+        timing = r.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="2 queries, 2 sessions"' in timing
+        assert "app;dur=" in timing
+
+    def test_format(self):
+        profile = profiling.RequestProfile(queries=3, sessions=1, db_seconds=0.0042)
+        assert profiling.server_timing(profile, 0.01) == (
+            'db;dur=4.20;desc="3 queries, 1 sessions", app;dur=10.00'
+        )
+
+
+class TestInstall:
+    def test_uninstall_detaches_listeners(self):
+        profiling.install()
+        profiling.uninstall()
+        assert not event.contains(Engine, "before_cursor_execute", profiling._before_cursor_execute)
+        assert not event.contains(Session, "after_begin", profiling._after_begin)
+        profiling.uninstall()
+
+
+class TestSlowQueryLog:
+    def test_logs_above_threshold(self, profiled_client, monkeypatch, caplog):
+        monkeypatch.setattr(profiling, "SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="app.profiling"):
+            profiled_client.get("/two-reads")
+        assert any("Slow query" in rec.message for rec in caplog.records)
+
+    def test_quiet_below_threshold(self, profiled_client, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.profiling"):
+            profiled_client.get("/two-reads")
+        assert not any("Slow query" in rec.message for rec in caplog.records)
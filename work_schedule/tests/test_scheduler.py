@@ -0,0 +1,169 @@
+"""Tests for the shift reminder scheduler."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app import scheduler as scheduler_mod
+from app import storage
+from app.scheduler import ShiftScheduler, shift_bounds
+
+
+class Clock:
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock(datetime(2026, 3, 1, 0, 0))
+
+
+@pytest.fixture()
+def sched(clock):
+    s = ShiftScheduler(leads=(60, 0), clock=clock)
+    s.load()
+    return s
+
+
+def _fired(reminders) -> list[tuple]:
+    return [(r.event_type, r.date, r.lead) for r in reminders]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Heap maintenance
+# ═══════════════════════════════════════════════════════════════
+
+class TestScheduler:
+    def test_night_shift_ends_next_day(self):
+        start, end = shift_bounds({"date": "2026-03-01", "start": "19:00", "end": "07:00"})
+        assert start == datetime(2026, 3, 1, 19, 0)
+        assert end == datetime(2026, 3, 2, 7, 0)
+
+    def test_load_queues_future_boundaries(self, clock):
+        storage.upsert_shift("2026-02-20", "day8")     # past – nothing left to fire
+        storage.upsert_shift("2026-03-02", "day8")
+        s = ShiftScheduler(leads=(60, 0), clock=clock)
+        s.load()
+        assert len(s) == 4
+        assert s.next_fire_at() == datetime(2026, 3, 2, 6, 0)
+
+    def test_due_fires_in_order(self, sched, clock):
+        storage.upsert_shift("2026-03-02", "day8")
+        sched.touch("2026-03-02")
+        assert _fired(sched.due(datetime(2026, 3, 2, 6, 0))) == [
+            ("shift_starting", "2026-03-02", 60),
+        ]
+        assert _fired(sched.due(datetime(2026, 3, 2, 15, 0))) == [
+            ("shift_starting", "2026-03-02", 0),
+            ("shift_ending", "2026-03-02", 60),
+            ("shift_ending", "2026-03-02", 0),
+        ]
+        assert len(sched) == 0
+
+    def test_touch_replaces_entries(self, sched):
+        storage.upsert_shift("2026-03-02", "day8")
+        sched.touch("2026-03-02")
+        storage.upsert_shift("2026-03-02", "night12")
+        sched.touch("2026-03-02")
+        assert len(sched) == 4
+        assert sched.next_fire_at() == datetime(2026, 3, 2, 18, 0)
+        fired = sched.due(datetime(2026, 3, 3, 12, 0))
+        assert {r.shift_type for r in fired} == {"night12"}
+
+    def test_touch_after_delete_cancels(self, sched):
+        storage.upsert_shift("2026-03-02", "day8")
+        sched.touch("2026-03-02")
+        storage.delete_shift("2026-03-02")
+        sched.touch("2026-03-02")
+        assert len(sched) == 0
+        assert sched.next_fire_at() is None
+        assert sched.due(datetime(2026, 3, 3)) == []
+
+    def test_stale_entries_compacted(self, sched):
+        storage.upsert_shift("2026-03-02", "day8")
+        for _ in range(10):
+            sched.touch("2026-03-02")
+        assert len(sched._heap) <= 2 * len(sched)
+
+    def test_schedules_are_independent(self, sched):
+        other = storage.create_schedule("Alex")["id"]
+        storage.upsert_shift("2026-03-02", "day8")
+        storage.upsert_shift("2026-03-02", "night12", schedule_id=other)
+        sched.touch("2026-03-02")
+        sched.touch("2026-03-02", other)
+        assert len(sched) == 8
+        sched.drop_schedule(other)
+        assert len(sched) == 4
+        fired = sched.due(datetime(2026, 3, 3, 12, 0))
+        assert {(r.schedule_id, r.shift_type) for r in fired} == {(1, "day8")}
+
+    def test_forgets_dates_without_live_entries(self, sched):
+        storage.upsert_shift("2026-03-02", "day8")
+        storage.upsert_shift("2026-03-03", "day8")
+        sched.touch("2026-03-02")
+        sched.touch("2026-03-03")
+        storage.delete_shift("2026-03-03")
+        sched.touch("2026-03-03")
+        assert set(sched._generation) == {(1, "2026-03-02")}
+        sched.due(datetime(2026, 3, 2, 15, 0))
+        assert sched._generation == {}
+        # A re-added date never revives its old, stale entries.
+        storage.upsert_shift("2026-03-03", "night12")
+        sched.touch("2026-03-03")
+        fired = sched.due(datetime(2026, 3, 4, 12, 0))
+        assert {r.shift_type for r in fired} == {"night12"}
+        assert len(fired) == 4
+
+    def test_touch_before_load_is_noop(self, clock):
+        s = ShiftScheduler(clock=clock)
+        storage.upsert_shift("2026-03-02", "day8")
+        s.touch("2026-03-02")
+        assert len(s) == 0
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Write paths and the background task
+# ═══════════════════════════════════════════════════════════════
+
+class TestIntegration:
+    def test_set_remove_undo_touch(self, monkeypatch):
+        from app.shifts import remove_shift, set_shift
+        from app.undo import undo_last
+
+        touched = []
+        monkeypatch.setattr(scheduler_mod.scheduler, "touch", lambda *a: touched.append(a))
+        set_shift("2026-03-02", "day8")
+        remove_shift("2026-03-02")
+        undo_last()
+        assert touched == [("2026-03-02", 1)] * 3
+
+    def test_run_broadcasts_due_reminders(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(scheduler_mod, "broadcast", lambda *a: sent.append(a))
+        clock = Clock(datetime(2026, 3, 2, 5, 59))
+        storage.upsert_shift("2026-03-02", "day8")
+        s = ShiftScheduler(leads=(60,), clock=clock)
+
+        async def scenario():
+            s.start()
+            await asyncio.sleep(0)
+            assert sent == []
+            clock.now = datetime(2026, 3, 2, 6, 0)
+            s._notify()
+            for _ in range(5):
+                await asyncio.sleep(0)
+            await s.stop()
+
+        asyncio.run(scenario())
+        assert sent == [("shift_starting", {
+            "schedule_id": 1,
+            "date": "2026-03-02",
+            "shift_type": "day8",
+            "at": "2026-03-02T07:00",
+            "lead_minutes": 60,
+        })]
@@ -1,5 +1,11 @@
 """Tests for the storage (DB access) layer."""
 
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import text
+
 from app import storage
 
 
@@ -9,20 +15,20 @@ from app import storage
 
 class TestShiftsCRUD:
     def test_upsert_creates_new(self):
-        result = storage.upsert_shift("2026-03-01", "day8", "07:00", "15:00")
+        result = storage.upsert_shift("2026-03-01", "day8")
         assert result["date"] == "2026-03-01"
         assert result["type"] == "day8"
         assert result["start"] == "07:00"
         assert result["end"] == "15:00"
 
     def test_upsert_updates_existing(self):
-        storage.upsert_shift("2026-03-01", "day8", "07:00", "15:00")
-        updated = storage.upsert_shift("2026-03-01", "night12", "19:00", "07:00")
+        storage.upsert_shift("2026-03-01", "day8")
+        updated = storage.upsert_shift("2026-03-01", "night12")
         assert updated["type"] == "night12"
         assert updated["start"] == "19:00"
 
     def test_get_shift_exists(self):
-        storage.upsert_shift("2026-03-01", "day12", "07:00", "19:00")
+        storage.upsert_shift("2026-03-01", "day12")
         row = storage.get_shift("2026-03-01")
         assert row is not None
         assert row["type"] == "day12"
@@ -31,9 +37,9 @@ class TestShiftsCRUD:
         assert storage.get_shift("2099-01-01") is None
 
     def test_get_shifts_range(self):
-        storage.upsert_shift("2026-03-01", "day8", "07:00", "15:00")
-        storage.upsert_shift("2026-03-03", "day12", "07:00", "19:00")
-        storage.upsert_shift("2026-03-10", "night12", "19:00", "07:00")
+        storage.upsert_shift("2026-03-01", "day8")
+        storage.upsert_shift("2026-03-03", "day12")
+        storage.upsert_shift("2026-03-10", "night12")
 
         result = storage.get_shifts("2026-03-01", "2026-03-05")
         assert len(result) == 2
@@ -45,7 +51,7 @@ class TestShiftsCRUD:
         assert result == []
 
     def test_delete_shift_exists(self):
-        storage.upsert_shift("2026-03-01", "day8", "07:00", "15:00")
+        storage.upsert_shift("2026-03-01", "day8")
         assert storage.delete_shift("2026-03-01") is True
         assert storage.get_shift("2026-03-01") is None
 
@@ -125,3 +131,264 @@ class TestMeta:
         storage.set_meta("key", "old")
         storage.set_meta("key", "new")
         assert storage.get_meta("key") == "new"
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Data version
+# ═══════════════════════════════════════════════════════════════
+
+class TestDataVersion:
+    def test_starts_at_zero(self):
+        assert storage.get_data_version() == 0
+
+    def test_bumped_by_writes(self):
+        storage.upsert_shift("2026-03-01", "day8")
+        v1 = storage.get_data_version()
+        storage.delete_shift("2026-03-01")
+        assert storage.get_data_version() > v1 > 0
+
+    def test_missing_delete_keeps_version(self):
+        storage.delete_shift("2099-01-01")
+        assert storage.get_data_version() == 0
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Change log
+# ═══════════════════════════════════════════════════════════════
+
+class TestChanges:
+    def test_changed_and_deleted_since(self):
+        storage.upsert_shift("2026-03-01", "day8")
+        since = storage.get_data_version()
+        storage.upsert_shift("2026-03-02", "day12")
+        storage.upsert_shift("2026-03-02", "night12")
+        storage.delete_shift("2026-03-01")
+        changes = storage.get_changes(since)
+        assert changes["version"] == since + 3
+        assert not changes["resync"]
+        assert [(s["date"], s["type"]) for s in changes["changed"]] == [("2026-03-02", "night12")]
+        assert changes["deleted"] == ["2026-03-01"]
+
+    def test_up_to_date_is_empty(self):
+        storage.upsert_shift("2026-03-01", "day8")
+        changes = storage.get_changes(storage.get_data_version())
+        assert changes["changed"] == changes["deleted"] == []
+
+    def test_per_schedule(self):
+        other = storage.create_schedule("Alex")["id"]
+        storage.upsert_shift("2026-03-01", "day8", other)
+        assert storage.get_changes(0)["changed"] == []
+        assert len(storage.get_changes(0, other)["changed"]) == 1
+
+    def test_future_version_needs_resync(self):
+        assert storage.get_changes(5)["resync"]
+
+    def test_pruned_log_needs_resync(self, monkeypatch):
+        monkeypatch.setattr(storage, "CHANGE_LOG_SIZE", 2)
+        for day in range(1, 5):
+            storage.upsert_shift(f"2026-03-0{day}", "day8")
+        assert storage.get_changes(1)["resync"]
+        changes = storage.get_changes(2)
+        assert not changes["resync"]
+        assert [s["date"] for s in changes["changed"]] == ["2026-03-03", "2026-03-04"]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Aggregated statistics
+# ═══════════════════════════════════════════════════════════════
+
+class TestShiftStats:
+    def test_group_by_month(self):
+        storage.upsert_shift("2026-03-01", "day8")
+        storage.upsert_shift("2026-03-02", "day8")
+        storage.upsert_shift("2026-04-01", "day12")
+
+        rows = storage.get_shift_stats("2026-01-01", "2026-12-31", "month")
+        assert rows == [
+            {"key": "2026-03", "type": "day8", "shifts": 2, "minutes": 960},
+            {"key": "2026-04", "type": "day12", "shifts": 1, "minutes": 720},
+        ]
+
+    def test_night_shift_wraps_midnight(self):
+        storage.upsert_shift("2026-03-01", "night12")
+        rows = storage.get_shift_stats("2026-03-01", "2026-03-31", "type")
+        assert rows[0]["minutes"] == 720
+
+    def test_group_by_week_keys_on_monday(self):
+        # 2026-03-01 is a Sunday, 2026-03-02 a Monday
+        storage.upsert_shift("2026-03-01", "day8")
+        storage.upsert_shift("2026-03-02", "day8")
+        rows = storage.get_shift_stats("2026-03-01", "2026-03-31", "week")
+        assert [r["key"] for r in rows] == ["2026-02-23", "2026-03-02"]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Epoch-day schema + legacy migration
+# ═══════════════════════════════════════════════════════════════
+
+class TestEpochDaySchema:
+    def test_epoch_day_round_trip(self):
+        from app.models import epoch_day, iso_date
+
+        assert epoch_day("1970-01-01") == 0
+        assert epoch_day("2026-03-01") == 20513
+        assert iso_date(20513) == "2026-03-01"
+
+    def test_table_without_rowid(self):
+        with storage.get_db() as db:
+            ddl = db.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'shifts'")
+            ).scalar_one()
+        assert "WITHOUT ROWID" in ddl.upper()
+
+    def test_stored_as_integers(self):
+        storage.upsert_shift("2026-03-01", "night12")
+        with storage.get_db() as db:
+            row = db.execute(text("SELECT day, code FROM shifts")).one()
+        assert tuple(row) == (20513, 3)
+
+    def test_invalid_date_raises(self):
+        with pytest.raises(ValueError):
+            storage.get_shift("2026-02-30")
+
+    def test_legacy_table_migrated(self, tmp_path, monkeypatch):
+        path = tmp_path / "legacy.db"
+        con = sqlite3.connect(path)
+        con.executescript(
+            """
+            CREATE TABLE shifts (date TEXT PRIMARY KEY, type TEXT NOT NULL,
+                                 start TEXT NOT NULL, "end" TEXT NOT NULL);
+            INSERT INTO shifts VALUES ('2026-03-01', 'day8', '07:00', '15:00');
+            INSERT INTO shifts VALUES ('2026-03-02', 'night12', '19:00', '07:00');
+            INSERT INTO shifts VALUES ('2026-03-03', 'bogus', '00:00', '00:00');
+            """
+        )
+        con.commit()
+        con.close()
+
+        monkeypatch.setattr(storage, "DB_PATH", str(path))
+        monkeypatch.setattr(storage, "_engine", None)
+        monkeypatch.setattr(storage, "_SessionLocal", None)
+
+        rows = storage.get_shifts("2026-03-01", "2026-03-31")
+        assert rows == [
+            {"date": "2026-03-01", "type": "day8", "start": "07:00", "end": "15:00", "version": 0},
+            {"date": "2026-03-02", "type": "night12", "start": "19:00", "end": "07:00", "version": 0},
+        ]
+        storage._engine.dispose()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Schedules
+# ═══════════════════════════════════════════════════════════════
+
+class TestSchedules:
+    def test_default_schedule_exists(self):
+        assert storage.list_schedules() == [{"id": 1, "name": "default"}]
+
+    def test_create_duplicate_name_raises(self):
+        storage.create_schedule("Alex")
+        with pytest.raises(ValueError):
+            storage.create_schedule("Alex")
+
+    def test_shifts_are_per_schedule(self):
+        other = storage.create_schedule("Alex")["id"]
+        storage.upsert_shift("2026-03-01", "day8")
+        storage.upsert_shift("2026-03-01", "night12", schedule_id=other)
+        assert storage.get_shift("2026-03-01")["type"] == "day8"
+        assert storage.get_shift("2026-03-01", other)["type"] == "night12"
+        assert storage.delete_shift("2026-03-01", other)
+        assert storage.get_shift("2026-03-01") is not None
+
+    def test_history_is_per_schedule(self):
+        other = storage.create_schedule("Alex")["id"]
+        storage.add_history("t", "2026-03-01", "[]", "default entry")
+        storage.add_history("t", "2026-03-01", "[]", "other entry", schedule_id=other)
+        assert [h["description"] for h in storage.get_history()] == ["default entry"]
+        assert storage.get_last_history(other)["description"] == "other entry"
+
+    def test_delete_removes_shifts_and_history(self):
+        other = storage.create_schedule("Alex")["id"]
+        storage.upsert_shift("2026-03-01", "day8", schedule_id=other)
+        storage.add_history("t", "2026-03-01", "[]", "entry", schedule_id=other)
+        assert storage.delete_schedule(other)
+        assert not storage.schedule_exists(other)
+        with storage.get_db() as db:
+            assert db.execute(text("SELECT count(*) FROM shifts")).scalar_one() == 0
+            assert db.execute(text("SELECT count(*) FROM history")).scalar_one() == 0
+
+    def test_default_cannot_be_deleted(self):
+        with pytest.raises(ValueError):
+            storage.delete_schedule(1)
+
+    def test_deleted_id_not_reused(self):
+        alex = storage.create_schedule("Alex")["id"]
+        storage.upsert_shift("2026-03-01", "day8", schedule_id=alex)
+        since = storage.get_data_version()
+        storage.delete_schedule(alex)
+        assert storage.create_schedule("Sam")["id"] != alex
+        # Cursors from before the delete can't see it: they must resync.
+        assert storage.get_changes(since, alex)["resync"]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Atomic writes
+# ═══════════════════════════════════════════════════════════════
+
+class TestSwapShift:
+    def test_returns_old_and_new(self):
+        first = storage.upsert_shift("2026-03-01", "day8")
+        old, new = storage.swap_shift("2026-03-01", "night12")
+        assert old == first
+        assert new["type"] == "night12"
+        assert new["version"] > first["version"]
+
+    def test_failed_precondition_writes_nothing(self):
+        storage.upsert_shift("2026-03-01", "day8")
+        with pytest.raises(storage.VersionConflict) as exc:
+            storage.swap_shift(
+                "2026-03-01", "night12",
+                precondition=lambda version: False,
+                history=lambda old, new: ("[]", "never"),
+            )
+        assert exc.value.current["type"] == "day8"
+        assert storage.get_shift("2026-03-01")["type"] == "day8"
+        assert storage.get_history() == []
+
+    def test_history_in_same_transaction(self):
+        def broken(old, new):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            storage.swap_shift("2026-03-01", "day8", history=broken)
+        assert storage.get_shift("2026-03-01") is None
+
+    def test_concurrent_writers_one_wins(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(storage, "DB_PATH", str(tmp_path / "race.db"))
+        monkeypatch.setattr(storage, "_engine", None)
+        monkeypatch.setattr(storage, "_SessionLocal", None)
+        seen = storage.upsert_shift("2026-03-01", "day8")["version"]
+
+        barrier = threading.Barrier(4)
+        outcomes = []
+
+        def writer(shift_type):
+            barrier.wait()
+            try:
+                storage.swap_shift(
+                    "2026-03-01", shift_type, precondition=lambda v: v == seen
+                )
+                outcomes.append("ok")
+            except storage.VersionConflict:
+                outcomes.append("conflict")
+
+        threads = [
+            threading.Thread(target=writer, args=(t,))
+            for t in ("day12", "night12", "day12", "night12")
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        storage._engine.dispose()
+        assert sorted(outcomes) == ["conflict", "conflict", "conflict", "ok"]
@@ -10,31 +10,85 @@ const API = window.location.origin + BASE_PATH;
 
 // ── State ───────────────────────────────────────────────────────
 let monthOffset = 0;            // 0 = current month (calendar)
-let tlQuarterOffset = 0;        // timeline quarter offset
-let shiftsCache   = {};         // date → shift obj
+let shiftTypes    = {};         // type → {start, end}
 let currentView   = "calendar";
 let activeTool    = null;       // null | "day8" | "day12" | "night12" | "eraser"
 
 // ── Boot ────────────────────────────────────────────────────────
-document.addEventListener("DOMContentLoaded", () => {
+document.addEventListener("DOMContentLoaded", async () => {
+  if ("serviceWorker" in navigator) {
+    navigator.serviceWorker.register("sw.js").catch(e => console.warn("No offline shell", e));
+  }
+  shiftTypes = await cachedJSON("shift_types", "/api/shift_types");
   initTabs();
   initToolbar();
   renderCalendar();
   initModal();
-  initSSE();
+  initLive();
 });
 
-// ── Server-Sent Events (live sync across devices) ───────────────
+// ── Live sync across devices ────────────────────────────────────
+// One WebSocket carries paint edits (acked by sequence number) and
+// change events.  Where it can't connect (e.g. a proxy without
+// WebSocket support) the UI falls back to SSE + one request per edit.
 let _sseDebounce = null;
+let ws = null;                  // open WebSocket, or null
+let wsSeq = 0;
+const wsPending = new Map();    // seq → resolve(ack)
+
+function initLive() {
+  const sock = new WebSocket(API.replace(/^http/, "ws") + "/api/ws");
+  let opened = false;
+
+  sock.onopen = () => { opened = true; ws = sock; };
+  sock.onmessage = (ev) => {
+    const msg = JSON.parse(ev.data);
+    if (msg.type === "ack") {
+      const resolve = wsPending.get(msg.seq);
+      wsPending.delete(msg.seq);
+      if (resolve) resolve(msg);
+    } else {
+      onChangeEvent(msg);
+    }
+  };
+  sock.onclose = () => {
+    ws = null;
+    // Edits in flight died with the socket
+    for (const resolve of wsPending.values()) resolve({ status: 0 });
+    wsPending.clear();
+    if (!opened) { initSSE(); return; }
+    console.warn("WebSocket closed – reconnecting…");
+    refreshCurrentView();       // changes may have been missed meanwhile
+    setTimeout(initLive, 2000);
+  };
+}
+
+function wsEdit(edit) {
+  return new Promise(resolve => {
+    const seq = ++wsSeq;
+    wsPending.set(seq, resolve);
+    ws.send(JSON.stringify({ seq, ...edit }));
+  });
+}
+
+function onChangeEvent(data) {
+  // Events the server batched within its window cost one refresh
+  const events = data.type === "batch" ? data.events : [data];
+  const relevant = events.filter(e =>
+    // The UI edits the default schedule; other schedules' changes don't show
+    (e.schedule_id === undefined || e.schedule_id === 1) &&
+    // Our own paints are on screen already
+    !((e.type === "shift_changed" || e.type === "shift_deleted") && takeEcho(e.date)));
+  if (!relevant.length) return;
+  // Debounce rapid-fire events (e.g. bulk changes) to one refresh
+  clearTimeout(_sseDebounce);
+  _sseDebounce = setTimeout(() => refreshCurrentView(), 300);
+}
 
 function initSSE() {
   const es = new EventSource(`${API}/api/events`);
 
-  es.onmessage = (ev) => {
-    // Debounce rapid-fire events (e.g. bulk changes) to one refresh
-    clearTimeout(_sseDebounce);
-    _sseDebounce = setTimeout(() => refreshCurrentView(), 300);
-  };
+  es.onmessage = (ev) => onChangeEvent(JSON.parse(ev.data));
 
   es.onerror = () => {
     // Browser auto-reconnects; we just log it
@@ -42,6 +96,167 @@ function initSSE() {
   };
 }
 
+// ── Local mirror (IndexedDB) ────────────────────────────────────
+// Month views and history are kept in IndexedDB.  A view renders from
+// the mirror at once; in the background the mirror catches up from
+// /api/changes – patching just the days written since its version – and
+// only months it doesn't hold are fetched.  Offline, the mirror is all
+// there is.
+const MIRROR_DB = "work-schedule";
+let _mirror = null;
+
+function openMirror() {
+  if (!_mirror) {
+    _mirror = new Promise(resolve => {
+      if (!window.indexedDB) { resolve(null); return; }
+      const req = indexedDB.open(MIRROR_DB, 1);
+      req.onupgradeneeded = () => {
+        req.result.createObjectStore("months", { keyPath: "key" });
+        req.result.createObjectStore("meta");
+      };
+      req.onsuccess = () => resolve(req.result);
+      req.onerror = () => { console.warn("No local mirror", req.error); resolve(null); };
+    });
+  }
+  return _mirror;
+}
+
+async function idb(store, mode, fn) {
+  const db = await openMirror();
+  if (!db) return undefined;
+  return new Promise(resolve => {
+    const req = fn(db.transaction(store, mode).objectStore(store));
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => resolve(undefined);
+  });
+}
+
+const mirrorGet = (store, key) => idb(store, "readonly", s => s.get(key));
+const mirrorPut = (store, value, key) => idb(store, "readwrite", s => s.put(value, key));
+const mirrorDelete = (store, key) => idb(store, "readwrite", s => s.delete(key));
+const mirrorClear = (store) => idb(store, "readwrite", s => s.clear());
+
+function monthKey(year, month) { return `${year}-${pad(month)}`; }
+
+// null when the server can't be reached
+async function fetchVersion() {
+  try {
+    const res = await fetch(`${API}/api/version`);
+    return res.ok ? (await res.json()).version : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+// Mirror updates run one at a time, so the stored version never goes back
+let _mirrorQueue = Promise.resolve();
+function mirrorTask(fn) {
+  const run = _mirrorQueue.then(fn, fn);
+  _mirrorQueue = run.catch(() => {});
+  return run;
+}
+
+// Bring every mirrored month up to date.  Resolves to the current data
+// version, or null when the server can't be reached.  Calls made before
+// a queued sync starts share it (scrolling asks for one per row).
+let _pendingSync = null;
+function syncMirror() {
+  if (_pendingSync) return _pendingSync;
+  return _pendingSync = mirrorTask(async () => {
+    _pendingSync = null;
+    const since = await mirrorGet("meta", "version");
+    if (since === undefined) {
+      const version = await fetchVersion();
+      if (version !== null) {
+        await mirrorClear("months");
+        await mirrorPut("meta", version, "version");
+      }
+      return version;
+    }
+    let changes;
+    try {
+      const res = await fetch(`${API}/api/changes?since=${since}`);
+      if (!res.ok) return null;
+      changes = await res.json();
+    } catch (e) {
+      return null;
+    }
+    // Too far behind for the change log: start over
+    if (changes.resync) await mirrorClear("months");
+    else await patchMonths(changes);
+    await mirrorPut("meta", changes.version, "version");
+    return changes.version;
+  });
+}
+
+// Apply a change-log delta to the mirrored months it touches
+async function patchMonths({ version, changed, deleted }) {
+  const byMonth = new Map();                  // "YYYY-MM" → [[day, type|null], …]
+  const add = (date, type) => {
+    const key = date.slice(0, 7);
+    if (!byMonth.has(key)) byMonth.set(key, []);
+    byMonth.get(key).push([Number(date.slice(8)), type]);
+  };
+  changed.forEach(s => add(s.date, s.type));
+  deleted.forEach(date => add(date, null));
+
+  for (const [key, edits] of byMonth) {
+    const view = await mirrorGet("months", key);
+    if (!view) continue;
+    const cells = view.weeks.flat().filter(Boolean);   // [day, code] in day order
+    const codes = edits.map(([, type]) => type ? view.types.indexOf(type) : 0);
+    if (codes.includes(-1)) { await mirrorDelete("months", key); continue; }   // unknown type
+    edits.forEach(([day], i) => { cells[day - 1][1] = codes[i]; });
+    view.version = version;
+    await mirrorPut("months", view);
+  }
+}
+
+// A fetched view joins the mirror unless the mirror has synced past it
+// (changes in between would be missing from it)
+function storeMonth(view) {
+  return mirrorTask(async () => {
+    const version = await mirrorGet("meta", "version");
+    if (version === undefined || view.version >= version) {
+      await mirrorPut("months", { key: monthKey(view.year, view.month), ...view });
+    }
+  });
+}
+
+// Month views for [[year, month], …] – rendered from the mirror first
+// (null where it has none), then again once synced if anything changed.
+// render(views, fresh) gets fresh = true for views up to date with the
+// server.  A slot (see getJSON) lets the next load in it cancel this one.
+async function loadMonths(months, render, slot) {
+  const keys = months.map(([y, m]) => monthKey(y, m));
+  const local = await Promise.all(keys.map(k => mirrorGet("months", k)));
+  if (local.some(Boolean)) render(local, false);
+
+  if (await syncMirror() === null) return;    // offline – the mirror is all there is
+  const synced = await Promise.all(keys.map(k => mirrorGet("months", k)));
+  const views = await Promise.all(months.map(([y, m], i) =>
+    synced[i] || fetchJSON(`/api/views/month?year=${y}&month=${m}`, { slot })));
+  if (!views.every(v => Array.isArray(v.weeks))) return;
+  views.forEach((v, i) => { if (!synced[i]) storeMonth(v); });
+  if (views.some((v, i) => !local[i] || v.version !== local[i].version)) render(views, true);
+}
+
+// Small, rarely changing payloads: network first, mirror when offline
+async function cachedJSON(key, path) {
+  try {
+    const res = await fetch(`${API}${path}`);
+    if (res.ok) {
+      const data = await res.json();
+      mirrorPut("meta", data, key);
+      return data;
+    }
+  } catch (e) { /* offline */ }
+  return (await mirrorGet("meta", key)) || {};
+}
+
+// Only the latest render may touch the DOM once its fetch completes
+let renderSeq = 0;
+
 // ── Paint Toolbar ───────────────────────────────────────────────
 function initToolbar() {
   document.querySelectorAll(".paint-btn").forEach(btn => {
@@ -63,22 +278,111 @@ function updateToolbarUI() {
   document.body.classList.toggle("paint-mode", activeTool !== null);
 }
 
-async function paintCell(date, existingShift) {
+function paintCell(date, existingShift) {
   if (!activeTool) { openModal(date, existingShift); return; }
-  if (activeTool === "eraser") {
-    if (existingShift) {
-      await fetchJSON(`/api/shifts/${date}`, { method: "DELETE" });
-      refreshCurrentView();
+  const type = activeTool === "eraser" ? null : activeTool;
+  const current = painted.has(date) ? painted.get(date) : (existingShift ? existingShift.type : null);
+  if (type === current) return;
+  queueEdit(date, type, current);
+}
+
+// ── Write queue (paint mode) ────────────────────────────────────
+// A paint shows at once and queues its edit; repeated paints of one date
+// coalesce, and the queue goes out as one batch once painting pauses
+// (pipelined over the WebSocket, else one POST /api/shifts/batch).
+// Only the cells whose edit fails are rolled back.
+const FLUSH_DELAY = 150;          // ms without a paint before flushing
+const queuedEdits = new Map();    // date → { type, previous }, not sent yet
+const unsettled = new Map();      // date → edits queued or in flight
+const painted = new Map();        // date → type (null = none) shown over the server view
+const echoes = new Map();         // date → own change events still to arrive
+let flushTimer = null;
+
+function queueEdit(date, type, current) {
+  const queued = queuedEdits.get(date);
+  if (!queued) unsettled.set(date, (unsettled.get(date) || 0) + 1);
+  // A coalesced edit rolls back to what was there before the first paint
+  queuedEdits.set(date, { type, previous: queued ? queued.previous : current });
+  painted.set(date, type);
+  paintDom(date, type);
+  clearTimeout(flushTimer);
+  flushTimer = setTimeout(flushEdits, FLUSH_DELAY);
+}
+
+async function flushEdits() {
+  if (!queuedEdits.size) return;
+  const batch = [...queuedEdits].map(([date, e]) => ({ date, ...e }));
+  queuedEdits.clear();
+  batch.forEach(e => echoes.set(e.date, (echoes.get(e.date) || 0) + 1));
+
+  const results = await sendEdits(batch.map(e =>
+    e.type ? { op: "set", date: e.date, type: e.type } : { op: "delete", date: e.date }));
+  batch.forEach((e, i) => settleEdit(e, results[i]));
+}
+
+async function sendEdits(edits) {
+  if (ws) return Promise.all(edits.map(wsEdit));
+  try {
+    const res = await fetch(`${API}/api/shifts/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ edits }),
+    });
+    if (res.ok) return (await res.json()).results;
+    console.error("API error", res.status);
+  } catch (e) {
+    console.error("Batch failed", e);
+  }
+  return edits.map(() => ({ status: 0 }));
+}
+
+function settleEdit(edit, result) {
+  // Deleting what is already gone is fine
+  const ok = result.status === 200 || (result.status === 404 && !edit.type);
+  if (!ok) {
+    console.error("Edit failed", edit.date, result);
+    takeEcho(edit.date);                    // no change event will come
+    // Roll back – unless the date has been painted again since
+    if (unsettled.get(edit.date) === 1) {
+      painted.set(edit.date, edit.previous);
+      paintDom(edit.date, edit.previous);
     }
-    return;
+  } else if (result.status !== 200) {
+    takeEcho(edit.date);
   }
-  // Set shift
-  await fetchJSON(`/api/shifts/${date}`, {
-    method: "PUT",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ type: activeTool }),
+  const left = unsettled.get(edit.date) - 1;
+  if (left) unsettled.set(edit.date, left); else unsettled.delete(edit.date);
+}
+
+function takeEcho(date) {
+  const n = echoes.get(date);
+  if (!n) return false;
+  if (n > 1) echoes.set(date, n - 1); else echoes.delete(date);
+  return true;
+}
+
+// A cell's shift with paints applied that the server view may not show yet
+function displayShift(iso, shift) {
+  if (!painted.has(iso)) return shift;
+  const type = painted.get(iso);
+  return type ? { type, ...(shiftTypes[type] || {}) } : null;
+}
+
+// Called with each freshly fetched view: settled paints are in it now
+// (a view from the mirror may predate them, so it keeps them on top)
+function dropSettledPaints() {
+  for (const date of painted.keys()) if (!unsettled.has(date)) painted.delete(date);
+}
+
+// Repaint one date's calendar cell / timeline bar in place
+function paintDom(date, type) {
+  document.querySelectorAll(`[data-date="${date}"]`).forEach(node => {
+    const target = node.querySelector(".tl-bar") || node;
+    [...target.classList].filter(c => c.startsWith("shift-"))
+      .forEach(c => target.classList.remove(c));
+    if (type) target.classList.add(`shift-${type}`);
+    if (target.classList.contains("tl-bar")) target.classList.toggle("empty", !type);
   });
-  refreshCurrentView();
 }
 
 // ── Tabs ────────────────────────────────────────────────────────
@@ -114,19 +418,8 @@ function getMonthRange(offset) {
   return { start, end };
 }
 
-function getQuarterRange(offset) {
-  const now = new Date();
-  const qMonth = Math.floor(now.getMonth() / 3) * 3;   // 0,3,6,9
-  const startMonth = qMonth + offset * 3;
-
-  const start = new Date(now.getFullYear(), startMonth, 1);
-  const end   = new Date(now.getFullYear(), startMonth + 3, 0);   // last day of 3rd month
-
-  return { start, end };
-}
-
 async function renderCalendar() {
-  const { start, end } = getMonthRange(monthOffset);
+  const { start } = getMonthRange(monthOffset);
 
   const MONTHS = ["Styczeń","Luty","Marzec","Kwiecień","Maj","Czerwiec",
                   "Lipiec","Sierpień","Wrzesień","Październik","Listopad","Grudzień"];
@@ -135,30 +428,23 @@ async function renderCalendar() {
   document.getElementById("month-label").textContent =
     `${MONTHS[start.getMonth()]} ${start.getFullYear()}`;
 
-  // Fetch shifts
-  const from = isoDate(start);
-  const to   = isoDate(end);
-  const shifts = await fetchShifts(from, to);
-  shiftsCache = {};
-  if (Array.isArray(shifts)) {
-    shifts.forEach(s => shiftsCache[s.date] = s);
-  }
-
-  // Build 1 month
-  const grid = document.getElementById("calendar-grid");
-  grid.innerHTML = "";
-  grid.appendChild(buildMonth(start));
-
   // Nav
   document.getElementById("prev-month").onclick = () => { monthOffset--; renderCalendar(); };
   document.getElementById("next-month").onclick = () => { monthOffset++; renderCalendar(); };
+
+  // Precomputed grid (weeks × days with shift codes)
+  const seq = ++renderSeq;
+  await loadMonths([[start.getFullYear(), start.getMonth() + 1]], ([view], fresh) => {
+    if (seq !== renderSeq) return;
+    const grid = document.getElementById("calendar-grid");
+    grid.innerHTML = "";
+    if (fresh) dropSettledPaints();
+    grid.appendChild(buildMonth(view));
+  }, "calendar");
 }
 
-function buildMonth(date) {
-  const year = date.getFullYear();
-  const month = date.getMonth();
-  const daysInMonth = new Date(year, month + 1, 0).getDate();
-  const firstDow = (new Date(year, month, 1).getDay() + 6) % 7; // Mon=0
+function buildMonth(view) {
+  const { year, month } = view;
   const today = isoDate(new Date());
 
   const DAYS = ["Pn","Wt","Śr","Cz","Pt","So","Nd"];
@@ -166,7 +452,7 @@ function buildMonth(date) {
                   "Lipiec","Sierpień","Wrzesień","Październik","Listopad","Grudzień"];
 
   const block = el("div", "month-block");
-  block.appendChild(el("h4", "", MONTHS[month] + " " + year));
+  block.appendChild(el("h4", "", MONTHS[month - 1] + " " + year));
 
   // Day-of-week header
   const hdr = el("div", "month-header");
@@ -176,144 +462,346 @@ function buildMonth(date) {
   // Day cells
   const days = el("div", "month-days");
 
-  // Empty leading cells
-  for (let i = 0; i < firstDow; i++) days.appendChild(el("div", "day-cell empty"));
+  view.weeks.forEach(week => week.forEach(cellData => {
+    // Padding outside the month
+    if (!cellData) { days.appendChild(el("div", "day-cell empty")); return; }
 
-  for (let d = 1; d <= daysInMonth; d++) {
-    const iso = `${year}-${pad(month + 1)}-${pad(d)}`;
+    const [d, code] = cellData;
+    const iso = `${year}-${pad(month)}-${pad(d)}`;
     const cell = el("div", "day-cell", String(d));
+    cell.dataset.date = iso;
 
     if (iso === today) cell.classList.add("today");
 
-    const shift = shiftsCache[iso];
+    const shift = displayShift(iso, shiftFromCode(view.types, code));
     if (shift) cell.classList.add(`shift-${shift.type}`);
 
     cell.addEventListener("click", () => paintCell(iso, shift));
     days.appendChild(cell);
-  }
+  }));
 
   block.appendChild(days);
   return block;
 }
 
 // ================================================================
-//  TIMELINE VIEW
+//  VIRTUAL LIST
 // ================================================================
+// Keeps only the rows in view (plus OVERSCAN either side) in the DOM,
+// between two spacers standing in for the rest – so browsing years of
+// rows costs the same as one screenful.  Rows share one height, measured
+// from a rendered row.  Rows that stay in range are left in place.
+
+const OVERSCAN = 4;
+
+function virtualList({ scroller, body, count, rowHeight, row, spacer, onRange }) {
+  const top = spacer(), bottom = spacer();
+  body.replaceChildren(top, bottom);
+  const nodes = new Map();                      // index → row node
+  const list = { count, rowHeight, first: 0, last: 0 };
+
+  // Make room for every row before jumping, so scrollTop isn't clamped
+  function scrollToRow(at) {
+    bottom.style.height = `${list.count * list.rowHeight}px`;
+    scroller.scrollTop = at * list.rowHeight;
+  }
+
+  function layout() {
+    const from = Math.floor(scroller.scrollTop / list.rowHeight);
+    const to = Math.ceil((scroller.scrollTop + scroller.clientHeight) / list.rowHeight);
+    const first = Math.max(0, from - OVERSCAN);
+    const last = Math.min(list.count, to + OVERSCAN);
+
+    for (const [i, node] of nodes) {
+      if (i < first || i >= last) { node.remove(); nodes.delete(i); }
+    }
+    let prev = top;
+    for (let i = first; i < last; i++) {
+      let node = nodes.get(i);
+      if (!node) { node = row(i); nodes.set(i, node); prev.after(node); }
+      prev = node;
+    }
+    top.style.height = `${first * list.rowHeight}px`;
+    bottom.style.height = `${(list.count - last) * list.rowHeight}px`;
+    list.first = first;
+    list.last = last;
+
+    const probe = nodes.get(first);
+    const height = probe ? probe.getBoundingClientRect().height : 0;
+    if (height && Math.abs(height - list.rowHeight) > 0.5) {
+      const at = scroller.scrollTop / list.rowHeight;
+      list.rowHeight = height;
+      scrollToRow(at);
+      layout();
+      return;
+    }
+    if (onRange) onRange(first, last);
+  }
+
+  let frame = 0;
+  const schedule = () => {
+    if (!frame) frame = requestAnimationFrame(() => { frame = 0; layout(); });
+  };
+  scroller.addEventListener("scroll", schedule, { passive: true });
+  window.addEventListener("resize", schedule);
+
+  list.layout = layout;
+  list.setCount = (n) => { list.count = n; layout(); };
+  list.scrollTo = (i) => { scrollToRow(i); layout(); };
+  list.topIndex = () => Math.floor(scroller.scrollTop / list.rowHeight + 0.5);
+  // Rebuild rows whose data changed (all rendered rows by default)
+  list.update = (indices = [...nodes.keys()]) => {
+    for (const i of indices) {
+      const node = nodes.get(i);
+      if (!node) continue;
+      const fresh = row(i, node);
+      node.replaceWith(fresh);
+      nodes.set(i, fresh);
+    }
+  };
+  return list;
+}
 
-async function renderTimeline() {
-  const { start, end } = getQuarterRange(tlQuarterOffset);
+// ================================================================
+//  TIMELINE VIEW
+// ================================================================
+// One row per month, TL_SPAN months either side of the current one,
+// scrolled vertically through a virtual list.  Month views come from
+// the mirror / server as rows approach the viewport and are let go
+// again once far away (the mirror keeps them).
+
+const TL_SPAN = 10 * 12;
+const TL_KEEP = 12;                       // rows beyond the rendered ones whose views stay loaded
+const tlViews = new Map();                // "YYYY-MM" → month view
+const tlLoading = new Set();
+let tlList = null;
+
+// Row index → { year, month (1-12) }
+function tlMonth(i) {
   const now = new Date();
-  const today = isoDate(now);
+  const d = new Date(now.getFullYear(), now.getMonth() - TL_SPAN + i, 1);
+  return { year: d.getFullYear(), month: d.getMonth() + 1 };
+}
 
-  const MONTHS = ["Styczeń","Luty","Marzec","Kwiecień","Maj","Czerwiec",
-                  "Lipiec","Sierpień","Wrzesień","Październik","Listopad","Grudzień"];
-  const DOW = ["Nd","Pn","Wt","Śr","Cz","Pt","So"];
-
-  // Quarter label
-  const qNum = Math.floor(start.getMonth() / 3) + 1;
-  document.getElementById("tl-label").textContent =
-    `Q${qNum} ${start.getFullYear()}`;
-
-  // Fetch all shifts for the quarter
-  const shifts = await fetchShifts(isoDate(start), isoDate(end));
-  const map = {};
-  if (Array.isArray(shifts)) {
-    shifts.forEach(s => map[s.date] = s);
+function renderTimeline() {
+  if (!tlList) {
+    const scroller = document.getElementById("timeline");
+    tlList = virtualList({
+      scroller,
+      body: scroller,
+      count: 2 * TL_SPAN + 1,
+      rowHeight: 90,
+      row: buildTimelineRow,
+      spacer: () => el("div", "vl-spacer"),
+      onRange: (first, last) => { loadTimeline(first, last, false); updateTimelineLabel(); },
+    });
+    // Whole quarters back / forward
+    const quarterStart = (i) => i - (tlMonth(i).month - 1) % 3;
+    document.getElementById("tl-prev").onclick = () =>
+      tlList.scrollTo(quarterStart(tlList.topIndex()) - 3);
+    document.getElementById("tl-next").onclick = () =>
+      tlList.scrollTo(quarterStart(tlList.topIndex()) + 3);
+    tlList.scrollTo(quarterStart(TL_SPAN));
+  } else {
+    tlList.layout();
   }
+  // Re-check what is on screen against the (possibly changed) data
+  loadTimeline(tlList.first, tlList.last, true);
+}
 
-  const container = document.getElementById("timeline");
-  container.innerHTML = "";
-
-  // Build 3 month rows
-  for (let m = 0; m < 3; m++) {
-    const monthStart = new Date(start.getFullYear(), start.getMonth() + m, 1);
-    const monthEnd = new Date(start.getFullYear(), start.getMonth() + m + 1, 0);
-
-    const row = el("div", "tl-month-row");
-
-    // Month label
-    const label = el("div", "tl-month-label", MONTHS[monthStart.getMonth()]);
-    row.appendChild(label);
-
-    // Scrollable strip of days
-    const scrollWrap = el("div", "tl-strip-scroll");
-    const strip = el("div", "tl-strip");
-
-    for (let d = new Date(monthStart); d <= monthEnd; d.setDate(d.getDate() + 1)) {
-      const iso = isoDate(d);
-      const shift = map[iso];
-      const isWeekend = d.getDay() === 0 || d.getDay() === 6;
-
-      const col = el("div", "tl-col");
-      if (iso === today) col.classList.add("tl-today");
-      if (isWeekend) col.classList.add("tl-weekend");
-
-      // Bar
-      const bar = el("div", "tl-bar");
-      if (shift) {
-        bar.classList.add(`shift-${shift.type}`);
-        bar.title = `${iso}\n${shift.type} ${shift.start}–${shift.end}`;
-      } else {
-        bar.classList.add("empty");
-        bar.title = iso;
-      }
-      col.appendChild(bar);
+function updateTimelineLabel() {
+  const { year, month } = tlMonth(tlList.topIndex());
+  document.getElementById("tl-label").textContent = `Q${Math.floor((month - 1) / 3) + 1} ${year}`;
+}
 
-      // Day number
-      col.appendChild(el("div", "tl-day", String(d.getDate())));
+function loadTimeline(first, last, reload) {
+  const keep = new Set();
+  for (let i = first - TL_KEEP; i < last + TL_KEEP; i++) {
+    const { year, month } = tlMonth(i);
+    keep.add(monthKey(year, month));
+  }
+  for (const key of tlViews.keys()) if (!keep.has(key)) tlViews.delete(key);
+
+  const wanted = [];
+  for (let i = first; i < last; i++) {
+    const { year, month } = tlMonth(i);
+    const key = monthKey(year, month);
+    if (tlLoading.has(key) || (!reload && tlViews.has(key))) continue;
+    tlLoading.add(key);
+    wanted.push({ i, key, ym: [year, month] });
+  }
+  if (!wanted.length) return;
 
-      // Day-of-week
-      const dow = el("div", "tl-dow", DOW[d.getDay()]);
-      col.appendChild(dow);
+  loadMonths(wanted.map(w => w.ym), (views, fresh) => {
+    if (fresh) dropSettledPaints();
+    views.forEach((v, n) => { if (v) tlViews.set(wanted[n].key, v); });
+    tlList.update(wanted.map(w => w.i));
+  }).finally(() => wanted.forEach(w => tlLoading.delete(w.key)));
+}
 
-      col.addEventListener("click", () => paintCell(iso, shift));
-      strip.appendChild(col);
-    }
+// A month view's grid as a timeline strip: { first_weekday, days }
+function monthStrip(view) {
+  const cells = view.weeks.flat();
+  return {
+    first_weekday: cells.findIndex(Boolean),
+    days: cells.filter(Boolean).map(c => c[1]),
+  };
+}
 
-    scrollWrap.appendChild(strip);
-    row.appendChild(scrollWrap);
-    container.appendChild(row);
+function buildTimelineRow(i, previous) {
+  const { year, month } = tlMonth(i);
+  const view = tlViews.get(monthKey(year, month));
+  const today = isoDate(new Date());
+  const MONTHS = ["Styczeń","Luty","Marzec","Kwiecień","Maj","Czerwiec",
+                  "Lipiec","Sierpień","Wrzesień","Październik","Listopad","Grudzień"];
+  const DOW = ["Pn","Wt","Śr","Cz","Pt","So","Nd"];
 
-    // Auto-scroll to today within this strip
-    const todayEl = strip.querySelector(".tl-today");
-    if (todayEl) {
-      requestAnimationFrame(() => {
-        todayEl.scrollIntoView({ inline: "center", block: "nearest", behavior: "smooth" });
-      });
+  // Until its view arrives a month shows as empty days
+  const { first_weekday, days } = view ? monthStrip(view) : {
+    first_weekday: (new Date(year, month - 1, 1).getDay() + 6) % 7,
+    days: new Array(new Date(year, month, 0).getDate()).fill(0),
+  };
+
+  const slot = el("div", "tl-slot");
+  const row = el("div", "tl-month-row");
+  if (!view) row.classList.add("loading");
+
+  // Month label
+  const label = el("div", "tl-month-label", MONTHS[month - 1]);
+  label.title = `${MONTHS[month - 1]} ${year}`;
+  row.appendChild(label);
+
+  // Scrollable strip of days
+  const scrollWrap = el("div", "tl-strip-scroll");
+  const strip = el("div", "tl-strip");
+
+  days.forEach((code, d) => {
+    const iso = `${year}-${pad(month)}-${pad(d + 1)}`;
+    const dow = (first_weekday + d) % 7;          // Mon=0
+    const shift = displayShift(iso, view ? shiftFromCode(view.types, code) : null);
+
+    const col = el("div", "tl-col");
+    col.dataset.date = iso;
+    if (iso === today) col.classList.add("tl-today");
+    if (dow >= 5) col.classList.add("tl-weekend");
+
+    // Bar
+    const bar = el("div", "tl-bar");
+    if (shift) {
+      bar.classList.add(`shift-${shift.type}`);
+      bar.title = `${iso}\n${shift.type} ${shift.start}–${shift.end}`;
+    } else {
+      bar.classList.add("empty");
+      bar.title = iso;
     }
-  }
+    col.appendChild(bar);
+
+    // Day number
+    col.appendChild(el("div", "tl-day", String(d + 1)));
 
-  document.getElementById("tl-prev").onclick = () => { tlQuarterOffset--; renderTimeline(); };
-  document.getElementById("tl-next").onclick = () => { tlQuarterOffset++; renderTimeline(); };
+    // Day-of-week
+    col.appendChild(el("div", "tl-dow", DOW[dow]));
+
+    col.addEventListener("click", () => paintCell(iso, shift));
+    strip.appendChild(col);
+  });
+
+  scrollWrap.appendChild(strip);
+  row.appendChild(scrollWrap);
+  slot.appendChild(row);
+
+  // Keep a rebuilt row's horizontal position; centre today in a new one
+  const before = previous && previous.querySelector(".tl-strip-scroll");
+  const todayEl = strip.querySelector(".tl-today");
+  requestAnimationFrame(() => {
+    if (before) scrollWrap.scrollLeft = before.scrollLeft;
+    else if (todayEl) scrollWrap.scrollLeft = todayEl.offsetLeft - scrollWrap.clientWidth / 2;
+  });
+  return slot;
 }
 
 // ================================================================
 //  HISTORY VIEW
 // ================================================================
+// Pages of HIST_PAGE entries are fetched with a ``before`` cursor as the
+// virtual list nears the end of what is loaded.  The first page is kept
+// in the mirror for offline use.
 
-async function renderHistory() {
-  const tbody = document.querySelector("#history-table tbody");
-  tbody.innerHTML = "<tr><td colspan='3'>Ładowanie…</td></tr>";
-
-  const data = await fetchJSON("/api/history?limit=100");
-  tbody.innerHTML = "";
-  if (!data.length) {
-    tbody.innerHTML = "<tr><td colspan='3'>Brak historii</td></tr>";
-    return;
-  }
-  data.forEach(h => {
-    const tr = el("tr");
-    tr.appendChild(el("td", "", formatTimestamp(h.timestamp)));
-    tr.appendChild(el("td", "", h.date));
-    tr.appendChild(el("td", "", h.change || "—"));
-    tbody.appendChild(tr);
-  });
+const HIST_PAGE = 100;
+let histList = null;
+let histEntries = [];             // loaded so far, newest first
+let histDone = false;             // the oldest entry is loaded
+let histLoading = false;
 
+async function renderHistory() {
   document.getElementById("undo-btn").onclick = async () => {
     if (!confirm("Cofnąć ostatnią zmianę?")) return;
     await fetchJSON("/api/undo", { method: "POST" });
     refreshCurrentView();
   };
+  if (!histList) {
+    histList = virtualList({
+      scroller: document.getElementById("history-scroll"),
+      body: document.querySelector("#history-table tbody"),
+      count: 0,
+      rowHeight: 34,
+      row: buildHistoryRow,
+      spacer: () => { const tr = el("tr", "vl-spacer"); tr.appendChild(el("td")).colSpan = 3; return tr; },
+      onRange: (first, last) => { if (last + HIST_PAGE / 2 >= histEntries.length) loadHistoryPage(); },
+    });
+  }
+
+  // Mirrored first page, refetched when the data version has moved on
+  const seq = ++renderSeq;
+  const local = await mirrorGet("meta", "history");
+  if (seq !== renderSeq) return;
+  if (local && !histEntries.length) showHistory(local.entries);
+  else if (!local) setHistoryStatus("Ładowanie…");
+
+  const version = await syncMirror();
+  if (version === null || (local && local.version === version && histEntries.length)) return;
+  const entries = await fetchJSON(`/api/history?limit=${HIST_PAGE}`, { slot: "history" });
+  if (seq !== renderSeq || !Array.isArray(entries)) return;
+  mirrorPut("meta", { version, entries }, "history");
+  showHistory(entries);
+}
+
+function showHistory(entries) {
+  histEntries = entries;
+  histDone = entries.length < HIST_PAGE;
+  setHistoryStatus(entries.length ? "" : "Brak historii");
+  histList.setCount(entries.length);
+  histList.update();
+}
+
+async function loadHistoryPage() {
+  if (histDone || histLoading || !histEntries.length) return;
+  histLoading = true;
+  const before = histEntries[histEntries.length - 1].id;
+  const page = await fetchJSON(`/api/history?limit=${HIST_PAGE}&before=${before}`);
+  histLoading = false;
+  // Drop the page if the list was reloaded meanwhile
+  if (!Array.isArray(page) || histEntries[histEntries.length - 1]?.id !== before) return;
+  histEntries = histEntries.concat(page);
+  histDone = page.length < HIST_PAGE;
+  histList.setCount(histEntries.length);
+}
+
+function buildHistoryRow(i) {
+  const h = histEntries[i];
+  const tr = el("tr");
+  tr.appendChild(el("td", "", formatTimestamp(h.timestamp)));
+  tr.appendChild(el("td", "", h.date));
+  const change = el("td", "", h.change || "—");
+  change.title = h.change || "";
+  tr.appendChild(change);
+  return tr;
+}
+
+function setHistoryStatus(text) {
+  const status = document.getElementById("history-status");
+  status.textContent = text;
+  status.classList.toggle("hidden", !text);
 }
 
 // ================================================================
@@ -374,25 +862,95 @@ function refreshCurrentView() {
 //  HELPERS
 // ================================================================
 
-async function fetchShifts(from, to) {
-  return fetchJSON(`/api/shifts?from=${from}&to=${to}`);
+// Expand a view-model shift code into { type, start, end } (or null)
+function shiftFromCode(types, code) {
+  if (!code) return null;
+  const type = types[code];
+  return { type, ...(shiftTypes[type] || {}) };
 }
 
+// GETs (no opts.method) go through the fetch layer below; opts.slot
+// names a request that a newer one in the same slot supersedes.
 async function fetchJSON(path, opts = {}) {
+  if (!opts.method) return getJSON(path, opts.slot);
   try {
     const res = await fetch(`${API}${path}`, opts);
-    if (!res.ok) {
-      const err = await res.json().catch(() => ({}));
-      console.error("API error", res.status, err);
-      return err;
-    }
-    return res.json();
+    return readJSON(res);
   } catch (e) {
     console.error("Fetch failed", e);
     return {};
   }
 }
 
+async function readJSON(res) {
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    console.error("API error", res.status, err);
+    return err;
+  }
+  return res.json();
+}
+
+// ── Fetch layer (GET) ───────────────────────────────────────────
+//  - identical requests in flight share one fetch;
+//  - a request in a slot (e.g. "calendar") aborts the slot's previous
+//    request unless someone else still waits for it;
+//  - responses with an ETag are kept in a small LRU and revalidated
+//    with If-None-Match, so an unchanged range costs an empty 304.
+const ETAG_LRU_SIZE = 32;
+const inflight = new Map();       // path → { promise, controller, users, done }
+const etagCache = new Map();      // path → { etag, data }, least recent first
+const slots = new Map();          // slot → inflight entry of its latest request
+
+function getJSON(path, slot) {
+  let entry = inflight.get(path);
+  if (!entry) {
+    const controller = new AbortController();
+    entry = { controller, users: 0, done: false };
+    entry.promise = revalidate(path, controller.signal).finally(() => {
+      entry.done = true;
+      inflight.delete(path);
+    });
+    inflight.set(path, entry);
+  }
+  entry.users++;
+  if (slot) {
+    const previous = slots.get(slot);
+    slots.set(slot, entry);
+    if (previous && previous !== entry && !previous.done && --previous.users === 0) {
+      previous.controller.abort();
+    }
+  }
+  return entry.promise;
+}
+
+async function revalidate(path, signal) {
+  const cached = etagCache.get(path);
+  try {
+    const res = await fetch(`${API}${path}`, {
+      signal,
+      cache: "no-store",            // validated here, not by the HTTP cache
+      headers: cached ? { "If-None-Match": cached.etag } : {},
+    });
+    if (res.status === 304 && cached) {
+      etagCache.delete(path);
+      etagCache.set(path, cached);
+      return cached.data;
+    }
+    const data = await readJSON(res);
+    const etag = res.ok && res.headers.get("ETag");
+    if (etag) {
+      etagCache.delete(path);
+      etagCache.set(path, { etag, data });
+      if (etagCache.size > ETAG_LRU_SIZE) etagCache.delete(etagCache.keys().next().value);
+    }
+    return data;
+  } catch (e) {
+    if (e.name !== "AbortError") console.error("Fetch failed", e);
+    return {};
+  }
+}
+
 function isoDate(d) {
   return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
 }
@@ -0,0 +1,79 @@
+/* ================================================================
+   Work Schedule – service worker (offline app shell)
+   ================================================================
+   The page itself is fetched network-first, so a new release shows
+   up on the next load, with the cached copy used when the network is
+   gone.  Fingerprinted assets (app.<hash>.js …) never change and are
+   served from the cache.  API data is not cached here – the UI keeps
+   its own copy in IndexedDB.
+   ================================================================ */
+
+const CACHE = "work-schedule-shell-v1";
+const HASHED = /\.[0-9a-f]{12}\.[a-z0-9]+$/;
+
+// Path relative to the app root ("" = the page, "ui/app.js" …)
+function appPath(url) {
+  const root = new URL(self.registration.scope).pathname;
+  return url.pathname.startsWith(root) ? url.pathname.slice(root.length) : null;
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(caches.open(CACHE).then(cache => cache.add("./")));
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    for (const name of await caches.keys()) {
+      if (name !== CACHE) await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener("fetch", (event) => {
+  const req = event.request;
+  const url = new URL(req.url);
+  if (req.method !== "GET" || url.origin !== self.location.origin) return;
+  const path = appPath(url);
+  if (path === null) return;
+
+  if (path === "" || path === "index.html") {
+    event.respondWith(networkFirst(req, "./"));
+  } else if (path.startsWith("ui/")) {
+    event.respondWith(HASHED.test(path) ? cacheFirst(req) : networkFirst(req, req));
+  }
+});
+
+async function cacheFirst(req) {
+  const cache = await caches.open(CACHE);
+  const hit = await cache.match(req);
+  if (hit) return hit;
+  const res = await fetch(req);
+  if (res.ok) cache.put(req, res.clone());
+  return res;
+}
+
+async function networkFirst(req, key) {
+  const cache = await caches.open(CACHE);
+  try {
+    const res = await fetch(req);
+    if (res.ok) {
+      await cache.put(key, res.clone());
+      if (key === "./") pruneAssets(cache, await res.clone().text());
+    }
+    return res;
+  } catch (e) {
+    const hit = await cache.match(key);
+    if (hit) return hit;
+    throw e;
+  }
+}
+
+// Drop fingerprinted assets the current page no longer references
+async function pruneAssets(cache, html) {
+  for (const req of await cache.keys()) {
+    const path = appPath(new URL(req.url));
+    if (path && HASHED.test(path) && !html.includes(`"${path}"`)) await cache.delete(req);
+  }
+}